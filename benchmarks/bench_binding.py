@@ -0,0 +1,60 @@
+"""Micro-benchmark of the per-call overhead added by contract decorators.
+
+Run from the repository root with
+``PYTHONPATH=. python benchmarks/bench_binding.py``. Each line reports the
+time per call and the overhead relative to calling the undecorated function.
+
+"""
+import timeit
+from inspect import getcallargs
+
+from covenant import pre, post, constrain
+from covenant.binding import make_binder
+
+
+def plain(x, y):
+    return x
+
+
+@pre(lambda x, y: x > 0)
+def with_pre(x, y):
+    return x
+
+
+@post(lambda r, x, y: r > 0)
+def with_post(x, y):
+    return x
+
+
+@constrain
+def with_constrain(x: lambda x: x > 0, y):
+    return x
+
+
+_bind = make_binder(plain)
+
+CASES = [
+    ("undecorated", "plain(1, 2)"),
+    ("getcallargs", "getcallargs(plain, 1, 2)"),
+    ("binder, positional", "_bind((1, 2), {})"),
+    ("binder, keyword", "_bind((), {'x': 1, 'y': 2})"),
+    ("pre, positional", "with_pre(1, 2)"),
+    ("pre, keyword", "with_pre(x=1, y=2)"),
+    ("post, positional", "with_post(1, 2)"),
+    ("constrain, positional", "with_constrain(1, 2)"),
+]
+
+
+def main(number=200000):
+    baseline = None
+    for name, stmt in CASES:
+        best = min(timeit.repeat(stmt, globals=globals(), number=number, repeat=5))
+        per_call = best / number * 1e9
+        if baseline is None:
+            baseline = per_call
+        print("{0:<24} {1:8.1f} ns/call  (+{2:.1f} ns)".format(
+            name, per_call, per_call - baseline))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,48 @@
+"""Benchmark of the time taken to declare contracts.
+
+Run from the repository root with
+``PYTHONPATH=. python benchmarks/bench_decorate.py``. Functions with distinct
+parameter names, as in a module with thousands of contracts, are decorated
+with :func:`~covenant.pre` and the time per function is reported together with
+the number of wrapper templates that had to be compiled.
+
+"""
+import argparse
+import time
+
+from covenant import pre
+from covenant.wrapping import _TEMPLATES
+
+
+def make_functions(count):
+    functions = []
+    for i in range(count):
+        namespace = {}
+        exec("def f%d(a%d, b%d=1, *args, c%d, **kwargs):\n"
+             "    return a%d" % (i, i, i, i, i), namespace)
+        functions.append(namespace["f%d" % i])
+    return functions
+
+
+def condition(**arguments):
+    return True
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--functions", type=int, default=2000,
+                        help="number of functions to decorate")
+    args = parser.parse_args(argv)
+
+    functions = make_functions(args.functions)
+    templates = len(_TEMPLATES)
+    start = time.perf_counter()
+    for func in functions:
+        pre(condition)(func)
+    elapsed = time.perf_counter() - start
+    print("%.1f us per function, %d templates compiled" % (
+        elapsed / args.functions * 1e6, len(_TEMPLATES) - templates))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""Benchmark of the time taken to import covenant.
+
+Run from the repository root with
+``PYTHONPATH=. python benchmarks/bench_import.py``. Each scenario is run in a
+fresh interpreter under ``python -X importtime`` and the cumulative import
+time of everything it imports beyond a bare interpreter start is reported,
+taking the best of several runs.
+
+``from covenant import *`` loads every submodule, which is what a plain
+``import covenant`` cost before submodules were loaded on first use.
+
+"""
+import argparse
+import os
+import subprocess
+import sys
+
+SCENARIOS = [
+    ("import covenant", "import covenant", {}),
+    ("first contract", "import covenant; covenant.pre", {}),
+    ("every submodule", "from covenant import *", {}),
+    ("first contract, stripped", "import covenant; covenant.pre",
+     {"COVENANT_STRIP": "1"}),
+]
+
+
+def _imports(statement, env):
+    """Return the cumulative import time in microseconds of each top level
+    module imported while running `statement`."""
+    env = dict(os.environ, **env)
+    stderr = subprocess.run([sys.executable, "-X", "importtime", "-c", statement],
+                            env=env, stderr=subprocess.PIPE,
+                            universal_newlines=True, check=True).stderr
+    times = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line.split("|")
+        if name.startswith("  ") or not cumulative.strip().isdigit():
+            continue
+        times[name.strip()] = int(cumulative)
+    return times
+
+
+def measure(statement, env, runs):
+    best = None
+    for _ in range(runs):
+        startup = _imports("pass", env)
+        times = _imports(statement, env)
+        total = sum(us for name, us in times.items() if name not in startup)
+        best = total if best is None else min(best, total)
+    return best
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--runs", type=int, default=5,
+                        help="runs per scenario, the best is reported")
+    args = parser.parse_args(argv)
+
+    for name, statement, env in SCENARIOS:
+        print("%-28s %8.2f ms" % (name, measure(statement, env, args.runs) / 1000.0))
+
+
+if __name__ == "__main__":
+    main()
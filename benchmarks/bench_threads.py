@@ -0,0 +1,105 @@
+"""Benchmark of how contracted calls scale across threads.
+
+Run from the repository root with
+``PYTHONPATH=. python benchmarks/bench_threads.py``. Each case is called in a
+tight loop from 1, 2, 4, ... threads at once and the total throughput is
+reported together with its speedup over a single thread.
+
+Only a free-threaded build of CPython (3.13t or later) can run the threads in
+parallel. There the contracted cases should scale about as well as the
+undecorated one, which shows that checking a contract doesn't make threads
+wait for each other. With the GIL no case scales, and the figures only show
+how much switching between threads costs.
+
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+
+from covenant import pre, post, invariant
+
+
+def plain(x, y):
+    return x
+
+
+@pre(lambda x, y: x > 0)
+@post(lambda r, x, y: r == x)
+def contracted(x, y):
+    return x
+
+
+@invariant(lambda self: self.value >= 0)
+class Counter(object):
+    value = 0
+
+    def get(self, x, y):
+        return x
+
+
+@invariant(lambda self: self.value >= 0, track_changes=True)
+class TrackedCounter(object):
+    value = 0
+
+    def get(self, x, y):
+        return x
+
+
+CASES = [
+    ("undecorated", lambda: plain),
+    ("pre and post", lambda: contracted),
+    # Each thread gets its own instance, as it would use its own objects.
+    ("invariant", lambda: Counter().get),
+    ("invariant, tracked", lambda: TrackedCounter().get),
+]
+
+
+def throughput(make_func, threads, calls):
+    """Return the calls per second made by `threads` threads together."""
+    barrier = threading.Barrier(threads + 1)
+
+    def work():
+        func = make_func()
+        barrier.wait()
+        for _ in range(calls):
+            func(1, 2)
+
+    workers = [threading.Thread(target=work) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for worker in workers:
+        worker.join()
+    return threads * calls / (time.perf_counter() - start)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[0])
+    parser.add_argument("--calls", type=int, default=100000,
+                        help="calls per thread")
+    parser.add_argument("--threads", type=int, default=os.cpu_count() or 1,
+                        help="largest number of threads")
+    args = parser.parse_args(argv)
+
+    counts = [1]
+    while counts[-1] * 2 <= args.threads:
+        counts.append(counts[-1] * 2)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print("GIL %s, %d CPUs" % ("enabled" if gil else "disabled", os.cpu_count()))
+    print("%-20s" % "" + "".join("%18s" % ("%d threads" % n) for n in counts))
+    for name, make_func in CASES:
+        single = None
+        cells = []
+        for threads in counts:
+            rate = throughput(make_func, threads, args.calls)
+            single = single or rate
+            cells.append("%8.2fM (%4.1fx)" % (rate / 1e6, rate / single))
+        print("%-20s" % name + "".join("%18s" % cell for cell in cells))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,221 @@
+"""Benchmark suite for the per-call cost of covenant contracts.
+
+Run from the repository root::
+
+    PYTHONPATH=. python benchmarks/suite.py --output baseline.json
+    PYTHONPATH=. python benchmarks/suite.py --compare baseline.json
+
+Every case is timed with :mod:`timeit` and reported in nanoseconds per call
+together with its cost relative to an undecorated call made in the same run.
+Comparisons against a baseline use the relative figures, which absorb a
+uniformly faster or slower run. ``--compare`` exits with a non-zero status if
+any case has slowed down by more than ``--tolerance``.
+
+The ratios still differ by tens of percent between machines, with their
+caches, frequency scaling and load, so a baseline is only meaningful on the
+machine that produced it: record one from the base revision on the machine
+doing the gating, then compare the change against it. Even then the ratios
+vary between runs, hence the wide default tolerance. The committed
+``benchmarks/baseline.json`` is a reference from one machine, not a gate.
+
+"""
+import argparse
+import json
+import platform
+import sys
+import timeit
+from typing import Optional
+
+import covenant
+from covenant import pre, post, constrain, invariant, where, gt
+
+
+def plain(x, y):
+    return x
+
+
+@pre(lambda x, y: x > 0)
+def one_pre(x, y):
+    return x
+
+
+@pre(lambda x, y: x > 0)
+@pre(lambda x, y: y > 0)
+@post(lambda r, x, y: r == x)
+def stacked(x, y):
+    return x
+
+
+# The conditions only use one of the ten parameters.
+@pre(lambda x: x > 0)
+@post(lambda r, x: r == x)
+def wide(x, a=0, b=0, c=0, d=0, e=0, f=0, g=0, h=0, i=0):
+    return x
+
+
+# Almost every call is sampled out.
+@pre(lambda x, y: x > 0, sample=0.0001)
+@post(lambda r, x, y: r == x, sample=0.0001)
+def sampled(x, y):
+    return x
+
+
+@pre(where(x=gt(0)))
+def predicate(x, y):
+    return x
+
+
+@constrain
+def annotated(x: lambda x: x > 0, y):
+    return x
+
+
+@constrain(hints=True)
+def hinted(x: Optional[int], y: list[int]):
+    return x
+
+
+_ten = list(range(10))
+
+
+class Plain(object):
+    def method(self, x):
+        return x
+
+
+class Contracted(object):
+    @pre(lambda self, x: x > 0)
+    def method(self, x):
+        return x
+
+
+def _make_invariant_class(methods=50, track_changes=False):
+    namespace = {"value": 0}
+    for i in range(methods):
+        exec("def method_%d(self, x):\n    return x" % i, namespace)
+    cls = type("Invariant", (object,), namespace)
+    return invariant(lambda self: self.value >= 0,
+                     track_changes=track_changes)(cls)
+
+
+Invariant = _make_invariant_class()
+Tracked = _make_invariant_class(track_changes=True)
+
+_plain_obj = Plain()
+_contracted_obj = Contracted()
+_invariant_obj = Invariant()
+_tracked_obj = Tracked()
+
+
+# Each case is (name, statement, state), where state "disabled" runs the
+# statement with covenant disabled.
+CASES = [
+    ("undecorated", "plain(1, 2)", None),
+    ("pre", "one_pre(1, 2)", None),
+    ("pre, keyword", "one_pre(x=1, y=2)", None),
+    ("stacked", "stacked(1, 2)", None),
+    ("stacked, keyword", "stacked(x=1, y=2)", None),
+    ("wide", "wide(1, 2, 3, 4, 5, 6, 7, 8, 9, 10)", None),
+    ("sampled", "sampled(1, 2)", None),
+    ("where", "predicate(1, 2)", None),
+    ("constrain", "annotated(1, 2)", None),
+    ("constrain, hints", "hinted(1, _ten)", None),
+    ("method, undecorated", "_plain_obj.method(1)", None),
+    ("method, pre", "_contracted_obj.method(1)", None),
+    ("invariant", "_invariant_obj.method_0(1)", None),
+    ("invariant, tracked", "_tracked_obj.method_0(1)", None),
+    ("stacked, disabled", "stacked(1, 2)", "disabled"),
+    ("invariant, disabled", "_invariant_obj.method_0(1)", "disabled"),
+]
+
+
+def run(number=100000, repeat=5):
+    """Time every case and return the results as a dict."""
+    results = {}
+    for name, stmt, state in CASES:
+        if state == "disabled":
+            covenant.disable()
+        try:
+            best = min(timeit.repeat(stmt, globals=globals(),
+                                     number=number, repeat=repeat))
+        finally:
+            covenant.enable()
+        results[name] = {"ns_per_call": best / number * 1e9}
+
+    reference = results["undecorated"]["ns_per_call"]
+    for result in results.values():
+        result["relative"] = result["ns_per_call"] / reference
+
+    return {
+        "python": platform.python_version(),
+        "implementation": platform.python_implementation(),
+        "number": number,
+        "repeat": repeat,
+        "results": results,
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Return a list of (name, baseline, current) for regressed cases.
+
+    Cases only found in `results` are included with a baseline of None, and
+    cases only found in `baseline` with a current value of None, so that the
+    baseline is refreshed when cases are added or removed.
+
+    """
+    regressions = []
+    for name, expected in baseline["results"].items():
+        current = results["results"].get(name)
+        if current is None:
+            regressions.append((name, expected["relative"], None))
+        elif current["relative"] > expected["relative"] * (1 + tolerance):
+            regressions.append((name, expected["relative"], current["relative"]))
+    for name, current in results["results"].items():
+        if name not in baseline["results"]:
+            regressions.append((name, None, current["relative"]))
+    return regressions
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--number", type=int, default=100000,
+                        help="calls per timing run")
+    parser.add_argument("--repeat", type=int, default=5,
+                        help="timing runs per case, the fastest is kept")
+    parser.add_argument("--output", help="write the results as JSON to this file")
+    parser.add_argument("--compare", metavar="BASELINE",
+                        help="compare against a baseline JSON file")
+    parser.add_argument("--tolerance", type=float, default=0.5,
+                        help="allowed relative slowdown before failing")
+    args = parser.parse_args(argv)
+
+    results = run(args.number, args.repeat)
+
+    for name, result in results["results"].items():
+        print("{0:<24} {1:10.1f} ns/call  {2:6.2f}x".format(
+            name, result["ns_per_call"], result["relative"]))
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        for name, expected, current in regressions:
+            if expected is None:
+                print("MISSING {0}: not in the baseline".format(name))
+            elif current is None:
+                print("MISSING {0}: no longer run".format(name))
+            else:
+                print("REGRESSION {0}: {1:.2f}x -> {2:.2f}x".format(
+                    name, expected, current))
+        if regressions:
+            return 1
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
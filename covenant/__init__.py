@@ -1,7 +1,69 @@
+"""Code contracts for Python.
+
+Submodules are imported the first time one of their names is used, so that
+importing covenant stays cheap for programs that only use a few contracts and
+the checking machinery is only loaded once something is decorated.
+
+"""
 import sys
+from types import ModuleType
+
+# Public name -> submodule that defines it.
+_EXPORTS = {}
+for _module, _names in [
+    ("annotations", ["constrain"]),
+    ("base", ["disable", "enable", "reset", "is_enabled", "is_stripped",
+              "set_sampling", "get_sampling", "settings", "apply_settings"]),
+    ("caching", ["cache_info"]),
+    ("conditions", ["pre", "post"]),
+    ("coverage", ["enable_coverage", "disable_coverage", "is_collecting_coverage",
+                  "reset_coverage", "coverage_snapshot", "merge_coverage",
+                  "dump_coverage", "load_coverage"]),
+    ("deferred", ["set_deferred_executor", "wait_deferred", "dropped_checks"]),
+    ("elementwise", ["all_in_range", "all_finite", "no_nulls", "monotonic",
+                     "has_dtype", "has_shape"]),
+    ("exceptions", ["ContractViolationError", "PreconditionViolationError",
+                    "PostconditionViolationError", "InvariantViolationError"]),
+    ("hints", ["of_type"]),
+    ("invariant", ["invariant", "inherit_contracts"]),
+    ("predicates", ["Predicate", "gt", "ge", "lt", "le", "eq", "ne", "between",
+                    "one_of", "isinstance_of", "len_le", "len_ge", "len_eq",
+                    "satisfies", "and_", "or_", "not_", "where", "returns",
+                    "attributes"]),
+    ("profiling", ["enable_profiling", "disable_profiling", "is_profiling",
+                   "reset_profiling", "snapshot", "to_prometheus"]),
+    ("reporting", ["Violation", "set_violation_policy", "get_violation_policy",
+                   "dropped_violations", "flush"]),
+]:
+    for _name in _names:
+        _EXPORTS[_name] = "covenant." + _module
+del _module, _names, _name
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    try:
+        module = _EXPORTS[name]
+    except KeyError:
+        raise AttributeError("module %r has no attribute %r" % (__name__, name))
+    __import__(module)
+    value = getattr(sys.modules[module], name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_EXPORTS))
+
+
+class _Package(ModuleType):
+    def __setattr__(self, name, value):
+        # Importing a submodule binds it on the package, which would hide an
+        # exported name it shares (covenant.invariant) until the next lookup.
+        if name in _EXPORTS and isinstance(value, ModuleType):
+            return
+        ModuleType.__setattr__(self, name, value)
+
 
-from covenant.annotations import *
-from covenant.base import *
-from covenant.conditions import *
-from covenant.exceptions import *
-from covenant.invariant import *
+sys.modules[__name__].__class__ = _Package
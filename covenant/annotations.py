@@ -1,44 +1,71 @@
-from inspect import getcallargs
-from decorator import decorator
+from covenant.base import Switch, is_stripped
+from covenant.util import optional_arguments, strippable_decorator
 
-from covenant.util import toggled_decorator
-from covenant.exceptions import (PreconditionViolationError,
-                                 PostconditionViolationError)
+if not is_stripped():
+    from covenant.caching import make_cache
+    from covenant.contract import (Check, _check_postconditions,
+                                   _check_preconditions)
+    from covenant.generators import function_kind
+    from covenant.sampling import make_sampler
+    from covenant.wrapping import wrap
 
 
-@toggled_decorator
-@decorator
-def constrain(func, *args, **kwargs):
+@optional_arguments
+@strippable_decorator
+def constrain(func, sample=None, cache=False, hints=False, item_sample=None):
     """Enforce constraints on a function defined by its annotations.
 
     Each annotation should be a callable that takes a single parameter and
     returns a True or False value.
 
-    """
-    callargs = getcallargs(func, *args, **kwargs)
+    Can be used bare or as ``@constrain(sample=..., cache=...)``, where the
+    options have the same meaning as for :func:`covenant.pre`. With `cache`
+    each argument annotation is cached separately.
+
+    With `hints` annotations may also be ordinary type hints, which are
+    compiled into :func:`~covenant.of_type` checks when the function is
+    decorated; `item_sample` is passed on to them. The return value of a
+    coroutine function is then checked once it has been awaited.
 
-    for arg, arg_value in callargs.items():
-        if arg in func.__annotations__:
-            try:
-                result = func.__annotations__[arg](arg_value)
-            except Exception as e:
-                raise PreconditionViolationError("{0}: {1}".format(arg_value, e))
+    """
+    sampled = make_sampler(sample)
+    switch = Switch(func.__module__)
+    coroutine = hints and function_kind(func) == "coroutine"
+    if hints:
+        from covenant.hints import is_hint, of_type
 
-            if not result:
-                raise PreconditionViolationError(arg_value)
+    arg_checks = {}
+    return_check = None
+    for arg, annotation in func.__annotations__.items():
+        if hints and is_hint(annotation):
+            annotation = of_type(annotation, item_sample, func.__globals__)
+        if arg == "return":
+            return_check = Check(annotation, "post", func, label="return",
+                                 arguments=())
+        else:
+            arg_checks[arg] = Check(annotation, "pre", func, label=arg,
+                                    cache=make_cache(cache, (arg,)),
+                                    arguments=(arg,))
+    preconditions = tuple(arg_checks.values())
 
-    value = func(*args, **kwargs)
+    # Sampling decides for every annotation at once, in the wrapper.
+    def _before(callargs, *_):
+        _check_preconditions(preconditions, callargs)
 
-    if "return" in func.__annotations__:
-        try:
-            result = func.__annotations__["return"](value)
-        except Exception as e:
-            raise PostconditionViolationError(e)
+    def _after(value, callargs, state):
+        return _check_postconditions((return_check,), value, callargs)
 
-        if not result:
-            raise PostconditionViolationError()
+    before = _before if preconditions else None
+    after = _after if return_check is not None else None
 
-    return value
+    wrapper = wrap(func, switch, before, after, coroutine, sampled,
+                   needed=arg_checks)
+    wrapper.__covenant_switch__ = switch
+    checks = preconditions
+    if return_check is not None:
+        checks += (return_check,)
+    wrapper.__covenant_checks__ = checks
+    return wrapper
 
 
 __all__ = ["constrain"]
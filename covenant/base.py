@@ -1,21 +1,265 @@
-if __debug__:
-    _ENABLED = True
-else:
-    _ENABLED = False
+import os
+import threading
+from collections import namedtuple
+from weakref import WeakSet
 
 
-def disable():
-    """Disable covenant functionality"""
-    global _ENABLED
-    _ENABLED = False
+def _strip_setting():
+    value = os.environ.get("COVENANT_STRIP")
+    if value is None:
+        return not __debug__
+    return value.strip().lower() not in ("", "0", "false", "no")
 
 
-def enable():
-    """Enable covenant functionality"""
-    global _ENABLED
-    _ENABLED = True
+# Decided once at import time: when stripped, the decorators hand back the
+# objects they're given and the checking machinery is never imported.
+_STRIPPED = _strip_setting()
 
+# Settings are carried over to child processes by passing settings() to
+# apply_settings() in the child, or as JSON in this environment variable,
+# which is read once at import. Each module that has settings worth carrying
+# over exports them with export_settings, reads them back with
+# inherited_setting and applies later ones with on_apply_settings.
+_ENVIRONMENT = "COVENANT_CONFIG"
 
-def is_enabled():
-    """Returns True if covenant functionality is enabled"""
-    return _ENABLED
+
+def _inherited_settings():
+    value = os.environ.get(_ENVIRONMENT)
+    if not value:
+        return {}
+    # Imported here so that importing covenant doesn't load json otherwise.
+    import json
+    try:
+        return json.loads(value)
+    except ValueError:
+        return {}
+
+
+_INHERITED = _inherited_settings()
+_EXPORTED = dict(_INHERITED)
+
+# Called with the settings passed to apply_settings, by modules that keep
+# settings of their own.
+_APPLIERS = []
+
+
+def inherited_setting(name, default=None):
+    """Return the setting `name` inherited from the parent process"""
+    return _INHERITED.get(name, default)
+
+
+def export_settings(**settings):
+    """Record settings to be returned by :func:`settings` from now on. The
+    values must be JSON serializable."""
+    with _LOCK:
+        _EXPORTED.update(settings)
+
+
+def on_apply_settings(apply):
+    """Have `apply` called with the settings passed to :func:`apply_settings`
+    from now on."""
+    _APPLIERS.append(apply)
+
+
+# The enabled state and default sampling are replaced as a whole on every
+# change, so that a thread reading them never sees half of an update. Changes
+# are made, and pushed out to the switches, with _LOCK held.
+_Settings = namedtuple("_Settings", "enabled modules sampling")
+
+# `modules` holds the per-module overrides of the global enabled state,
+# keyed by module name.
+_SETTINGS = _Settings(enabled=inherited_setting("enabled", __debug__),
+                      modules=inherited_setting("modules", {}),
+                      sampling=inherited_setting("sampling"))
+
+_LOCK = threading.Lock()
+
+# Every live switch, so that a change in scope can be pushed out to them.
+_SWITCHES = WeakSet()
+
+
+class Switch(object):
+    """Runtime on/off state of a single contracted function or class.
+
+    Wrappers consult the precomputed `on` attribute on every call. It is
+    recalculated from the function, module and global settings whenever one
+    of them changes, so checking the state costs a single attribute lookup.
+
+    """
+    __slots__ = ("module", "override", "on", "__weakref__")
+
+    def __init__(self, module, override=None):
+        self.module = module
+        self.override = override
+        with _LOCK:
+            self.on = _resolve(self, _SETTINGS)
+            _SWITCHES.add(self)
+
+
+def _module_enabled(module, settings):
+    modules = settings.modules
+    while module:
+        if module in modules:
+            return modules[module]
+        module = module.rpartition(".")[0]
+    return settings.enabled
+
+
+def _resolve(switch, settings):
+    if switch.override is not None:
+        return switch.override
+    return _module_enabled(switch.module, settings)
+
+
+def _update(**changes):
+    # Must be called with _LOCK held.
+    global _SETTINGS
+    _SETTINGS = settings = _SETTINGS._replace(**changes)
+    if "enabled" in changes or "modules" in changes:
+        for switch in list(_SWITCHES):
+            switch.on = _resolve(switch, settings)
+    _EXPORTED.update(changes)
+
+
+def _set(scope, state):
+    if scope is None:
+        with _LOCK:
+            _update(enabled=state)
+    elif isinstance(scope, str):
+        with _LOCK:
+            modules = dict(_SETTINGS.modules)
+            if state is None:
+                modules.pop(scope, None)
+            else:
+                modules[scope] = state
+            _update(modules=modules)
+    else:
+        switch = getattr(scope, "__covenant_switch__", None)
+        if switch is None:
+            if _STRIPPED:
+                return
+            raise TypeError("%r is not a covenant contracted object" % (scope,))
+        with _LOCK:
+            switch.override = state
+            switch.on = _resolve(switch, _SETTINGS)
+
+
+def disable(scope=None):
+    """Disable covenant functionality
+
+    Without a `scope` checking is disabled globally. `scope` may instead be a
+    module name, which also covers its submodules, or a single contracted
+    function or class. Contracts that are already in place are affected
+    immediately.
+
+    """
+    _set(scope, False)
+
+
+def enable(scope=None):
+    """Enable covenant functionality
+
+    `scope` has the same meaning as for :func:`disable`.
+
+    """
+    _set(scope, True)
+
+
+def reset(scope):
+    """Remove a module or function level setting made with enable or disable
+
+    The contracts in `scope` go back to following the enclosing module or
+    global setting.
+
+    """
+    if scope is None:
+        raise TypeError("reset() needs a module name or contracted object")
+    _set(scope, None)
+
+
+def is_enabled(scope=None):
+    """Returns True if covenant functionality is enabled
+
+    With a `scope` the effective setting for that module name or contracted
+    object is returned. Stripped contracts are never enabled.
+
+    """
+    if _STRIPPED:
+        return False
+    elif scope is None:
+        return _SETTINGS.enabled
+    elif isinstance(scope, str):
+        return _module_enabled(scope, _SETTINGS)
+    else:
+        switch = getattr(scope, "__covenant_switch__", None)
+        if switch is None:
+            raise TypeError("%r is not a covenant contracted object" % (scope,))
+        return switch.on
+
+
+def is_stripped():
+    """Returns True if contracts are stripped
+
+    Contracts are stripped when Python runs with the *-O* flag, unless the
+    ``COVENANT_STRIP`` environment variable says otherwise: ``1`` strips them
+    and ``0`` keeps them. The setting is read once, when covenant is first
+    imported. Stripped decorators return the decorated function or class
+    itself, so there is no overhead at all and nothing to enable later.
+
+    """
+    return _STRIPPED
+
+
+def set_sampling(sample):
+    """Set the default sampling for contracts declared afterwards.
+
+    `sample` is a probability between 0 and 1, an integer N to check every Nth
+    call, or None to check every call. Contracts given an explicit `sample`
+    argument are not affected.
+
+    """
+    with _LOCK:
+        _update(sampling=sample)
+
+
+def get_sampling():
+    """Returns the default sampling set with :func:`set_sampling`"""
+    return _SETTINGS.sampling
+
+
+def settings():
+    """Return the settings that other processes can take over
+
+    These are the global and module enabled state, the default sampling, the
+    "raise" or "log" violation policy and whether profiling is on, as a JSON
+    serializable dict. Pass it to :func:`apply_settings` in the other
+    process, for example as the initializer of a process pool, or set the
+    ``COVENANT_CONFIG`` environment variable of a subprocess to it as JSON.
+
+    """
+    with _LOCK:
+        return dict(_EXPORTED)
+
+
+def apply_settings(settings):
+    """Apply settings returned by :func:`settings` in another process"""
+    with _LOCK:
+        _INHERITED.update(settings)
+        _update(**dict((name, settings[name]) for name in _Settings._fields
+                       if name in settings))
+    for apply in list(_APPLIERS):
+        apply(settings)
+
+
+def _after_fork():
+    # The lock may have been held by a thread that doesn't exist in the child.
+    global _LOCK
+    _LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+__all__ = ["disable", "enable", "reset", "is_enabled", "is_stripped",
+           "set_sampling", "get_sampling", "settings", "apply_settings"]
@@ -0,0 +1,151 @@
+from inspect import (CO_VARARGS, CO_VARKEYWORDS, Parameter, getcallargs,
+                     getfullargspec, isfunction, ismethod, signature)
+from operator import itemgetter
+
+_POSITIONAL = (Parameter.POSITIONAL_ONLY, Parameter.POSITIONAL_OR_KEYWORD)
+
+
+def make_binder(func):
+    """Build a function that maps call arguments to `func`'s parameter names.
+
+    The signature of `func` is analyzed once. The returned binder takes the
+    positional argument tuple and keyword argument dict of a call and returns
+    the same mapping as :func:`inspect.getcallargs`, using precomputed fast
+    paths for all-positional and all-keyword calls and falling back to
+    `getcallargs` for everything else (including invalid calls, so that the
+    usual `TypeError` is raised). The instance a bound method is bound to is
+    bound to its first parameter.
+
+    """
+    if ismethod(func):
+        bind_function = make_binder(func.__func__)
+        instance = func.__self__
+        return lambda args, kwargs: bind_function((instance,) + args, kwargs)
+
+    spec = getfullargspec(func)
+    names = tuple(spec.args)
+    count = len(names)
+    varargs = spec.varargs
+    varkw = spec.varkw
+    defaults = {}
+    if spec.defaults:
+        defaults.update(zip(names[count - len(spec.defaults):], spec.defaults))
+    required = count - len(defaults)
+
+    # Keyword-only parameters without defaults can't be satisfied by a purely
+    # positional call, and the ones with defaults are filled in as constants.
+    kwonly_required = [n for n in spec.kwonlyargs
+                       if n not in (spec.kwonlydefaults or {})]
+    kwonly_defaults = dict(spec.kwonlydefaults or {})
+
+    positional_ok = not kwonly_required
+    keyword_ok = varargs is None and varkw is None and not spec.kwonlyargs
+    known = frozenset(names)
+
+    def bind(args, kwargs):
+        if not kwargs:
+            nargs = len(args)
+            if positional_ok and required <= nargs:
+                if nargs == count and not defaults:
+                    callargs = dict(zip(names, args))
+                elif nargs <= count:
+                    callargs = dict(defaults)
+                    callargs.update(zip(names, args))
+                elif varargs is not None:
+                    callargs = dict(zip(names, args))
+                else:
+                    return getcallargs(func, *args)
+                if varargs is not None:
+                    callargs[varargs] = args[count:]
+                if kwonly_defaults:
+                    callargs.update(kwonly_defaults)
+                if varkw is not None:
+                    callargs[varkw] = {}
+                return callargs
+        elif not args and keyword_ok and known.issuperset(kwargs):
+            if defaults:
+                callargs = dict(defaults)
+                callargs.update(kwargs)
+            else:
+                callargs = dict(kwargs)
+            if len(callargs) == count:
+                return callargs
+        return getcallargs(func, *args, **kwargs)
+
+    return bind
+
+
+def parameter_names(func):
+    """Return the names of all of `func`'s parameters, in signature order."""
+    if isfunction(func) and "__wrapped__" not in func.__dict__:
+        # Reading the code object of a plain function is much quicker. It
+        # lists *args after the keyword-only parameters.
+        code = func.__code__
+        varnames = code.co_varnames
+        count = code.co_argcount
+        end = count + code.co_kwonlyargcount
+        names = list(varnames[:count])
+        if code.co_flags & CO_VARARGS:
+            names.append(varnames[end])
+            end += 1
+        names.extend(varnames[count:count + code.co_kwonlyargcount])
+        if code.co_flags & CO_VARKEYWORDS:
+            names.append(varnames[end])
+        return names
+    spec = getfullargspec(func)
+    names = list(spec.args)
+    if spec.varargs:
+        names.append(spec.varargs)
+    names.extend(spec.kwonlyargs)
+    if spec.varkw:
+        names.append(spec.varkw)
+    return names
+
+
+def condition_parameters(condition, names, skip=0, keyword=None):
+    """Return the parameters of `condition` that can be passed by position.
+
+    `names` are the parameter names of the contracted function. The first
+    `skip` parameters of the condition, such as a postcondition's return
+    value, are passed separately, as is `keyword` if it is given, which must
+    then be the condition's last parameter.
+
+    Returns the names of the remaining parameters if each of them is a
+    positional parameter named in `names`, and otherwise None, in which case
+    the condition has to be passed every argument by keyword. That includes
+    conditions taking ``**kwargs`` and those whose signature can't be
+    inspected.
+
+    """
+    try:
+        parameters = list(signature(condition).parameters.values())
+    except (TypeError, ValueError):
+        return None
+    if keyword is not None:
+        if (not parameters or parameters[-1].name != keyword or
+                parameters[-1].kind not in (Parameter.POSITIONAL_OR_KEYWORD,
+                                            Parameter.KEYWORD_ONLY)):
+            return None
+        parameters.pop()
+    if (len(parameters) < skip or
+            any(parameter.kind not in _POSITIONAL for parameter in parameters)):
+        return None
+    selected = tuple(parameter.name for parameter in parameters[skip:])
+    if not set(selected).issubset(names):
+        return None
+    return selected
+
+
+def make_selector(names):
+    """Return a function picking the values of `names` out of a dict of call
+    arguments, as a tuple in the same order."""
+    if len(names) > 1:
+        return itemgetter(*names)
+    if names:
+        name, = names
+        return lambda callargs: (callargs[name],)
+    return lambda callargs: ()
+
+
+__all__ = ["make_binder", "parameter_names", "condition_parameters",
+           "make_selector"]
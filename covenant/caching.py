@@ -0,0 +1,99 @@
+from collections import OrderedDict
+
+
+class ResultCache(object):
+    """A bounded LRU record of argument values that passed a condition.
+
+    Only successful checks are remembered, so a cached condition is
+    re-evaluated for any arguments that previously failed or that have been
+    evicted. Keys include the type of every value so that, for example, ``1``
+    and ``True`` are cached separately.
+
+    """
+    def __init__(self, names, maxsize=1024):
+        self.names = tuple(names)
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()
+
+    def key(self, values):
+        """Build the cache key for a mapping of argument names to values."""
+        values = tuple([values[name] for name in self.names])
+        return values + tuple(map(type, values))
+
+    def validated(self, key):
+        """Returns True if `key` passed recently
+
+        Raises TypeError if `key` is unhashable.
+
+        """
+        entries = self._entries
+        if key not in entries:
+            self.misses += 1
+            return False
+        try:
+            entries.move_to_end(key)
+        except KeyError:
+            # Evicted by another thread in the meantime.
+            pass
+        self.hits += 1
+        return True
+
+    def add(self, key):
+        """Remember that `key` passed the condition"""
+        entries = self._entries
+        entries[key] = True
+        while len(entries) > self.maxsize:
+            try:
+                entries.popitem(last=False)
+            except KeyError:
+                break
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+    def info(self):
+        return {"hits": self.hits, "misses": self.misses,
+                "maxsize": self.maxsize, "currsize": len(self._entries)}
+
+
+def make_cache(cache, names):
+    """Build a :class:`ResultCache` from a decorator's `cache` argument.
+
+    `cache` may be False or None for no caching, True for a cache of the
+    default size, or an integer giving the maximum number of entries.
+
+    """
+    if cache is None or cache is False:
+        return None
+    elif cache is True:
+        return ResultCache(names)
+    elif isinstance(cache, int) and cache > 0:
+        return ResultCache(names, cache)
+    raise ValueError("cache must be a bool or a positive integer: %r" % (cache,))
+
+
+def cache_info(func):
+    """Return the cache statistics of a contracted function.
+
+    The result is a list with one dict per cached condition, giving its
+    ``condition`` label and its ``hits``, ``misses``, ``maxsize`` and
+    ``currsize``.
+
+    """
+    checks = getattr(func, "__covenant_checks__", None)
+    if checks is None:
+        raise TypeError("%r is not a covenant contracted function" % (func,))
+
+    result = []
+    for check in checks:
+        if check.cache is not None:
+            info = check.cache.info()
+            info["condition"] = check.label
+            result.append(info)
+    return result
+
+
+__all__ = ["cache_info"]
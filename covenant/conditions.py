@@ -1,61 +1,112 @@
-from inspect import getcallargs
-from decorator import decorator
+from covenant.base import is_stripped
+from covenant.util import strippable
 
-from covenant.util import toggled_decorator_func
-from covenant.exceptions import (PreconditionViolationError,
-                                 PostconditionViolationError)
+if not is_stripped():
+    from covenant.binding import condition_parameters, parameter_names
+    from covenant.caching import make_cache
+    from covenant.contract import Check, attach
+    from covenant.sampling import make_sampler
+    from covenant.snapshots import make_snapshots
 
 
-@toggled_decorator_func
-def pre(condition):
+@strippable
+def pre(condition, sample=None, cache=False):
     """Enforce a precondition on the decorated function.
 
-    The `condition` must be a callable that receives the same keyword arguments
-    as the function it's being applied to.
+    The `condition` must be a callable whose parameters are named after those
+    of the function it's being applied to. It is passed only the arguments it
+    names, by position, so it needn't declare the ones it doesn't use. A
+    condition with a ``**kwargs`` parameter receives every argument by
+    keyword.
 
-    """
-    @decorator
-    def _pre(func, *args, **kwargs):
-        callargs = getcallargs(func, *args, **kwargs)
+    Stacked :func:`pre` and :func:`post` decorators are merged into a single
+    wrapper that binds the arguments once per call.
+
+    Decorated generator and asynchronous generator functions remain
+    generator functions, so their preconditions are checked when the
+    generator is first started rather than when it is created.
 
-        try:
-            result = condition(**callargs)
-        except Exception as e:
-            # TODO: Better error message including exception
-            raise PreconditionViolationError("Precondition check failed: %s" % e)
+    `sample` checks only a fraction of calls: a float gives the probability
+    of checking a call and an integer N checks every Nth call. It defaults to
+    the value set with :func:`covenant.set_sampling`.
 
-        if not result:
-            raise PreconditionViolationError("Precondition check failed.")
+    If the condition is pure, depending only on the values of its arguments,
+    `cache` can be set to True (or to a maximum number of entries) to skip it
+    for arguments that recently passed. Unhashable arguments are always
+    checked. :func:`covenant.cache_info` reports the cache's hits and misses.
 
-        return func(*args, **kwargs)
+    """
+    def _pre(func):
+        names = parameter_names(func)
+        arguments = condition_parameters(condition, names)
+        check = Check(condition, "pre", func, make_sampler(sample),
+                      cache=make_cache(cache, names if arguments is None
+                                       else arguments),
+                      arguments=arguments)
+        return attach(func, preconditions=[check])
     return _pre
 
 
-@toggled_decorator_func
-def post(condition):
+@strippable
+def post(condition, sample=None, item_sample=None, old=None, mode="immediate"):
     """Enforce a postcondition on the decorated function.
 
     The `condition` must be a callable that receives the return value of the
-    function it's being applied to as its first parameter, and the keyword
-    arguments of the function it's applied to as its remaining parameters.
+    function it's being applied to as its first parameter, and arguments of
+    the function it's applied to as its remaining parameters, passed as for
+    :func:`pre`.
+
+    `sample` has the same meaning as for :func:`pre`.
+
+    On a coroutine function the condition receives the awaited result. On a
+    generator or asynchronous generator it is checked against every yielded
+    item, or only some of them when `item_sample` is given (with the same
+    meaning as `sample`).
+
+    `old` declares values to capture before the call, as a dict mapping names
+    to an argument path such as ``"self.items"`` or to a callable receiving
+    the function's arguments, passed as for the condition. The condition then
+    also receives an `old` keyword argument holding the captured values as
+    attributes::
+
+        @post(lambda r, self, item, old: len(self.items) == old.size + 1,
+              old={"size": lambda self: len(self.items)})
+        def append(self, item):
+            ...
+
+    Values are only captured on calls where the condition is checked. See
+    :func:`covenant.snapshots.make_snapshots` for when values are copied.
+
+    With `mode` "deferred" the function returns without waiting for the
+    condition, which is evaluated later on the executor configured with
+    :func:`covenant.set_deferred_executor`. Violations are then reported
+    through the violation policy, or under the "raise" policy by
+    :func:`covenant.wait_deferred`. The condition sees the return value and
+    arguments as they are when it runs.
 
     """
-    @decorator
-    def _post(func, *args, **kwargs):
-        callargs = getcallargs(func, *args, **kwargs)
-
-        value = func(*args, **kwargs)
-
-        try:
-            result = condition(value, **callargs)
-        except Exception as e:
-            # TODO: Better error message including exception
-            raise PostconditionViolationError("Postcondition check failed: %s" % e)
-
-        if not result:
-            raise PostconditionViolationError("Postcondition check failed.")
-
-        return value
+    if mode == "immediate":
+        deferred = None
+    elif mode == "deferred":
+        from covenant.deferred import defer as deferred
+    else:
+        raise ValueError("Unknown postcondition mode: %r" % (mode,))
+
+    def _post(func):
+        names = parameter_names(func)
+        snapshots = make_snapshots(old, names)
+        if snapshots is not None and "old" in names:
+            raise TypeError("%s has a parameter named 'old', which conflicts "
+                            "with the postcondition's old values"
+                            % func.__qualname__)
+        item_sampled = None if item_sample is None else make_sampler(item_sample)
+        arguments = condition_parameters(
+            condition, names, skip=1,
+            keyword=None if snapshots is None else "old")
+        check = Check(condition, "post", func, make_sampler(sample), item_sampled,
+                      snapshots=snapshots, deferred=deferred,
+                      arguments=arguments)
+        return attach(func, postconditions=[check])
     return _post
 
 __all__ = ["pre", "post"]
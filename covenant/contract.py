@@ -0,0 +1,467 @@
+from functools import partial
+
+from covenant.base import Switch
+from covenant.binding import make_selector, parameter_names
+from covenant.generators import (function_kind, checked_generator,
+                                 checked_async_generator)
+from covenant.profiling import SiteStats, register
+from covenant.reporting import violated
+from covenant.snapshots import capture
+from covenant.util import describe
+from covenant.wrapping import full_arguments, wrap
+from covenant.exceptions import (PreconditionViolationError,
+                                 PostconditionViolationError,
+                                 InvariantViolationError)
+
+_ERRORS = {"pre": PreconditionViolationError,
+           "post": PostconditionViolationError,
+           "invariant": InvariantViolationError}
+
+
+class Check(object):
+    """A single condition attached to a contract, and the site it's checked at.
+
+    `kind` is "pre", "post" or "invariant" and `owner` is the function or
+    class the condition applies to. `label` describes the condition and
+    defaults to its name and source location.
+
+    `sampled` is None or a callable deciding whether the condition is checked
+    on a given call. For generators and asynchronous generators
+    `item_sampled` does the same for each yielded item.
+
+    `cache` is None or a :class:`~covenant.caching.ResultCache` of arguments
+    that recently passed a pure precondition, and `snapshots` is None or the
+    getters from :func:`~covenant.snapshots.make_snapshots` for the old values
+    a postcondition needs.
+
+    `deferred` is None for a condition checked on the calling thread, or a
+    function such as :func:`covenant.deferred.defer` that is passed the check,
+    the value, the arguments and the old values to evaluate them later.
+
+    `arguments` names the parameters of the function that the condition
+    takes, in order, as found by
+    :func:`~covenant.binding.condition_parameters`. Their values are then
+    passed by position, and `select` picks them out of the call arguments.
+    When `arguments` is None `select` is too, and the condition is passed
+    every argument by keyword.
+
+    Evaluation goes through the `condition` attribute, which instrumentation
+    may replace; `original` always refers to the condition as given.
+
+    """
+    __slots__ = ("condition", "original", "kind", "site", "label",
+                 "sampled", "item_sampled", "cache", "snapshots", "deferred",
+                 "arguments", "select", "stats", "__weakref__")
+
+    def __init__(self, condition, kind, owner, sampled=None,
+                 item_sampled=None, label=None, cache=None, snapshots=None,
+                 deferred=None, arguments=None):
+        self.condition = self.original = condition
+        self.kind = kind
+        self.site = "%s.%s" % (owner.__module__, owner.__qualname__)
+        self.label = describe(condition) if label is None else label
+        self.sampled = sampled
+        self.item_sampled = item_sampled
+        self.cache = cache
+        self.snapshots = snapshots
+        self.deferred = deferred
+        self.arguments = arguments
+        self.select = None if arguments is None else make_selector(arguments)
+        self.stats = SiteStats()
+        register(self)
+
+    def violation(self, arguments=None, cause=None, message=None, **details):
+        """Build the exception reporting a violation of this check.
+
+        `arguments` are the bound call arguments, possibly as collected for
+        only some of the parameters by the wrapper, and `cause` the exception
+        raised by the condition, if any. `details` are passed on to the
+        exception class, such as the `result` of a postcondition.
+
+        """
+        if arguments is not None:
+            arguments = full_arguments(arguments)
+        error = _ERRORS[self.kind](message, self.site, self.label, arguments,
+                                   **details)
+        if cause is not None:
+            error.__cause__ = cause
+        return error
+
+
+class Contract(object):
+    """The preconditions and postconditions enforced on a single function.
+
+    Preconditions are evaluated in order before the call and postconditions
+    in order after it, all from within one wrapper whose parameters match the
+    function's, so the arguments are bound by the call itself. Both are
+    sequences of :class:`Check` objects.
+
+    For coroutine functions postconditions are checked against the awaited
+    result, and for generators and asynchronous generators against each
+    yielded item.
+
+    `alternatives` holds the precondition groups of overridden methods. When
+    there are any, a call is accepted if all of `preconditions` or all of
+    the checks in any one alternative group hold.
+
+    The contract's :class:`~covenant.base.Switch` turns checking on and off
+    at runtime. A new one is created unless `switch` is given.
+
+    """
+    def __init__(self, func, preconditions=(), postconditions=(),
+                 alternatives=(), switch=None):
+        self.func = func
+        self.kind = function_kind(func)
+        self.preconditions = tuple(preconditions)
+        self.postconditions = tuple(postconditions)
+        self.alternatives = tuple(alternatives)
+        self.switch = Switch(func.__module__) if switch is None else switch
+        self.snapshotting = any(check.snapshots for check in self.postconditions)
+
+    @property
+    def checks(self):
+        """Every check of the contract, preconditions first."""
+        return (self.preconditions + sum(self.alternatives, ()) +
+                self.postconditions)
+
+    def extend(self, preconditions=(), postconditions=()):
+        """Return a new contract with additional outer conditions.
+
+        The new preconditions run before the existing ones and the new
+        postconditions run after them, matching the order in which separately
+        nested wrappers would have evaluated them.
+
+        """
+        return Contract(self.func, tuple(preconditions) + self.preconditions,
+                        self.postconditions + tuple(postconditions),
+                        self.alternatives,
+                        Switch(self.switch.module, self.switch.override))
+
+
+def _precondition_failure(check, callargs):
+    """Evaluate a sampled-in precondition, returning the error if it's
+    violated.
+
+    Arguments that recently passed a cached condition count as holding.
+
+    """
+    cache = check.cache
+    if cache is not None:
+        try:
+            key = cache.key(callargs)
+            if cache.validated(key):
+                return None
+        except TypeError:
+            # Unhashable arguments are simply checked every time.
+            cache = None
+
+    select = check.select
+    try:
+        if select is None:
+            result = check.condition(**callargs)
+        else:
+            result = check.condition(*select(callargs))
+    except Exception as e:
+        return check.violation(callargs, e)
+    if not result:
+        return check.violation(callargs)
+    if cache is not None:
+        cache.add(key)
+    return None
+
+
+def _check_preconditions(preconditions, callargs):
+    """Evaluate the sampled-in preconditions against the bound arguments."""
+    for check in preconditions:
+        if check.sampled is None or check.sampled():
+            error = _precondition_failure(check, callargs)
+            if error is not None:
+                violated(check, error)
+
+
+def _check_alternatives(groups, callargs):
+    """Accept the call if every precondition in any one of `groups` holds.
+
+    Otherwise the first failure of the first group is reported.
+
+    """
+    first = None
+    for group in groups:
+        for check in group:
+            if check.sampled is not None and not check.sampled():
+                continue
+            error = _precondition_failure(check, callargs)
+            if error is not None:
+                if first is None:
+                    first = (check, error)
+                break
+        else:
+            return
+    violated(*first)
+
+
+def _capture_snapshots(postconditions, callargs):
+    """Capture old values for the sampled-in postconditions that need them.
+
+    Returns a dict mapping each such check to its old values. Sampling for
+    these checks is decided here, before the call.
+
+    """
+    olds = {}
+    for check in postconditions:
+        if check.snapshots is None:
+            continue
+        if check.sampled is not None and not check.sampled():
+            continue
+        _capture(check, callargs, olds)
+    return olds
+
+
+def _capture(check, callargs, olds):
+    try:
+        olds[check] = capture(check.snapshots, callargs)
+    except Exception as e:
+        violated(check, check.violation(
+            callargs, e, "Could not capture old values"))
+
+
+def _postcondition_active(check, olds):
+    if check.snapshots is not None:
+        return olds is not None and check in olds
+    return check.sampled is None or check.sampled()
+
+
+def _check_postcondition(check, value, callargs, olds=None):
+    if check.deferred is not None:
+        check.deferred(check, value, callargs,
+                       None if check.snapshots is None else olds[check])
+        return
+    select = check.select
+    try:
+        if select is None:
+            if check.snapshots is None:
+                result = check.condition(value, **callargs)
+            else:
+                result = check.condition(value, old=olds[check], **callargs)
+        elif check.snapshots is None:
+            result = check.condition(value, *select(callargs))
+        else:
+            result = check.condition(value, *select(callargs), old=olds[check])
+    except Exception as e:
+        violated(check, check.violation(callargs, e, result=value))
+    else:
+        if not result:
+            violated(check, check.violation(callargs, result=value))
+
+
+def _check_postconditions(postconditions, value, callargs, olds=None):
+    for check in postconditions:
+        if _postcondition_active(check, olds):
+            _check_postcondition(check, value, callargs, olds)
+    return value
+
+
+def _checked_items(kind, gen, active, callargs, olds):
+    """Return the generator `gen` with each item checked against the
+    postconditions in `active`."""
+    checked = checked_async_generator if kind == "asyncgen" else checked_generator
+
+    def check_item(item):
+        for check in active:
+            if check.item_sampled is None or check.item_sampled():
+                _check_postcondition(check, item, callargs, olds)
+
+    return checked(gen, check_item)
+
+
+def _make_hooks(contract):
+    """Return the `before`, `after` and `sample` hooks for :func:`wrap`."""
+    checks = contract.checks
+    if (checks and not contract.alternatives and
+            all(check.sampled is not None for check in checks)):
+        return _make_sampled_hooks(contract)
+
+    postconditions = contract.postconditions
+    if contract.alternatives:
+        check_preconditions = partial(
+            _check_alternatives,
+            (contract.preconditions,) + contract.alternatives)
+    elif contract.preconditions:
+        check_preconditions = partial(_check_preconditions,
+                                      contract.preconditions)
+    else:
+        check_preconditions = None
+
+    if contract.snapshotting:
+        def before(callargs):
+            if check_preconditions is not None:
+                check_preconditions(callargs)
+            return _capture_snapshots(postconditions, callargs)
+    else:
+        before = check_preconditions
+
+    if not postconditions:
+        after = None
+    elif contract.kind in ("generator", "asyncgen"):
+        def after(gen, callargs, olds):
+            active = [check for check in postconditions
+                      if _postcondition_active(check, olds)]
+            if not active:
+                return gen
+            return _checked_items(contract.kind, gen, active, callargs, olds)
+    else:
+        after = partial(_check_postconditions, postconditions)
+
+    return before, after, None
+
+
+def _make_sampled_hooks(contract):
+    """Return the hooks for a contract all of whose checks are sampled.
+
+    Which checks are sampled in is then decided by the `sample` hook, before
+    the wrapper collects the arguments, so a call that checks nothing costs
+    little more than the sampling itself. It returns True if every check is
+    sampled in, as for a single check, or the tuple of checks sampled in.
+
+    """
+    preconditions = contract.preconditions
+    postconditions = contract.postconditions
+    checks = contract.checks
+    if len(checks) == 1:
+        sample = checks[0].sampled
+    else:
+        def sample():
+            active = ()
+            for check in checks:
+                if check.sampled():
+                    active += (check,)
+            return active
+
+    def before(callargs, active):
+        if active is True:
+            pre, post = preconditions, postconditions
+        else:
+            pre = [check for check in preconditions if check in active]
+            post = [check for check in postconditions if check in active]
+        for check in pre:
+            error = _precondition_failure(check, callargs)
+            if error is not None:
+                violated(check, error)
+        olds = None
+        if contract.snapshotting:
+            olds = {}
+            for check in post:
+                if check.snapshots is not None:
+                    _capture(check, callargs, olds)
+            # Checks whose old values couldn't be captured are skipped.
+            post = [check for check in post
+                    if check.snapshots is None or check in olds]
+        return post, olds
+
+    if not postconditions:
+        after = None
+    elif contract.kind in ("generator", "asyncgen"):
+        def after(gen, callargs, state):
+            active, olds = state
+            if not active:
+                return gen
+            return _checked_items(contract.kind, gen, active, callargs, olds)
+    else:
+        def after(value, callargs, state):
+            active, olds = state
+            for check in active:
+                _check_postcondition(check, value, callargs, olds)
+            return value
+
+    return before, after, sample
+
+
+def get_contract(func):
+    """Return the contract enforced by a covenant wrapper, or None.
+
+    Only wrappers produced directly by covenant are recognized; a function
+    that merely copied a wrapper's attributes (for example via
+    :func:`functools.wraps`) is treated as an ordinary function.
+
+    """
+    contract = getattr(func, "__covenant__", None)
+    if contract is not None and getattr(func, "__wrapped__", None) is contract.func:
+        return contract
+    return None
+
+
+def _wrap(contract):
+    before, after, sample = _make_hooks(contract)
+    wrapper = wrap(contract.func, contract.switch, before, after,
+                   coroutine=contract.kind == "coroutine", sample=sample,
+                   needed=_referenced_names(contract))
+    wrapper.__covenant__ = contract
+    wrapper.__covenant_checks__ = contract.checks
+    wrapper.__covenant_switch__ = contract.switch
+    return wrapper
+
+
+def attach(func, preconditions=(), postconditions=()):
+    """Wrap `func` so that it enforces the given conditions.
+
+    If `func` is already a covenant wrapper its conditions are merged with the
+    new ones into a single wrapper around the original function.
+
+    """
+    contract = get_contract(func)
+    if contract is None:
+        contract = Contract(func, preconditions, postconditions)
+    else:
+        contract = contract.extend(preconditions, postconditions)
+    return _wrap(contract)
+
+
+def _referenced_names(contract):
+    """Return the parameter names the checks of `contract` may refer to."""
+    names = set()
+    for check in contract.checks:
+        if check.arguments is None or check.snapshots is not None:
+            # Passed every argument, or capturing old values from them.
+            return set(parameter_names(contract.func))
+        names.update(check.arguments)
+    return names
+
+
+def inherit(func, inherited):
+    """Wrap the method `func` so that it also honours `inherited`, the
+    contract of the method it overrides.
+
+    The preconditions are weakened: a call is accepted if it satisfies either
+    the overriding method's own preconditions or the inherited ones, and an
+    override without preconditions of its own keeps the inherited ones. The
+    postconditions are strengthened: both the inherited and the overriding
+    method's postconditions must hold.
+
+    Raises TypeError if `func` lacks a parameter the inherited conditions
+    refer to, as when it renames one.
+
+    """
+    own = get_contract(func)
+    missing = (_referenced_names(inherited) -
+               set(parameter_names(func if own is None else own.func)))
+    if missing:
+        raise TypeError("%s can't inherit the contract of the method it "
+                        "overrides, which refers to the parameters %s"
+                        % (func.__qualname__, ", ".join(sorted(missing))))
+    if own is None:
+        contract = Contract(func, inherited.preconditions,
+                            inherited.postconditions, inherited.alternatives)
+        return _wrap(contract)
+
+    if own.preconditions or own.alternatives:
+        preconditions = own.preconditions
+        alternatives = (own.alternatives + (inherited.preconditions,) +
+                        inherited.alternatives)
+    else:
+        preconditions = inherited.preconditions
+        alternatives = inherited.alternatives
+    contract = Contract(own.func, preconditions,
+                        inherited.postconditions + own.postconditions,
+                        alternatives,
+                        Switch(own.switch.module, own.switch.override))
+    return _wrap(contract)
@@ -0,0 +1,281 @@
+"""Contract coverage: which contract conditions are evaluated, and with what.
+
+While coverage is collected every evaluation of a condition is counted, along
+with the types of the values it was passed (its argument shape). Each thread
+counts into its own table, so evaluations don't contend for a lock. The
+tables are combined by :func:`coverage_snapshot`, and the table of a thread
+that has finished is added to a shared one.
+
+The data can be written with :func:`dump_coverage`, one file per process,
+and the files merged and summarized from the command line::
+
+    python -m covenant.coverage coverage.*.json
+
+Setting the ``COVENANT_COVERAGE`` environment variable to a path collects
+coverage from the start and dumps it to that path, suffixed with the process
+id, when the process exits. A forked child starts counting from zero.
+
+"""
+import argparse
+import atexit
+import json
+import os
+import sys
+import threading
+from weakref import finalize
+
+from covenant.profiling import add_instrument, checks, remove_instrument
+
+_FORMAT = "covenant-coverage"
+_VERSION = 1
+
+_COLLECTING = False
+
+# The table of every running thread that has evaluated a condition, keyed by
+# its id, each mapping a check to a dict of argument shape -> count. The
+# counts of finished threads are added to _FINISHED, a table of the same kind.
+_TABLES = {}
+_FINISHED = {}
+_TABLES_LOCK = threading.Lock()
+_local = threading.local()
+
+
+class _Owner(object):
+    """Kept alive by the thread-local data of one thread, so that it is
+    collected when the thread finishes."""
+
+
+def _merge(target, table):
+    # Copy first, the owning thread may be adding to `table`.
+    for check, shapes in list(table.items()):
+        merged = target.setdefault(check, {})
+        for shape, count in list(shapes.items()):
+            merged[shape] = merged.get(shape, 0) + count
+
+
+def _retire(key, table):
+    with _TABLES_LOCK:
+        if _TABLES.pop(key, None) is table:
+            _merge(_FINISHED, table)
+
+
+def _new_table():
+    table = _local.table = {}
+    _local.owner = owner = _Owner()
+    with _TABLES_LOCK:
+        _TABLES[id(table)] = table
+    finalize(owner, _retire, id(table), table)
+    return table
+
+
+def _counted(check, condition):
+    def counted(*args, **kwargs):
+        try:
+            table = _local.table
+        except AttributeError:
+            table = _new_table()
+        shapes = table.get(check)
+        if shapes is None:
+            shapes = table[check] = {}
+        shape = (tuple(map(type, args)), tuple(kwargs),
+                 tuple(map(type, kwargs.values())))
+        shapes[shape] = shapes.get(shape, 0) + 1
+        return condition(*args, **kwargs)
+    return counted
+
+
+def enable_coverage():
+    """Start counting the evaluations of every contract condition"""
+    global _COLLECTING
+    _COLLECTING = True
+    add_instrument(_counted)
+
+
+def disable_coverage():
+    """Stop counting condition evaluations
+
+    The counts collected so far are kept until :func:`reset_coverage`.
+
+    """
+    global _COLLECTING
+    _COLLECTING = False
+    remove_instrument(_counted)
+
+
+def is_collecting_coverage():
+    """Returns True if condition evaluations are being counted"""
+    return _COLLECTING
+
+
+def reset_coverage():
+    """Clear the counts of every thread"""
+    with _TABLES_LOCK:
+        for table in _TABLES.values():
+            table.clear()
+        _FINISHED.clear()
+
+
+def _type_name(cls):
+    if cls.__module__ == "builtins":
+        return cls.__qualname__
+    return "%s.%s" % (cls.__module__, cls.__qualname__)
+
+
+def _render(shape, arguments=None):
+    positional, names, types = shape
+    # Arguments passed by position are named after the condition's
+    # parameters; any leading ones, such as a postcondition's return value,
+    # stay unnamed.
+    if arguments and len(arguments) <= len(positional):
+        unnamed = len(positional) - len(arguments)
+        names = arguments + names
+        types = positional[unnamed:] + types
+        positional = positional[:unnamed]
+    return ", ".join([_type_name(cls) for cls in positional] +
+                     ["%s=%s" % (name, _type_name(cls))
+                      for name, cls in zip(names, types)])
+
+
+def coverage_snapshot():
+    """Return the coverage of every contract condition.
+
+    The result is a list of dicts, one per condition, with the keys
+    ``function``, ``kind``, ``condition``, ``hits`` (the number of
+    evaluations) and ``shapes``, a dict mapping each argument shape, such as
+    ``"int, x=int, y=str"``, to the number of evaluations with it. Conditions
+    that were never evaluated are included with no hits.
+
+    """
+    counts = dict((check, {}) for check in checks())
+    with _TABLES_LOCK:
+        _merge(counts, _FINISHED)
+        tables = list(_TABLES.values())
+    for table in tables:
+        _merge(counts, table)
+
+    sites = []
+    for check, shapes in counts.items():
+        rendered = {}
+        for shape, count in shapes.items():
+            key = _render(shape, check.arguments)
+            rendered[key] = rendered.get(key, 0) + count
+        sites.append({"function": check.site,
+                      "kind": check.kind,
+                      "condition": check.label,
+                      "hits": sum(rendered.values()),
+                      "shapes": rendered})
+    return merge_coverage(sites)
+
+
+def merge_coverage(*site_lists):
+    """Combine lists of sites as returned by :func:`coverage_snapshot`.
+
+    Sites with the same function, kind and condition, such as the same
+    contract in different processes, are added together. The result is
+    ordered by decreasing number of hits.
+
+    """
+    merged = {}
+    for sites in site_lists:
+        for site in sites:
+            key = (site["function"], site["kind"], site["condition"])
+            target = merged.get(key)
+            if target is None:
+                target = merged[key] = {"function": site["function"],
+                                        "kind": site["kind"],
+                                        "condition": site["condition"],
+                                        "hits": 0,
+                                        "shapes": {}}
+            target["hits"] += site["hits"]
+            for shape, count in site["shapes"].items():
+                target["shapes"][shape] = target["shapes"].get(shape, 0) + count
+    return sorted(merged.values(),
+                  key=lambda site: (-site["hits"], site["function"],
+                                    site["kind"], site["condition"]))
+
+
+def dump_coverage(path, sites=None):
+    """Write a :func:`coverage_snapshot` as JSON to the file `path`"""
+    if sites is None:
+        sites = coverage_snapshot()
+    with open(path, "w") as f:
+        json.dump({"format": _FORMAT, "version": _VERSION, "sites": sites},
+                  f, separators=(",", ":"))
+
+
+def load_coverage(*paths):
+    """Read and merge files written by :func:`dump_coverage`"""
+    site_lists = []
+    for path in paths:
+        with open(path) as f:
+            data = json.load(f)
+        if data.get("format") != _FORMAT or data.get("version") != _VERSION:
+            raise ValueError("%s is not a covenant coverage file" % path)
+        site_lists.append(data["sites"])
+    return merge_coverage(*site_lists)
+
+
+def start_from_environment(path):
+    """Collect coverage and dump it to `path` and the process id at exit."""
+    enable_coverage()
+    atexit.register(lambda: dump_coverage("%s.%d" % (path, os.getpid())))
+
+
+def _after_fork():
+    # The parent's counts belong to the parent, and its lock may have been
+    # held by a thread that doesn't exist in the child.
+    global _TABLES_LOCK
+    _TABLES_LOCK = threading.Lock()
+    for table in _TABLES.values():
+        table.clear()
+    _FINISHED.clear()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _summary(sites, shapes=False, unhit=False):
+    lines = ["%10s %7s  %-10s %s" % ("hits", "shapes", "kind", "contract")]
+    for site in sites:
+        if not site["hits"] and not unhit:
+            continue
+        lines.append("%10d %7d  %-10s %s: %s" % (
+            site["hits"], len(site["shapes"]), site["kind"], site["function"],
+            site["condition"]))
+        if shapes:
+            for shape, count in sorted(site["shapes"].items(),
+                                       key=lambda item: -item[1]):
+                lines.append("%10d %7s  %-10s   (%s)" % (count, "", "", shape))
+    never = sum(1 for site in sites if not site["hits"])
+    lines.append("%d of %d contract conditions evaluated" % (
+        len(sites) - never, len(sites)))
+    return "\n".join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m covenant.coverage",
+        description="Merge and summarize covenant coverage files.")
+    parser.add_argument("files", nargs="+", help="files written by dump_coverage")
+    parser.add_argument("--output", help="write the merged data to this file")
+    parser.add_argument("--shapes", action="store_true",
+                        help="list the argument shapes of each condition")
+    parser.add_argument("--unhit", action="store_true",
+                        help="also list conditions that were never evaluated")
+    args = parser.parse_args(argv)
+
+    sites = load_coverage(*args.files)
+    if args.output:
+        dump_coverage(args.output, sites)
+    print(_summary(sites, args.shapes, args.unhit))
+    return 0
+
+
+__all__ = ["enable_coverage", "disable_coverage", "is_collecting_coverage",
+           "reset_coverage", "coverage_snapshot", "merge_coverage",
+           "dump_coverage", "load_coverage"]
+
+
+if __name__ == "__main__":
+    sys.exit(main())
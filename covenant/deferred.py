@@ -0,0 +1,198 @@
+"""Evaluation of expensive postconditions off the calling thread.
+
+A postcondition declared with ``@post(condition, mode="deferred")`` does not
+hold up the function: the return value is handed back at once and the
+condition is submitted to a :mod:`concurrent.futures` executor. Violations are
+reported through the violation policy (see
+:func:`~covenant.set_violation_policy`). Under the default "raise" policy
+there is no caller left to raise to, so they are logged to the ``covenant``
+logger and the first one is raised by the next :func:`wait_deferred`.
+
+The number of checks that may be pending at once is bounded. When the bound
+is reached the calling thread either waits for a free slot or the check is
+dropped, depending on `block`.
+
+"""
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from covenant.reporting import get_violation_policy, logger, violated
+
+_EXECUTOR = None
+_OWN_EXECUTOR = False
+_BLOCK = True
+_MAX_PENDING = 1000
+_SLOTS = threading.BoundedSemaphore(_MAX_PENDING)
+_LOCK = threading.Lock()
+# The number of submitted checks whose outcome hasn't been handled yet,
+# notified as they settle.
+_pending = 0
+_SETTLED = threading.Condition(_LOCK)
+
+# The first violation found under the "raise" policy since the last
+# wait_deferred, which raises it.
+_FAILURE = None
+
+_dropped = 0
+
+
+def set_deferred_executor(executor=None, max_pending=1000, block=True):
+    """Configure how deferred postconditions are evaluated.
+
+    `executor` is a :class:`concurrent.futures.Executor`, by default a
+    single-threaded :class:`~concurrent.futures.ThreadPoolExecutor`. With a
+    :class:`~concurrent.futures.ProcessPoolExecutor` the condition, the return
+    value and the arguments must be picklable; they are then copied when the
+    check is submitted.
+
+    At most `max_pending` checks wait for the executor at any time. When they
+    do, a call that has another check to submit waits for one to finish if
+    `block` is true, and otherwise skips the check; :func:`dropped_checks`
+    counts how many were skipped.
+
+    Checks already submitted are waited for first.
+
+    """
+    global _EXECUTOR, _OWN_EXECUTOR, _BLOCK, _SLOTS, _MAX_PENDING
+    _wait_pending(None)
+    with _LOCK:
+        if _OWN_EXECUTOR:
+            _EXECUTOR.shutdown(wait=False)
+        _EXECUTOR = executor
+        _OWN_EXECUTOR = False
+        _BLOCK = block
+        _MAX_PENDING = max_pending
+        _SLOTS = threading.BoundedSemaphore(max_pending)
+
+
+def _executor():
+    global _EXECUTOR, _OWN_EXECUTOR
+    with _LOCK:
+        if _EXECUTOR is None:
+            _EXECUTOR = ThreadPoolExecutor(
+                1, thread_name_prefix="covenant-deferred")
+            _OWN_EXECUTOR = True
+        return _EXECUTOR
+
+
+def defer(check, value, callargs, old=None):
+    """Submit the postcondition `check` for evaluation in the background.
+
+    `old` holds the check's captured old values, if it declared any.
+
+    """
+    global _dropped, _pending
+    slots = _SLOTS
+    if not slots.acquire(_BLOCK):
+        _dropped += 1
+        return
+
+    executor = _executor()
+    # A process can't run the profiling wrapper, only the condition itself.
+    if isinstance(executor, ProcessPoolExecutor):
+        condition = check.original
+    else:
+        condition = check.condition
+    if check.select is None:
+        args = ()
+        kwargs = dict(callargs)
+    else:
+        args = check.select(callargs)
+        kwargs = {}
+    if old is not None:
+        kwargs["old"] = old
+
+    with _LOCK:
+        _pending += 1
+    try:
+        future = executor.submit(condition, value, *args, **kwargs)
+    except BaseException:
+        _settle(slots)
+        raise
+    future.add_done_callback(
+        lambda future: _done(check, slots, future, value, callargs))
+
+
+def _settle(slots):
+    global _pending
+    slots.release()
+    with _SETTLED:
+        _pending -= 1
+        _SETTLED.notify_all()
+
+
+def _done(check, slots, future, value, callargs):
+    try:
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            _report(check, check.violation(callargs, error, result=value))
+        elif not future.result():
+            _report(check, check.violation(callargs, result=value))
+    finally:
+        _settle(slots)
+
+
+def _report(check, error):
+    global _FAILURE
+    if get_violation_policy() != "raise":
+        violated(check, error)
+        return
+
+    logger.error("Deferred contract violation: %s", error)
+    with _LOCK:
+        if _FAILURE is None:
+            _FAILURE = error
+
+
+def _wait_pending(timeout):
+    with _SETTLED:
+        return _SETTLED.wait_for(lambda: not _pending, timeout)
+
+
+def wait_deferred(timeout=None):
+    """Wait until every deferred postcondition submitted so far has run.
+
+    Returns False if `timeout` seconds passed first. Under the "raise"
+    violation policy the first violation found since the previous call is
+    raised here. With another policy, call :func:`~covenant.flush` afterwards
+    to wait for the violations to be handed to the handler.
+
+    """
+    global _FAILURE
+    done = _wait_pending(timeout)
+    with _LOCK:
+        error, _FAILURE = _FAILURE, None
+    if error is not None:
+        raise error
+    return done
+
+
+def dropped_checks():
+    """Returns the number of deferred checks skipped because too many were
+    pending"""
+    return _dropped
+
+
+def _after_fork():
+    # Checks pending in the parent are the parent's business, and the
+    # executor's threads don't exist in the child, so a default executor is
+    # created afresh when needed.
+    global _EXECUTOR, _OWN_EXECUTOR, _LOCK, _SETTLED, _SLOTS, _pending, _FAILURE
+    if _OWN_EXECUTOR:
+        _EXECUTOR = None
+        _OWN_EXECUTOR = False
+    _LOCK = threading.Lock()
+    _SETTLED = threading.Condition(_LOCK)
+    _SLOTS = threading.BoundedSemaphore(_MAX_PENDING)
+    _pending = 0
+    _FAILURE = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+__all__ = ["set_deferred_executor", "wait_deferred", "dropped_checks"]
@@ -0,0 +1,273 @@
+"""Element-wise predicates for arrays and sequences.
+
+Each predicate takes a single container and returns True, or raises
+:exc:`ValueError` naming the first offending index. NumPy arrays are checked
+with single vectorized operations; other sequences are checked element by
+element. NumPy is never imported by this module; arrays are recognized by
+their type, so it is only used when the caller already has it loaded.
+
+The predicates can be used directly as :func:`~covenant.constrain`
+annotations or called from any other condition::
+
+    @constrain
+    def normalize(values: all_finite()):
+        ...
+
+    @pre(lambda values, weights: all_in_range(0, 1)(weights))
+    def weighted_mean(values, weights):
+        ...
+
+"""
+import sys
+from abc import ABC, abstractmethod
+from reprlib import repr as _repr
+
+
+def _numpy_array(value):
+    """Return the numpy module if `value` is a NumPy array, otherwise None."""
+    np = sys.modules.get("numpy")
+    if np is not None and isinstance(value, np.ndarray):
+        return np
+    return None
+
+
+def _first_index(np, mask):
+    """Return the index of the first True entry of `mask`, or None."""
+    if not mask.any():
+        return None
+    flat = int(np.argmax(mask.ravel()))
+    if mask.ndim == 1:
+        return flat
+    return tuple(int(i) for i in np.unravel_index(flat, mask.shape))
+
+
+def _is_null(x):
+    return x is None or x != x
+
+
+def _fail(index, item, failure):
+    raise ValueError("element at index %s is %s, %s" % (index, _repr(item),
+                                                        failure))
+
+
+class ElementwisePredicate(ABC):
+    """Base class for predicates applied to every element of a container.
+
+    Subclasses implement :meth:`_check_item` and :meth:`_describe_failure`,
+    and may override :meth:`_check_array` with a vectorized check.
+
+    """
+    def __call__(self, value):
+        np = _numpy_array(value)
+        if np is not None and value.dtype.kind != "O":
+            index = self._check_array(np, value)
+            if index is not None:
+                _fail(index, value[index], self._describe_failure())
+        else:
+            for index, item in enumerate(value):
+                if not self._check_item(item):
+                    _fail(index, item, self._describe_failure())
+        return True
+
+    def _check_array(self, np, array):
+        """Return the first index at which `array` fails, or None."""
+        return _first_index(np, ~self._check_item(array))
+
+    @abstractmethod
+    def _check_item(self, item):
+        """Return True if `item` passes, applied element-wise to arrays."""
+
+    @abstractmethod
+    def _describe_failure(self):
+        """Describe why a failing element fails."""
+
+
+class all_in_range(ElementwisePredicate):
+    """Check that every element lies between `low` and `high`.
+
+    Either bound may be None to leave that side open. Bounds are inclusive
+    unless `inclusive` is False. NaN values are not caught; combine with
+    :class:`all_finite` for that.
+
+    """
+    def __init__(self, low=None, high=None, inclusive=True):
+        self.low = low
+        self.high = high
+        self.inclusive = inclusive
+
+    def _check_array(self, np, array):
+        bad = np.zeros(array.shape, dtype=bool)
+        if self.low is not None:
+            bad |= (array < self.low) if self.inclusive else (array <= self.low)
+        if self.high is not None:
+            bad |= (array > self.high) if self.inclusive else (array >= self.high)
+        return _first_index(np, bad)
+
+    def _check_item(self, item):
+        if self.low is not None:
+            if item < self.low if self.inclusive else item <= self.low:
+                return False
+        if self.high is not None:
+            if item > self.high if self.inclusive else item >= self.high:
+                return False
+        return True
+
+    def _describe_failure(self):
+        brackets = "[]" if self.inclusive else "()"
+        return "outside %s%r, %r%s" % (brackets[0], self.low, self.high, brackets[1])
+
+    def __repr__(self):
+        return "all_in_range(%r, %r)" % (self.low, self.high)
+
+
+class all_finite(ElementwisePredicate):
+    """Check that no element is NaN or infinite."""
+
+    def _check_array(self, np, array):
+        if array.dtype.kind not in "fc":
+            return None
+        return _first_index(np, ~np.isfinite(array))
+
+    def _check_item(self, item):
+        try:
+            return item - item == 0
+        except TypeError:
+            return False
+
+    def _describe_failure(self):
+        return "which is not finite"
+
+    def __repr__(self):
+        return "all_finite()"
+
+
+class no_nulls(ElementwisePredicate):
+    """Check that no element is None, NaN or NaT."""
+
+    def _check_array(self, np, array):
+        if array.dtype.kind in "fc":
+            return _first_index(np, np.isnan(array))
+        if array.dtype.kind in "mM":
+            return _first_index(np, np.isnat(array))
+        return None
+
+    def _check_item(self, item):
+        return not _is_null(item)
+
+    def _describe_failure(self):
+        return "which is null"
+
+    def __repr__(self):
+        return "no_nulls()"
+
+
+class monotonic(object):
+    """Check that a one dimensional container is sorted.
+
+    The elements must be non-decreasing, or non-increasing if `increasing` is
+    False. With `strict` equal neighbours are not allowed either.
+
+    """
+    def __init__(self, increasing=True, strict=False):
+        self.increasing = increasing
+        self.strict = strict
+
+    def __call__(self, value):
+        np = _numpy_array(value)
+        if np is not None and value.dtype.kind != "O":
+            if value.ndim != 1:
+                raise ValueError("expected a one dimensional array, got shape %r"
+                                 % (value.shape,))
+            index = _first_index(np, ~self._ordered(value[:-1], value[1:]))
+            if index is not None:
+                _fail(index + 1, value[index + 1], self._describe_failure())
+        else:
+            previous = missing = object()
+            for index, item in enumerate(value):
+                if previous is not missing and not self._ordered(previous, item):
+                    _fail(index, item, self._describe_failure())
+                previous = item
+        return True
+
+    def _ordered(self, a, b):
+        if self.increasing:
+            return a < b if self.strict else a <= b
+        return a > b if self.strict else a >= b
+
+    def _describe_failure(self):
+        order = "increasing" if self.increasing else "decreasing"
+        return "breaking %s%s order" % ("strictly " if self.strict else "", order)
+
+    def __repr__(self):
+        return "monotonic(increasing=%r, strict=%r)" % (self.increasing, self.strict)
+
+
+class has_dtype(object):
+    """Check the element type of a container.
+
+    For a NumPy array `dtype` is anything accepted by :func:`numpy.issubdtype`,
+    such as ``numpy.floating`` or ``"int64"``. For other sequences it must be
+    a type or tuple of types that every element is an instance of.
+
+    """
+    def __init__(self, dtype):
+        self.dtype = dtype
+
+    def __call__(self, value):
+        np = _numpy_array(value)
+        if np is not None:
+            if not np.issubdtype(value.dtype, self.dtype):
+                raise ValueError("array has dtype %s, expected %s" % (
+                    value.dtype, self.dtype))
+        else:
+            for index, item in enumerate(value):
+                if not isinstance(item, self.dtype):
+                    raise ValueError("element at index %s is %s of type %s, "
+                                     "expected %s" % (index, _repr(item),
+                                                      type(item).__name__,
+                                                      self.dtype))
+        return True
+
+    def __repr__(self):
+        return "has_dtype(%r)" % (self.dtype,)
+
+
+class has_shape(object):
+    """Check the shape of an array or of nested sequences.
+
+    `shape` is a tuple of sizes, where None matches any size. Plain sequences
+    are measured with :func:`len` along their first element at each level.
+
+    """
+    def __init__(self, *shape):
+        if len(shape) == 1 and isinstance(shape[0], tuple):
+            shape = shape[0]
+        self.shape = shape
+
+    def __call__(self, value):
+        np = _numpy_array(value)
+        if np is not None:
+            actual = value.shape
+        else:
+            actual = []
+            level = value
+            for _ in self.shape:
+                try:
+                    actual.append(len(level))
+                    level = level[0] if len(level) else ()
+                except TypeError:
+                    break
+            actual = tuple(actual)
+
+        if len(actual) != len(self.shape) or any(
+                expected is not None and expected != size
+                for expected, size in zip(self.shape, actual)):
+            raise ValueError("shape is %r, expected %r" % (actual, self.shape))
+        return True
+
+    def __repr__(self):
+        return "has_shape(%r)" % (self.shape,)
+
+
+__all__ = ["all_in_range", "all_finite", "no_nulls", "monotonic",
+           "has_dtype", "has_shape"]
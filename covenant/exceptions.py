@@ -1,18 +1,108 @@
+from reprlib import Repr
+
+_repr = Repr()
+_repr.maxstring = 60
+_repr.maxother = 60
+_repr.maxdict = 6
+_repr.maxlist = _repr.maxtuple = _repr.maxset = 6
+
+
 class ContractViolationError(AssertionError):
-    """Base class for all covenant contract violations."""
-    pass
+    """Base class for all covenant contract violations.
+
+    Besides the optional `message` a violation carries structured details:
+    `function` is the qualified name of the contracted function or class,
+    `condition` describes the violated condition and where it's defined and
+    `arguments` is the dict of bound call arguments, or None. An exception
+    raised by the condition itself is available as ``__cause__``.
+
+    The message is only put together when the exception is converted to a
+    string, with long or unusual argument values abbreviated, so creating and
+    catching a violation stays cheap.
+
+    """
+    default_message = "Contract violated"
+
+    def __init__(self, message=None, function=None, condition=None,
+                 arguments=None):
+        if message is None:
+            AssertionError.__init__(self)
+        else:
+            AssertionError.__init__(self, message)
+        self.message = message
+        self.function = function
+        self.condition = condition
+        self.arguments = arguments
+        self._rendered = None
+
+    def _details(self):
+        details = []
+        if self.function is not None:
+            details.append("in %s" % self.function)
+        if self.condition is not None:
+            details.append("(%s)" % self.condition)
+        if self.arguments:
+            details.append("with %s" % ", ".join(
+                "%s=%s" % (name, _repr.repr(value))
+                for name, value in self.arguments.items()))
+        return details
+
+    def __str__(self):
+        if self._rendered is None:
+            message = self.default_message if self.message is None else str(self.message)
+            details = self._details()
+            if details:
+                message = "%s %s" % (message, " ".join(details))
+            cause = self.__cause__
+            if cause is not None:
+                message = "%s: %s: %s" % (message, type(cause).__name__, cause)
+            self._rendered = message
+        return self._rendered
 
 
 class PreconditionViolationError(ContractViolationError):
     """Raised when a function precondition is violated."""
-    pass
+    default_message = "Precondition check failed"
 
 
 class PostconditionViolationError(ContractViolationError):
-    """Raised when a function postcondition is violated."""
-    pass
+    """Raised when a function postcondition is violated.
+
+    If the function returned, `result` holds its return value (or the awaited
+    result or yielded item that failed).
+
+    """
+    default_message = "Postcondition check failed"
+    _no_result = object()
+
+    def __init__(self, message=None, function=None, condition=None,
+                 arguments=None, result=_no_result):
+        ContractViolationError.__init__(self, message, function, condition,
+                                        arguments)
+        self._has_result = result is not self._no_result
+        self.result = result if self._has_result else None
+
+    def _details(self):
+        details = ContractViolationError._details(self)
+        if self._has_result:
+            details.append("returning %s" % _repr.repr(self.result))
+        return details
 
 
 class InvariantViolationError(ContractViolationError):
-    """Raised when a class invariant is violated."""
-    pass
+    """Raised when a class invariant is violated.
+
+    `instance` is the object whose invariant doesn't hold.
+
+    """
+    default_message = "Invariant violated"
+
+    def __init__(self, message=None, function=None, condition=None,
+                 arguments=None, instance=None):
+        ContractViolationError.__init__(self, message, function, condition,
+                                        arguments)
+        self.instance = instance
+
+
+__all__ = ["ContractViolationError", "PreconditionViolationError",
+           "PostconditionViolationError", "InvariantViolationError"]
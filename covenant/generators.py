@@ -0,0 +1,94 @@
+from inspect import (iscoroutinefunction, isgeneratorfunction,
+                     isasyncgenfunction)
+
+
+def function_kind(func):
+    """Classify `func` as a "function", "coroutine", "generator" or "asyncgen"."""
+    if iscoroutinefunction(func):
+        return "coroutine"
+    elif isasyncgenfunction(func):
+        return "asyncgen"
+    elif isgeneratorfunction(func):
+        return "generator"
+    return "function"
+
+
+def checked_generator(gen, check_item=None, on_return=None):
+    """Delegate to the generator `gen`, checking what it produces.
+
+    `check_item` is called with each yielded item before it is passed on and
+    `on_return` is called with the generator's return value once it finishes.
+    Values sent and exceptions thrown into the wrapper are forwarded to `gen`
+    as with ``yield from``. If a check raises, `gen` is closed.
+
+    """
+    try:
+        try:
+            item = next(gen)
+        except StopIteration as e:
+            value = e.value
+        else:
+            while True:
+                if check_item is not None:
+                    check_item(item)
+                try:
+                    sent = yield item
+                except GeneratorExit:
+                    raise
+                except BaseException as e:
+                    try:
+                        item = gen.throw(e)
+                    except StopIteration as e:
+                        value = e.value
+                        break
+                else:
+                    try:
+                        item = gen.send(sent)
+                    except StopIteration as e:
+                        value = e.value
+                        break
+    finally:
+        gen.close()
+
+    if on_return is not None:
+        on_return(value)
+    return value
+
+
+async def checked_async_generator(agen, check_item=None, on_return=None):
+    """Delegate to the asynchronous generator `agen`, checking its items.
+
+    Behaves like :func:`checked_generator`, forwarding ``asend`` and
+    ``athrow`` to `agen`. `on_return` is called with None once `agen` is
+    exhausted. No extra tasks are scheduled; every step awaits `agen`
+    directly.
+
+    """
+    try:
+        try:
+            item = await agen.__anext__()
+        except StopAsyncIteration:
+            pass
+        else:
+            while True:
+                if check_item is not None:
+                    check_item(item)
+                try:
+                    sent = yield item
+                except GeneratorExit:
+                    raise
+                except BaseException as e:
+                    try:
+                        item = await agen.athrow(e)
+                    except StopAsyncIteration:
+                        break
+                else:
+                    try:
+                        item = await agen.asend(sent)
+                    except StopAsyncIteration:
+                        break
+    finally:
+        await agen.aclose()
+
+    if on_return is not None:
+        on_return(None)
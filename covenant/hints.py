@@ -0,0 +1,278 @@
+"""Runtime checks compiled from type hints.
+
+:func:`of_type` turns a type hint into a :class:`~covenant.Predicate`. The
+hint is translated once into a single expression of ``isinstance`` tests, with
+unions of plain classes merged into one ``isinstance`` call::
+
+    of_type(Optional[int])       # isinstance(value, (int, NoneType))
+    of_type(list[int])           # isinstance(value, list) and
+                                 # all(isinstance(i, int) for i in value)
+    of_type(Literal["r", "w"])
+
+``@constrain(hints=True)`` applies it to every annotation that is a type hint.
+
+"""
+import collections.abc
+import types
+import typing
+from itertools import count, islice, repeat
+from random import randrange
+from reprlib import repr as _repr
+
+from covenant.predicates import Predicate, _constant, _predicate
+from covenant.sampling import make_sampler
+
+_NONE_TYPE = type(None)
+_UNION_TYPES = (typing.Union,)
+if hasattr(types, "UnionType"):
+    _UNION_TYPES += (types.UnionType,)
+
+# Hinted numeric types also accept the types they are promoted from, as in
+# PEP 484.
+_PROMOTIONS = {float: (float, int), complex: (complex, float, int)}
+
+
+def _item_sampler(item_sample):
+    """Return a function selecting the elements of a container to check, or
+    None to check them all."""
+    # make_sampler validates item_sample and tells whether it checks all.
+    if item_sample is None or make_sampler(item_sample) is None:
+        return None
+    if isinstance(item_sample, int):
+        # The offset moves on by one each time, so that every position is
+        # covered over N checks rather than only 0, N, 2N...
+        offsets = count()
+        return lambda items: islice(items, next(offsets) % item_sample, None,
+                                    item_sample)
+    if not item_sample:
+        return lambda items: ()
+    # Every Nth element from a random offset checks the requested fraction
+    # without a call per element.
+    step = max(1, round(1 / item_sample))
+    return lambda items: islice(items, randrange(step), None, step)
+
+
+def is_hint(annotation):
+    """Return True if `annotation` is a type hint rather than a predicate."""
+    return (annotation is None or isinstance(annotation, (type, str)) or
+            type(annotation).__module__ in ("typing", "types",
+                                            "typing_extensions"))
+
+
+def _describe(hint):
+    if isinstance(hint, type) and typing.get_origin(hint) is None:
+        if hint.__module__ == "builtins":
+            return hint.__qualname__
+        return "%s.%s" % (hint.__module__, hint.__qualname__)
+    return repr(hint)
+
+
+class of_type(Predicate):
+    """The value matches the type hint `hint`.
+
+    Supported are classes, ``None``, :data:`~typing.Any`,
+    :data:`~typing.Optional` and :data:`~typing.Union` (including ``X | Y``),
+    :data:`~typing.Literal`, ``type[X]``, :func:`~typing.NewType`, type
+    variables, :data:`~typing.Annotated` (whose callable metadata is applied
+    as further predicates) and generic containers. The elements of lists,
+    sets, tuples, mappings and other collections are checked too, all of them
+    unless `item_sample` is given: an integer N checks every Nth element,
+    starting one element further on each time, and a float the corresponding
+    fraction of them, starting at a random element.
+    Other generics, such as iterators, are only checked to be instances of
+    their origin class. A predicate in place of a hint is called as usual.
+
+    Strings are forward references, evaluated in `namespace`. If one can't be
+    resolved yet it is tried again when the value is first checked.
+
+    """
+    def __init__(self, hint, item_sample=None, namespace=None):
+        self.hint = hint
+        self.namespace = namespace
+        self._sample = _item_sampler(item_sample)
+        try:
+            self._compile()
+        except NameError:
+            pass
+
+    def _source(self, var, env):
+        return _source(self.hint, var, env, self._sample, self.namespace, 0) or "True"
+
+    def __call__(self, value):
+        # Compiling outside the try reports a forward reference that is
+        # still unresolved as such, not as a failing value.
+        check = self._compiled or self._compile()
+        try:
+            if check(value):
+                return True
+        except Exception:
+            pass
+        raise ValueError("%s failed %s" % (_repr(value), self._failure(value)))
+
+    def __repr__(self):
+        return "of_type(%s)" % _describe(self.hint)
+
+
+def _classes(hint):
+    """Return the tuple of classes `hint` stands for if it is a plain class,
+    None or a union of those, otherwise None."""
+    if hint is None or hint is _NONE_TYPE:
+        return (_NONE_TYPE,)
+    if typing.get_origin(hint) in _UNION_TYPES:
+        classes = ()
+        for member in typing.get_args(hint):
+            member_classes = _classes(member)
+            if member_classes is None:
+                return None
+            classes += member_classes
+        return tuple(dict.fromkeys(classes))
+    if (isinstance(hint, type) and typing.get_origin(hint) is None and
+            hint is not typing.Any and hint is not object):
+        return _PROMOTIONS.get(hint, (hint,))
+    return None
+
+
+def _check_class(classes):
+    try:
+        isinstance(None, classes)
+    except TypeError:
+        raise TypeError("Can't check instances of %r" % (classes,))
+    return classes
+
+
+def _union(members, var, env, sample, namespace, depth):
+    classes = ()
+    clauses = []
+    for member in members:
+        member_classes = _classes(member)
+        if member_classes is not None:
+            classes += member_classes
+            continue
+        clause = _source(member, var, env, sample, namespace, depth)
+        if clause is None:
+            return None
+        clauses.append(clause)
+    if classes:
+        classes = _check_class(tuple(dict.fromkeys(classes)))
+        clauses.insert(0, "isinstance(%s, %s)" % (var, _constant(env, classes)))
+    if not clauses:
+        return "False"
+    return "(%s)" % " or ".join(clauses)
+
+
+def _all(hint, container, env, sample, namespace, depth):
+    """Return an expression testing the checked elements of `container`
+    against `hint`, or None if every element matches."""
+    if sample is not None:
+        container = "%s(%s)" % (_constant(env, sample), container)
+    classes = _classes(hint)
+    if classes is not None:
+        # Mapping isinstance over the elements avoids running a generator
+        # frame for each of them.
+        classes = _check_class(classes)
+        return "all(map(isinstance, %s, %s))" % (
+            container, _constant(env, repeat(classes)))
+    item = "_covenant_i%d" % depth
+    clause = _source(hint, item, env, sample, namespace, depth + 1)
+    if clause is None:
+        return None
+    return "all(%s for %s in %s)" % (clause, item, container)
+
+
+def _is_mapping(origin):
+    return isinstance(origin, type) and issubclass(origin, collections.abc.Mapping)
+
+
+def _is_collection(origin):
+    # Iterating over an iterator would consume it, so only collections have
+    # their elements checked.
+    return (isinstance(origin, type) and
+            issubclass(origin, collections.abc.Collection) and
+            not issubclass(origin, collections.abc.Iterator))
+
+
+def _generic(hint, origin, args, var, env, sample, namespace, depth):
+    if origin is tuple:
+        head = "isinstance(%s, tuple)" % var
+        if hint is typing.Tuple:
+            return head
+        if len(args) == 2 and args[1] is Ellipsis:
+            clauses = [head, _all(args[0], var, env, sample, namespace, depth)]
+        else:
+            if args == ((),):
+                args = ()
+            clauses = [head, "len(%s) == %d" % (var, len(args))]
+            clauses += [_source(arg, "%s[%d]" % (var, index), env, sample,
+                                namespace, depth)
+                        for index, arg in enumerate(args)]
+    elif origin is type:
+        head = "isinstance(%s, type)" % var
+        if not args or args[0] is typing.Any:
+            return head
+        target = args[0]
+        if typing.get_origin(target) in _UNION_TYPES:
+            target = typing.get_args(target)
+        clauses = [head, "issubclass(%s, %s)" % (var, _constant(env, target))]
+    else:
+        clauses = ["isinstance(%s, %s)" % (var, _constant(env, origin))]
+        if _is_mapping(origin) and len(args) == 2:
+            clauses += [_all(args[0], var, env, sample, namespace, depth),
+                        _all(args[1], var + ".values()", env, sample,
+                             namespace, depth)]
+        elif _is_collection(origin) and len(args) == 1:
+            clauses.append(_all(args[0], var, env, sample, namespace, depth))
+    clauses = [clause for clause in clauses if clause is not None]
+    if len(clauses) == 1:
+        return clauses[0]
+    return "(%s)" % " and ".join(clauses)
+
+
+def _source(hint, var, env, sample, namespace, depth):
+    """Return an expression testing `var` against `hint`, or None if every
+    value matches."""
+    if isinstance(hint, typing.ForwardRef):
+        hint = hint.__forward_arg__
+    if isinstance(hint, str):
+        hint = eval(hint, dict(namespace or {}))
+    if hint is typing.Any or hint is object:
+        return None
+    if hint is None or hint is _NONE_TYPE:
+        return "(%s is None)" % var
+
+    origin = typing.get_origin(hint)
+    args = typing.get_args(hint)
+    if origin in _UNION_TYPES:
+        return _union(args, var, env, sample, namespace, depth)
+    if origin is typing.Literal:
+        # Compare types as well so that Literal[1] doesn't accept True or 1.0.
+        choices = frozenset((choice, type(choice)) for choice in args)
+        return "((%s, type(%s)) in %s)" % (var, var, _constant(env, choices))
+    if origin is typing.Annotated:
+        clauses = [_source(args[0], var, env, sample, namespace, depth)]
+        clauses += [_predicate(meta)._source(var, env) for meta in args[1:]
+                    if callable(meta)]
+        clauses = [clause for clause in clauses if clause is not None]
+        return "(%s)" % " and ".join(clauses) if clauses else None
+    if origin in (typing.ClassVar, typing.Final):
+        return _source(args[0], var, env, sample, namespace, depth) if args else None
+    if origin is not None:
+        return _generic(hint, origin, args, var, env, sample, namespace, depth)
+
+    if isinstance(hint, typing.TypeVar):
+        if hint.__bound__ is not None:
+            return _source(hint.__bound__, var, env, sample, namespace, depth)
+        if hint.__constraints__:
+            return _union(hint.__constraints__, var, env, sample, namespace, depth)
+        return None
+    supertype = getattr(hint, "__supertype__", None)
+    if supertype is not None:
+        return _source(supertype, var, env, sample, namespace, depth)
+    if isinstance(hint, type):
+        classes = _check_class(_PROMOTIONS.get(hint, hint))
+        return "isinstance(%s, %s)" % (var, _constant(env, classes))
+    if not is_hint(hint) and callable(hint):
+        return _predicate(hint)._source(var, env)
+    raise TypeError("Unsupported type hint: %r" % (hint,))
+
+
+__all__ = ["of_type"]
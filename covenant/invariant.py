@@ -1,43 +1,283 @@
-from inspect import getcallargs, getargspec, isfunction, getmembers
+from contextvars import ContextVar
 from functools import wraps
+from weakref import ref
 
-from covenant.util import toggled_decorator_func
-from covenant.exceptions import InvariantViolationError
+from covenant.base import Switch, is_stripped
+from covenant.util import strippable, strippable_decorator
+
+if not is_stripped():
+    from inspect import isfunction, CO_VARARGS
+
+    from covenant.contract import Check, get_contract, inherit
+    from covenant.reporting import violated
+    from covenant.generators import function_kind
+    from covenant.wrapping import _DELEGATE_ASYNC, generate
 
 
 # Keep track of which invariant checks are currently happening so that
-# we don't end up with recursive check issues.
-_INVARIANTS_IN_PROGRESS = set()
+# we don't end up with recursive check issues. A context variable gives every
+# thread and every asyncio task its own view, and the value is an immutable
+# set so that a task never sees changes made by the context it was copied from.
+_INVARIANTS_IN_PROGRESS = ContextVar("covenant_invariants_in_progress",
+                                     default=frozenset())
+
+# For classes that track changes: the ids of the instances whose invariants
+# held when last checked and that haven't been written to since. Each maps to
+# a weak reference that removes the entry when the instance is collected, so
+# that a later object reusing the id doesn't inherit it.
+_UNCHANGED = {}
+
 
+class _ClassContract(Switch):
+    """The invariants of a class, resolved from the class and its ancestors.
+
+    `declared` holds the invariants declared on the class itself and `checks`
+    those together with every inherited invariant, in the order they are
+    evaluated. `exclude` is the set of method names left unchecked, including
+    those excluded by ancestors, and `tracking` is true if the class or an
+    ancestor tracks changes. Being a :class:`~covenant.base.Switch` it also
+    turns checking on and off for the class.
+
+    """
+    __slots__ = ("declared", "checks", "exclude", "tracking")
 
-def _check_invariant(obj, condition):
+    def __init__(self, cls):
+        Switch.__init__(self, cls.__module__)
+        self.declared = ()
+        self.exclude = frozenset()
+        self.checks = ()
+        self.tracking = False
+
+
+def _check_invariants(obj, checks):
     obj_id = id(obj)
-    if not obj_id in _INVARIANTS_IN_PROGRESS:
-        _INVARIANTS_IN_PROGRESS.add(obj_id)
-        result = condition(obj)
-        _INVARIANTS_IN_PROGRESS.remove(obj_id)
-        if not result:
-            raise InvariantViolationError("Invariant violated.")
+    in_progress = _INVARIANTS_IN_PROGRESS.get()
+    if not obj_id in in_progress:
+        token = _INVARIANTS_IN_PROGRESS.set(in_progress | {obj_id})
+        failed = None
+        try:
+            for check in checks:
+                try:
+                    if check.condition(obj):
+                        continue
+                    cause = None
+                except Exception as e:
+                    cause = e
+                failed = (failed or ()) + ((check, cause),)
+        finally:
+            _INVARIANTS_IN_PROGRESS.reset(token)
+        if failed:
+            for check, cause in failed:
+                violated(check, check.violation(cause=cause, instance=obj))
+            return False
+    return True
+
+
+def _check_changed(obj, checks):
+    """Check the invariants of `obj` unless they held when last checked and
+    it hasn't been written to since."""
+    key = id(obj)
+    if key in _UNCHANGED:
+        return
+    # Marked unchanged before the check, so that a write made meanwhile (by
+    # another thread, say) clears the mark again.
+    try:
+        _UNCHANGED[key] = ref(obj, lambda _, key=key: _UNCHANGED.pop(key, None))
+    except TypeError:
+        # Without weak references the object is always checked.
+        pass
+    held = False
+    try:
+        held = _check_invariants(obj, checks)
+    finally:
+        if not held:
+            _UNCHANGED.pop(key, None)
+
+
+def _tracker(method):
+    """Wrap the __setattr__ or __delattr__ `method` to mark the instance as
+    changed."""
+    # Not copying the method's __dict__ keeps the tracker distinguishable
+    # from an invariant wrapper.
+    @wraps(method, updated=())
+    def tracker(self, *args):
+        method(self, *args)
+        _UNCHANGED.pop(id(self), None)
 
+    tracker.__covenant_tracker__ = True
+    return tracker
 
 
-def _invariant_wrapper(attr, condition):
-    @wraps(attr)
-    def wrapper(*args, **kwargs):
-        callargs = getcallargs(attr, *args, **kwargs)
-        inst = callargs['self']
+def _install_trackers(cls):
+    for name in ("__setattr__", "__delattr__"):
+        method = getattr(cls, name)
+        if not getattr(method, "__covenant_tracker__", False):
+            setattr(cls, name, _tracker(method))
 
-        _check_invariant(inst, condition)
-        value = attr(*args, **kwargs)
-        _check_invariant(inst, condition)
 
-        return value
+# The body of an invariant wrapper, whose first argument is the instance.
+# The invariants are looked up on the class of the instance, so a method
+# inherited by a subclass also checks the subclass's invariants.
+_CHECKED_CALL = [
+    "_covenant_contract = type({first}).__covenant_class__",
+    "if not _covenant_contract.on:",
+    "    return %(call)s",
+    "_covenant_checks = _covenant_contract.checks",
+    "_covenant_check({first}, _covenant_checks)",
+    "_covenant_value = %(call)s",
+    "_covenant_check({first}, _covenant_checks)",
+    "return _covenant_value",
+]
 
+# For asynchronous generators, which can't return a value, the instance is
+# checked before and after delegating to the method's generator.
+_CHECK_ASYNC_GENERATOR = [
+    "_covenant_contract = type({first}).__covenant_class__",
+    "_covenant_on = _covenant_contract.on",
+    "if _covenant_on:",
+    "    _covenant_checks = _covenant_contract.checks",
+    "    _covenant_check({first}, _covenant_checks)",
+    "_covenant_agen = _covenant_func({arguments})",
+]
+_CHECK_ASYNC_GENERATOR_AFTER = [
+    "if _covenant_on:",
+    "    _covenant_check({first}, _covenant_checks)",
+]
+
+_CALLS = {
+    "function": "_covenant_func({arguments})",
+    "coroutine": "await _covenant_func({arguments})",
+    "generator": "(yield from _covenant_func({arguments}))",
+}
+
+
+def _invariant_wrapper(attr, tracking=False):
+    kind = function_kind(attr)
+    if kind == "asyncgen":
+        body = (_CHECK_ASYNC_GENERATOR + _DELEGATE_ASYNC +
+                _CHECK_ASYNC_GENERATOR_AFTER)
+    else:
+        body = [line % {"call": _CALLS[kind]} for line in _CHECKED_CALL]
+    wrapper = generate(attr, body, kind in ("coroutine", "asyncgen"),
+                       _covenant_check=_check_changed if tracking
+                       else _check_invariants)
+    wrapper.__covenant_invariant__ = True
     return wrapper
 
 
-@toggled_decorator_func
-def invariant(condition):
+class _LazyInvariantMethod(object):
+    """Placeholder that installs an invariant wrapper on first access."""
+
+    def __init__(self, cls, name, attr):
+        self.cls = cls
+        self.name = name
+        self.attr = attr
+
+    def __get__(self, obj, objtype=None):
+        wrapper = _invariant_wrapper(
+            self.attr, vars(self.cls)["__covenant_class__"].tracking)
+        setattr(self.cls, self.name, wrapper)
+        return wrapper.__get__(obj, objtype)
+
+
+def _unwrap_invariant(attr):
+    """Return the method inside an invariant wrapper or placeholder."""
+    if isinstance(attr, _LazyInvariantMethod):
+        return attr.attr
+    if getattr(attr, "__covenant_invariant__", False):
+        return attr.__wrapped__
+    return attr
+
+
+def _is_method(attr):
+    return (isfunction(attr) and
+            (attr.__code__.co_argcount or attr.__code__.co_flags & CO_VARARGS) and
+            not getattr(attr, "__covenant_tracker__", False))
+
+
+def _methods(cls):
+    """Yield the name and function of each instance method visible on `cls`
+    that isn't checked against the invariants yet."""
+    seen = set()
+    for klass in cls.__mro__:
+        if klass is object:
+            continue
+        for name, attr in vars(klass).items():
+            if name in seen:
+                continue
+            seen.add(name)
+            if _is_method(attr) and not getattr(attr, "__covenant_invariant__",
+                                                False):
+                yield name, attr
+
+
+def _inherit_methods(cls):
+    """Combine the contracts of the methods `cls` overrides with its own."""
+    for name, attr in list(vars(cls).items()):
+        method = _unwrap_invariant(attr)
+        if not isfunction(method):
+            continue
+        for klass in cls.__mro__[1:]:
+            if name in vars(klass):
+                inherited = get_contract(_unwrap_invariant(vars(klass)[name]))
+                if inherited is not None:
+                    setattr(cls, name, inherit(method, inherited))
+                break
+
+
+def _resolve_invariants(cls):
+    """Build the invariant table of `cls` and wrap its methods with it."""
+    own = vars(cls).get("__covenant_class__")
+    bases = [vars(klass)["__covenant_class__"] for klass in cls.__mro__[1:]
+             if "__covenant_class__" in vars(klass)]
+    if own is None and not bases:
+        return
+
+    if own is None:
+        own = _ClassContract(cls)
+    checks = []
+    exclude = set(own.exclude)
+    for contract in reversed(bases):
+        checks.extend(c for c in contract.declared if c not in checks)
+        exclude.update(contract.exclude)
+        own.tracking = own.tracking or contract.tracking
+    checks.extend(own.declared)
+    own.checks = tuple(checks)
+    own.exclude = frozenset(exclude)
+
+    cls.__covenant_class__ = own
+    cls.__covenant_switch__ = own
+    if own.tracking:
+        _install_trackers(cls)
+    for name, attr in list(_methods(cls)):
+        if name not in own.exclude:
+            setattr(cls, name, _LazyInvariantMethod(cls, name, attr))
+
+
+def _resolve(cls):
+    _inherit_methods(cls)
+    _resolve_invariants(cls)
+
+
+def _install_hook(cls):
+    """Have every future subclass of `cls` resolved when it is created."""
+    if getattr(cls, "__covenant_hooked__", False):
+        return
+    original = vars(cls).get("__init_subclass__")
+
+    def __init_subclass__(subclass, **kwargs):
+        if original is not None:
+            original.__get__(None, subclass)(**kwargs)
+        else:
+            super(cls, subclass).__init_subclass__(**kwargs)
+        _resolve(subclass)
+
+    cls.__init_subclass__ = classmethod(__init_subclass__)
+    cls.__covenant_hooked__ = True
+
+
+@strippable
+def invariant(condition, exclude=(), track_changes=False):
     """Enforce a class invariant on the decorated class.
 
     The `condition` must be a callable that takes a class instance as its
@@ -47,14 +287,68 @@ def invariant(condition):
     is called and once after. The invariant is *not* checked multiple times
     within a single call (eg: if the method calls another method).
 
+    For coroutine methods the second check happens once the coroutine has
+    finished. Generator methods are checked when the generator is started
+    and again once it is exhausted.
+
+    Methods named in `exclude` are left unchecked, which is useful for
+    read-only or performance critical methods. Wrappers are installed the
+    first time each method is looked up.
+
+    With `track_changes` assignments and deletions of instance attributes
+    are tracked, through ``__setattr__`` and ``__delattr__``. The check
+    before a method call is then skipped if the instance hasn't been written
+    to since its invariants last held, and the check after it if the method
+    didn't write to it. Changes made in place to an attribute's value, such
+    as appending to a list, or by ``object.__setattr__`` aren't seen, so this
+    suits invariants over attributes that are replaced rather than mutated.
+
+    Subclasses inherit the invariant, together with the contracts of the
+    class's methods as described for :func:`inherit_contracts`.
+
     """
-    def _invariant(cls):
-        for attr_name, attr in getmembers(cls, isfunction):
-            if 'self' in getargspec(attr).args:
-                wrapper = _invariant_wrapper(attr, condition)
-                setattr(cls, attr_name, wrapper)
+    exclude = frozenset(exclude)
 
+    def _invariant(cls):
+        check = Check(condition, "invariant", cls)
+        contract = vars(cls).get("__covenant_class__")
+        if contract is None:
+            if not getattr(cls, "__covenant_hooked__", False):
+                _inherit_methods(cls)
+            contract = _ClassContract(cls)
+        contract.declared += (check,)
+        contract.exclude |= exclude
+        contract.tracking = contract.tracking or track_changes
+        cls.__covenant_class__ = contract
+        _resolve_invariants(cls)
+        _install_hook(cls)
         return cls
     return _invariant
 
-__all__ = ["invariant"]
+
+@strippable_decorator
+def inherit_contracts(cls):
+    """Make subclasses of the decorated class inherit its contracts.
+
+    When a subclass is created its methods that override a method with
+    preconditions or postconditions are wrapped to honour them too, following
+    the Liskov substitution principle: the overriding method's preconditions
+    may only weaken the inherited ones, so a call is accepted if it satisfies
+    either, while both sets of postconditions must hold. An override without
+    preconditions of its own keeps the inherited ones, and one overriding a
+    method that has only postconditions accepts every call. Invariants of
+    every ancestor class are checked as well.
+
+    The combined contracts are worked out once, when each class is created,
+    which raises TypeError if an override renames or drops a parameter that
+    the inherited conditions refer to.
+    :func:`invariant` implies this decorator.
+
+    """
+    if not getattr(cls, "__covenant_hooked__", False):
+        _resolve(cls)
+    _install_hook(cls)
+    return cls
+
+
+__all__ = ["invariant", "inherit_contracts"]
@@ -0,0 +1,380 @@
+"""Composable predicates that covenant can compile into flat check functions.
+
+Predicates describe a condition on a single value::
+
+    gt(0) & lt(10)
+    isinstance_of(str) & len_le(80)
+    or_(eq(None), between(1, 5))
+
+and :func:`where`, :func:`returns` and :func:`attributes` apply them to the
+arguments of a function, its return value or the attributes of an object::
+
+    @pre(where(x=gt(0), name=isinstance_of(str)))
+    @post(returns(ge(0)))
+    def some_function(x, name):
+        ...
+
+    @invariant(attributes(size=ge(0)))
+    class SomeClass(object):
+        ...
+
+Each of these is compiled once into a single Python expression, so checking
+it costs one function call however many clauses it has. When the check fails
+the clauses are evaluated again one by one to find the one that failed, and a
+:exc:`ValueError` naming the argument, its value and the clause is raised.
+
+"""
+from abc import ABC, abstractmethod
+from inspect import Parameter, Signature
+from reprlib import repr as _repr
+
+
+def _constant(env, value):
+    name = "_covenant_c%d" % len(env)
+    env[name] = value
+    return name
+
+
+class Predicate(ABC):
+    """A condition on a single value.
+
+    Subclasses implement :meth:`_source`, returning a Python expression that
+    tests the value held in the variable `var`; any objects the expression
+    needs are stored in the `env` dict under names from :func:`_constant`.
+
+    """
+    _compiled = None
+
+    @abstractmethod
+    def _source(self, var, env):
+        """Return the expression testing the value held in `var`."""
+
+    def _compile(self):
+        if self._compiled is None:
+            env = {}
+            source = self._source("value", env)
+            self._compiled = eval("lambda value: %s" % source, env)
+        return self._compiled
+
+    def _holds(self, value):
+        try:
+            return bool(self._compile()(value))
+        except Exception:
+            return False
+
+    def _failure(self, value):
+        """Describe the clause that `value` fails."""
+        return repr(self)
+
+    def __call__(self, value):
+        try:
+            if self._compile()(value):
+                return True
+        except Exception:
+            pass
+        raise ValueError("%s failed %s" % (_repr(value), self._failure(value)))
+
+    def __and__(self, other):
+        return and_(self, other)
+
+    def __or__(self, other):
+        return or_(self, other)
+
+    def __invert__(self):
+        return not_(self)
+
+
+def _predicate(obj):
+    if isinstance(obj, Predicate):
+        return obj
+    elif callable(obj):
+        return satisfies(obj)
+    raise TypeError("Expected a predicate or callable, got %r" % (obj,))
+
+
+class _Template(Predicate):
+    def __init__(self, name, template, *args):
+        self.name = name
+        self.template = template
+        self.args = args
+
+    def _source(self, var, env):
+        names = [_constant(env, arg) for arg in self.args]
+        return "(%s)" % self.template.format(*names, v=var)
+
+    def __repr__(self):
+        return "%s(%s)" % (self.name, ", ".join(map(repr, self.args)))
+
+
+def gt(bound):
+    """The value is greater than `bound`."""
+    return _Template("gt", "{v} > {0}", bound)
+
+
+def ge(bound):
+    """The value is greater than or equal to `bound`."""
+    return _Template("ge", "{v} >= {0}", bound)
+
+
+def lt(bound):
+    """The value is less than `bound`."""
+    return _Template("lt", "{v} < {0}", bound)
+
+
+def le(bound):
+    """The value is less than or equal to `bound`."""
+    return _Template("le", "{v} <= {0}", bound)
+
+
+def eq(other):
+    """The value equals `other`."""
+    return _Template("eq", "{v} == {0}", other)
+
+
+def ne(other):
+    """The value does not equal `other`."""
+    return _Template("ne", "{v} != {0}", other)
+
+
+def between(low, high):
+    """The value lies between `low` and `high`, inclusive."""
+    return _Template("between", "{0} <= {v} <= {1}", low, high)
+
+
+def one_of(*choices):
+    """The value is one of `choices`."""
+    return _Template("one_of", "{v} in {0}", choices)
+
+
+def isinstance_of(types):
+    """The value is an instance of `types` (a type or tuple of types)."""
+    return _Template("isinstance_of", "isinstance({v}, {0})", types)
+
+
+def len_le(n):
+    """The value's length is at most `n`."""
+    return _Template("len_le", "len({v}) <= {0}", n)
+
+
+def len_ge(n):
+    """The value's length is at least `n`."""
+    return _Template("len_ge", "len({v}) >= {0}", n)
+
+
+def len_eq(n):
+    """The value's length is exactly `n`."""
+    return _Template("len_eq", "len({v}) == {0}", n)
+
+
+class satisfies(Predicate):
+    """The callable `func` returns a true value for the value."""
+
+    def __init__(self, func, name=None):
+        self.func = func
+        self.name = name or getattr(func, "__name__", repr(func))
+
+    def _source(self, var, env):
+        return "%s(%s)" % (_constant(env, self.func), var)
+
+    def __repr__(self):
+        return "satisfies(%s)" % self.name
+
+
+class and_(Predicate):
+    """Every one of `predicates` holds."""
+
+    def __init__(self, *predicates):
+        flat = []
+        for predicate in map(_predicate, predicates):
+            if isinstance(predicate, and_):
+                flat.extend(predicate.predicates)
+            else:
+                flat.append(predicate)
+        self.predicates = tuple(flat)
+
+    def _source(self, var, env):
+        if not self.predicates:
+            return "True"
+        return "(%s)" % " and ".join(p._source(var, env) for p in self.predicates)
+
+    def _failure(self, value):
+        for predicate in self.predicates:
+            if not predicate._holds(value):
+                return predicate._failure(value)
+        return repr(self)
+
+    def __repr__(self):
+        return " & ".join(map(repr, self.predicates))
+
+
+class or_(Predicate):
+    """At least one of `predicates` holds."""
+
+    def __init__(self, *predicates):
+        self.predicates = tuple(map(_predicate, predicates))
+
+    def _source(self, var, env):
+        if not self.predicates:
+            return "False"
+        return "(%s)" % " or ".join(p._source(var, env) for p in self.predicates)
+
+    def __repr__(self):
+        return "(%s)" % " | ".join(map(repr, self.predicates))
+
+
+class not_(Predicate):
+    """`predicate` does not hold."""
+
+    def __init__(self, predicate):
+        self.predicate = _predicate(predicate)
+
+    def _source(self, var, env):
+        return "(not %s)" % self.predicate._source(var, env)
+
+    def __repr__(self):
+        return "~%r" % (self.predicate,)
+
+
+class _Fields(object):
+    """Predicates applied to several named values, compiled into one function.
+
+    Subclasses choose the parameters of the generated function and the
+    expression that reads each named value. The instance's signature lists
+    the same parameters, without the catch-all for arguments it doesn't
+    check, so that covenant passes it only the values it needs.
+
+    """
+    def __init__(self, **predicates):
+        self.predicates = dict((name, _predicate(p))
+                               for name, p in predicates.items())
+        env = {}
+        clauses = [p._source(self._accessor(name), env)
+                   for name, p in self._all_predicates()]
+        source = "def check(%s):\n    return %s\n" % (
+            ", ".join(self._parameters()), " and ".join(clauses) or "True")
+        exec(source, env)
+        self._check = env["check"]
+        self.__signature__ = Signature([
+            Parameter(name, Parameter.POSITIONAL_OR_KEYWORD)
+            for name in self._parameters() if not name.startswith("*")])
+
+    def _all_predicates(self):
+        return sorted(self.predicates.items())
+
+    def _accessor(self, name):
+        return name
+
+    def _parameters(self):
+        return sorted(self.predicates) + ["**_covenant_rest"]
+
+    def _explain(self, values):
+        for name, predicate in self._all_predicates():
+            try:
+                value = values[name]
+            except KeyError:
+                return "%s is missing" % self._describe(name)
+            if not predicate._holds(value):
+                return "%s=%s failed %s" % (self._describe(name), _repr(value),
+                                            predicate._failure(value))
+        return "check failed"
+
+    def _describe(self, name):
+        return "argument %s" % name
+
+    def __repr__(self):
+        return "%s(%s)" % (type(self).__name__, ", ".join(
+            "%s=%r" % item for item in self._all_predicates()))
+
+
+class where(_Fields):
+    """Apply predicates to a function's arguments, given by keyword.
+
+    For use with :func:`~covenant.pre`::
+
+        @pre(where(x=gt(0), y=isinstance_of(str)))
+
+    """
+    def __call__(self, *values, **arguments):
+        try:
+            if self._check(*values, **arguments):
+                return True
+        except Exception:
+            pass
+        arguments.update(zip(sorted(self.predicates), values))
+        raise ValueError(self._explain(arguments))
+
+
+class returns(_Fields):
+    """Apply a predicate to the return value, and optionally to arguments.
+
+    For use with :func:`~covenant.post`::
+
+        @post(returns(ge(0), x=gt(0)))
+
+    """
+    def __init__(self, predicate, **arguments):
+        self.result = _predicate(predicate)
+        _Fields.__init__(self, **arguments)
+
+    def _all_predicates(self):
+        return ([("_covenant_result", self.result)] +
+                _Fields._all_predicates(self))
+
+    def _parameters(self):
+        return ["_covenant_result"] + sorted(self.predicates) + ["**_covenant_rest"]
+
+    def _describe(self, name):
+        if name == "_covenant_result":
+            return "return value"
+        return _Fields._describe(self, name)
+
+    def __call__(self, _covenant_result, *values, **arguments):
+        try:
+            if self._check(_covenant_result, *values, **arguments):
+                return True
+        except Exception:
+            pass
+        arguments.update(zip(sorted(self.predicates), values))
+        arguments["_covenant_result"] = _covenant_result
+        raise ValueError(self._explain(arguments))
+
+    def __repr__(self):
+        return "returns(%r%s)" % (self.result, "".join(
+            ", %s=%r" % item for item in _Fields._all_predicates(self)))
+
+
+class attributes(_Fields):
+    """Apply predicates to the attributes of an object.
+
+    For use with :func:`~covenant.invariant`::
+
+        @invariant(attributes(size=ge(0), name=isinstance_of(str)))
+
+    """
+    def _accessor(self, name):
+        return "obj.%s" % name
+
+    def _parameters(self):
+        return ["obj"]
+
+    def _describe(self, name):
+        return "attribute %s" % name
+
+    def __call__(self, obj):
+        try:
+            if self._check(obj):
+                return True
+        except Exception:
+            pass
+        values = {}
+        for name in self.predicates:
+            try:
+                values[name] = getattr(obj, name)
+            except AttributeError:
+                pass
+        raise ValueError(self._explain(values))
+
+
+__all__ = ["Predicate", "gt", "ge", "lt", "le", "eq", "ne", "between",
+           "one_of", "isinstance_of", "len_le", "len_ge", "len_eq", "satisfies",
+           "and_", "or_", "not_", "where", "returns", "attributes"]
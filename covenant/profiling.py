@@ -0,0 +1,230 @@
+import os
+import threading
+from time import perf_counter
+from weakref import WeakSet
+
+from covenant.base import export_settings, inherited_setting, on_apply_settings
+
+# Every live contract check, so that profiling can be switched on and off for
+# checks that already exist.
+_CHECKS = WeakSet()
+
+_PROFILING = inherited_setting("profiling", False)
+
+# Held while checks are registered and instrumented, so that a check created
+# while instrumentation changes ends up instrumented like every other.
+_LOCK = threading.Lock()
+
+# Further instrumentation layered over the conditions, such as the coverage
+# collector. Each takes a check and its condition and returns the condition
+# to evaluate in its place.
+_INSTRUMENTS = []
+
+
+class SiteStats(object):
+    """Counters for the evaluations of a single contract condition.
+
+    The counters are plain attributes updated without locking, so under heavy
+    concurrency an occasional update may be lost.
+
+    """
+    __slots__ = ("calls", "total_time", "max_time", "violations")
+
+    def __init__(self):
+        self.calls = 0
+        self.total_time = 0.0
+        self.max_time = 0.0
+        self.violations = 0
+
+    def as_dict(self):
+        return {"calls": self.calls,
+                "total_time": self.total_time,
+                "max_time": self.max_time,
+                "violations": self.violations}
+
+
+def _timed(condition, stats):
+    def timed(*args, **kwargs):
+        start = perf_counter()
+        try:
+            result = condition(*args, **kwargs)
+        except Exception:
+            stats.violations += 1
+            raise
+        finally:
+            elapsed = perf_counter() - start
+            stats.calls += 1
+            stats.total_time += elapsed
+            if elapsed > stats.max_time:
+                stats.max_time = elapsed
+
+        if not result:
+            stats.violations += 1
+        return result
+    return timed
+
+
+def _instrument(check):
+    condition = check.original
+    if _PROFILING:
+        condition = _timed(condition, check.stats)
+    for instrument in _INSTRUMENTS:
+        condition = instrument(check, condition)
+    check.condition = condition
+
+
+def _instrument_all():
+    # Must be called with _LOCK held.
+    for check in list(_CHECKS):
+        _instrument(check)
+
+
+def add_instrument(instrument):
+    """Layer `instrument` over the condition of every check, present and
+    future, until :func:`remove_instrument` is called."""
+    with _LOCK:
+        if instrument not in _INSTRUMENTS:
+            _INSTRUMENTS.append(instrument)
+            _instrument_all()
+
+
+def remove_instrument(instrument):
+    """Stop layering `instrument` over the conditions."""
+    with _LOCK:
+        if instrument in _INSTRUMENTS:
+            _INSTRUMENTS.remove(instrument)
+            _instrument_all()
+
+
+def checks():
+    """Return a list of every contract check that is still alive."""
+    return list(_CHECKS)
+
+
+def register(check):
+    """Track a contract check so that it can be profiled.
+
+    `check` must have `original`, `condition` and `stats` attributes.
+    Evaluation sites always call ``check.condition``, which is replaced by a
+    timed version of ``check.original`` while profiling is enabled, so
+    nothing is added to the call path while it's disabled. The same goes for
+    the instruments added with :func:`add_instrument`.
+
+    """
+    with _LOCK:
+        _CHECKS.add(check)
+        _instrument(check)
+
+
+def enable_profiling():
+    """Start recording per-condition call counts, timings and violations"""
+    _set_profiling(True)
+
+
+def _set_profiling(state):
+    global _PROFILING
+    with _LOCK:
+        _PROFILING = state
+        _instrument_all()
+    export_settings(profiling=state)
+
+
+def disable_profiling():
+    """Stop recording condition statistics
+
+    Statistics collected so far are kept until :func:`reset_profiling`.
+
+    """
+    _set_profiling(False)
+
+
+def is_profiling():
+    """Returns True if condition statistics are being recorded"""
+    return _PROFILING
+
+
+def reset_profiling():
+    """Clear the statistics recorded for every condition"""
+    for check in list(_CHECKS):
+        stats = check.stats
+        stats.calls = stats.violations = 0
+        stats.total_time = stats.max_time = 0.0
+
+
+def snapshot():
+    """Return the statistics recorded for each contract site.
+
+    The result is a list of dicts, one per condition that has been evaluated,
+    with the keys ``function``, ``kind``, ``condition``, ``calls``,
+    ``total_time``, ``max_time`` (both in seconds) and ``violations``,
+    ordered by decreasing total time.
+
+    """
+    sites = []
+    for check in list(_CHECKS):
+        if check.stats.calls:
+            site = {"function": check.site,
+                    "kind": check.kind,
+                    "condition": check.label}
+            site.update(check.stats.as_dict())
+            sites.append(site)
+    sites.sort(key=lambda site: site["total_time"], reverse=True)
+    return sites
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+_METRICS = [
+    ("covenant_condition_calls_total", "counter", "calls",
+     "Number of times a contract condition was evaluated."),
+    ("covenant_condition_seconds_total", "counter", "total_time",
+     "Total time spent evaluating a contract condition."),
+    ("covenant_condition_seconds_max", "gauge", "max_time",
+     "Longest single evaluation of a contract condition."),
+    ("covenant_condition_violations_total", "counter", "violations",
+     "Number of times a contract condition was violated."),
+]
+
+
+def to_prometheus(sites=None):
+    """Render a :func:`snapshot` in the Prometheus text exposition format"""
+    if sites is None:
+        sites = snapshot()
+
+    lines = []
+    for name, metric_type, key, help_text in _METRICS:
+        lines.append("# HELP %s %s" % (name, help_text))
+        lines.append("# TYPE %s %s" % (name, metric_type))
+        for site in sites:
+            labels = 'function="%s",kind="%s",condition="%s"' % (
+                _escape(site["function"]), _escape(site["kind"]),
+                _escape(site["condition"]))
+            lines.append("%s{%s} %r" % (name, labels, site[key]))
+    return "\n".join(lines) + "\n"
+
+
+def _after_fork():
+    global _LOCK
+    _LOCK = threading.Lock()
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+
+def _apply_settings(settings):
+    if "profiling" in settings:
+        _set_profiling(settings["profiling"])
+
+
+on_apply_settings(_apply_settings)
+
+if os.environ.get("COVENANT_COVERAGE"):
+    from covenant.coverage import start_from_environment
+    start_from_environment(os.environ["COVENANT_COVERAGE"])
+
+
+__all__ = ["enable_profiling", "disable_profiling", "is_profiling",
+           "reset_profiling", "snapshot", "to_prometheus"]
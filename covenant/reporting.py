@@ -0,0 +1,228 @@
+import atexit
+import logging
+import os
+import threading
+from collections import namedtuple
+from queue import Queue, Full
+from time import monotonic
+
+from covenant.base import export_settings, inherited_setting, on_apply_settings
+
+logger = logging.getLogger("covenant")
+
+# The violation policy, replaced as a whole so that a reporting thread never
+# pairs the handler of one policy with the queue of another. A handler of
+# None means violations are raised, which keeps the violation path free of
+# any reporting machinery unless another policy is chosen; the queue is then
+# None too.
+_Policy = namedtuple("_Policy", "handler min_interval queue_size queue")
+
+_POLICY = _Policy(None, 1.0, 1000, None)
+_WORKER = None
+_LOCK = threading.Lock()
+
+# Per-site state for rate limiting: site key -> [last report time, suppressed].
+_SITES = {}
+
+_dropped = 0
+
+
+class Violation(object):
+    """A contract violation that was reported rather than raised.
+
+    `function`, `kind` and `condition` identify the contract site, `error` is
+    the :exc:`~covenant.exceptions.ContractViolationError` that would have
+    been raised and `suppressed` counts the violations at the same site that
+    were held back by rate limiting since the previous report.
+
+    """
+    __slots__ = ("function", "kind", "condition", "error", "suppressed")
+
+    def __init__(self, function, kind, condition, error, suppressed=0):
+        self.function = function
+        self.kind = kind
+        self.condition = condition
+        self.error = error
+        self.suppressed = suppressed
+
+    def __str__(self):
+        message = "%s violated in %s (%s): %s" % (
+            self.kind, self.function, self.condition, self.error)
+        if self.suppressed:
+            message += " [%d similar violations suppressed]" % self.suppressed
+        return message
+
+
+def _log(violation):
+    logger.error("Contract violation: %s", violation)
+
+
+def set_violation_policy(policy, min_interval=1.0, queue_size=1000):
+    """Choose what happens when a contract is violated.
+
+    `policy` is "raise" (the default) to raise the violation as an exception,
+    "log" to log it to the ``covenant`` logger, or a callable that receives a
+    :class:`Violation`. With "log" or a callable, the violated function carries
+    on as if the contract had held.
+
+    Reported violations are put on a queue of at most `queue_size` entries
+    and delivered by a background thread, so the calling thread never waits
+    for the handler; if the queue is full the violation is dropped. Each
+    contract site reports at most once per `min_interval` seconds, and the
+    number of violations held back in between is passed along with the next
+    report.
+
+    The "raise" and "log" policies are part of :func:`covenant.settings`, to
+    be carried over to other processes. A callable isn't, since the other
+    process may not be able to import it, so those processes raise.
+
+    """
+    if policy == "raise":
+        handler = None
+    elif policy == "log":
+        handler = _log
+    elif callable(policy):
+        handler = policy
+    else:
+        raise ValueError("Unknown violation policy: %r" % (policy,))
+
+    flush()
+    with _LOCK:
+        _stop_worker()
+        _configure(handler, min_interval, queue_size)
+    export_settings(policy=None if callable(policy) else policy,
+                    min_interval=min_interval, queue_size=queue_size)
+
+
+def _configure(handler, min_interval, queue_size):
+    global _POLICY
+    _POLICY = _Policy(handler, min_interval, queue_size,
+                      Queue(queue_size) if handler is not None else None)
+    _SITES.clear()
+
+
+def get_violation_policy():
+    """Returns "raise", "log" or the callable set with set_violation_policy"""
+    handler = _POLICY.handler
+    if handler is None:
+        return "raise"
+    elif handler is _log:
+        return "log"
+    return handler
+
+
+def _drain(queue):
+    while True:
+        item = queue.get()
+        try:
+            if item is None:
+                return
+            handler, violation = item
+            handler(violation)
+        except Exception:
+            logger.exception("Error in covenant violation handler")
+        finally:
+            queue.task_done()
+
+
+def _start_worker(queue):
+    global _WORKER
+    with _LOCK:
+        # Unless the policy changed meanwhile.
+        if _WORKER is None and _POLICY.queue is queue:
+            _WORKER = threading.Thread(target=_drain, args=(queue,),
+                                       name="covenant-reporter", daemon=True)
+            _WORKER.start()
+
+
+def _stop_worker():
+    # Must be called with _LOCK held.
+    global _WORKER
+    if _WORKER is not None:
+        _POLICY.queue.put(None)
+        _WORKER.join()
+        _WORKER = None
+
+
+def violated(check, error):
+    """Handle a violation of `check` according to the violation policy.
+
+    Under the default policy `error` is raised; otherwise it is reported in
+    the background and this function returns.
+
+    """
+    global _dropped
+    policy = _POLICY
+    if policy.handler is None:
+        raise error
+
+    key = (check.site, check.kind, check.label)
+    now = monotonic()
+    state = _SITES.get(key)
+    if state is not None and now - state[0] < policy.min_interval:
+        state[1] += 1
+        return
+
+    suppressed = state[1] if state is not None else 0
+    _SITES[key] = [now, 0]
+
+    if _WORKER is None:
+        _start_worker(policy.queue)
+    try:
+        policy.queue.put_nowait((policy.handler, Violation(
+            check.site, check.kind, check.label, error, suppressed)))
+    except Full:
+        _dropped += 1
+
+
+def dropped_violations():
+    """Returns the number of violations dropped because the queue was full"""
+    return _dropped
+
+
+def flush(timeout=None):
+    """Wait until every reported violation has been handed to the handler.
+
+    Returns False if `timeout` seconds passed before the queue was drained.
+
+    """
+    queue = _POLICY.queue
+    if queue is None or _WORKER is None:
+        return True
+
+    with queue.all_tasks_done:
+        return queue.all_tasks_done.wait_for(
+            lambda: not queue.unfinished_tasks, timeout)
+
+
+def _after_fork():
+    # The worker thread doesn't exist in the child, and the lock and queue may
+    # have been in use by threads that don't either.
+    global _LOCK, _WORKER
+    _LOCK = threading.Lock()
+    _WORKER = None
+    _configure(*_POLICY[:3])
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_after_fork)
+
+if inherited_setting("policy") == "log":
+    _configure(_log, inherited_setting("min_interval", 1.0),
+               inherited_setting("queue_size", 1000))
+
+
+def _apply_settings(settings):
+    if "policy" in settings:
+        set_violation_policy(settings["policy"] or "raise",
+                             settings.get("min_interval", 1.0),
+                             settings.get("queue_size", 1000))
+
+
+on_apply_settings(_apply_settings)
+
+atexit.register(flush, 5.0)
+
+
+__all__ = ["Violation", "set_violation_policy", "get_violation_policy",
+           "dropped_violations", "flush"]
@@ -0,0 +1,40 @@
+from itertools import count
+from random import random
+
+from covenant.base import get_sampling
+
+
+def make_sampler(sample=None):
+    """Build a sampler for a contract site.
+
+    `sample` may be a float between 0 and 1, giving the probability that any
+    one call is checked, or an integer N to check every Nth call (starting
+    with the first). If `sample` is None the global default set with
+    :func:`covenant.set_sampling` is used.
+
+    Returns None when every call should be checked, otherwise a callable
+    taking no arguments that returns True for calls that should be checked.
+
+    """
+    if sample is None:
+        sample = get_sampling()
+    if sample is None:
+        return None
+
+    if isinstance(sample, bool):
+        raise TypeError("sample must be a float or an integer, not bool")
+    elif isinstance(sample, int):
+        if sample < 1:
+            raise ValueError("sample interval must be at least 1: %r" % sample)
+        if sample == 1:
+            return None
+        counter = count()
+        return lambda: next(counter) % sample == 0
+    elif isinstance(sample, float):
+        if not 0.0 <= sample <= 1.0:
+            raise ValueError("sample rate must be between 0 and 1: %r" % sample)
+        if sample == 1.0:
+            return None
+        return lambda: random() < sample
+    else:
+        raise TypeError("sample must be a float or an integer: %r" % (sample,))
@@ -0,0 +1,68 @@
+from copy import copy
+from types import SimpleNamespace
+
+from covenant.binding import condition_parameters, make_selector
+
+# Values of these types are copied when captured from an argument path, since
+# the wrapped function could change them in place. Anything else is kept as a
+# reference: immutable values can't change, and for other objects the
+# condition should snapshot the specific state it needs with a callable.
+_SHALLOW_COPY = (list, dict, set, bytearray)
+
+
+def _path_getter(path):
+    name, _, rest = path.partition(".")
+    attributes = rest.split(".") if rest else []
+
+    def get(callargs):
+        value = callargs[name]
+        for attribute in attributes:
+            value = getattr(value, attribute)
+        if isinstance(value, _SHALLOW_COPY):
+            # copy() keeps the type of subclasses such as defaultdict.
+            value = copy(value)
+        return value
+    return get
+
+
+def _callable_getter(func, names):
+    arguments = condition_parameters(func, names)
+    if arguments is None:
+        return lambda callargs: func(**callargs)
+    select = make_selector(arguments)
+    return lambda callargs: func(*select(callargs))
+
+
+def make_snapshots(old, names):
+    """Build the snapshot getters for a postcondition's `old` argument.
+
+    `old` maps names to either a string or a callable. A string is an argument
+    name optionally followed by attribute names, such as ``"self.items"``; its
+    value is captured as is, or as a shallow copy if it is a list, dict, set
+    or bytearray (or an instance of a subclass of one). A callable receives
+    the arguments it names, as conditions do, out of the function's parameter
+    `names`, and its result is captured without copying, so it should
+    compute just the value the condition needs (``lambda self:
+    len(self.items)``).
+
+    Returns a tuple of ``(name, getter)`` pairs, or None if `old` is empty.
+
+    """
+    if not old:
+        return None
+
+    snapshots = []
+    for name, spec in sorted(old.items()):
+        if isinstance(spec, str):
+            snapshots.append((name, _path_getter(spec)))
+        elif callable(spec):
+            snapshots.append((name, _callable_getter(spec, names)))
+        else:
+            raise TypeError("old value %r must be a string or a callable, not %r"
+                            % (name, spec))
+    return tuple(snapshots)
+
+
+def capture(snapshots, callargs):
+    """Capture old values before a call, returning them as a namespace."""
+    return SimpleNamespace(**dict((name, get(callargs)) for name, get in snapshots))
@@ -1,29 +1,64 @@
 from functools import wraps
 
-from covenant.base import is_enabled
+from covenant.base import is_stripped
 
 
-def _null_decorator(obj):
-    return obj
+def optional_arguments(deco):
+    """Allow a decorator to be used bare or called with keyword options.
 
+    The decorated `deco` must take the object being decorated as its first
+    parameter and any options as keyword arguments.
 
-def toggled_decorator(deco):
+    """
     @wraps(deco)
-    def _inner(func):
-        if is_enabled():
-            return deco(func)
-        else:
-            return func
+    def _inner(func=None, **options):
+        if func is None:
+            return lambda func: deco(func, **options)
+        return deco(func, **options)
 
     return _inner
 
 
-def toggled_decorator_func(deco):
+def _identity(obj):
+    return obj
+
+
+def strippable(deco):
+    """Make a decorator factory a no-op when contracts are stripped.
+
+    While stripped, calling the factory returns a decorator that hands back
+    the decorated object unchanged.
+
+    """
+    if not is_stripped():
+        return deco
+
     @wraps(deco)
-    def _inner(*args, **kwargs):
-        if is_enabled():
-            return deco(*args, **kwargs)
-        else:
-            return _null_decorator
+    def _stripped(*args, **kwargs):
+        return _identity
 
-    return _inner
+    return _stripped
+
+
+def strippable_decorator(deco):
+    """Like :func:`strippable`, for a decorator in :func:`optional_arguments`
+    form, which takes the decorated object as its first parameter."""
+    if not is_stripped():
+        return deco
+
+    @wraps(deco)
+    def _stripped(func, **options):
+        return func
+
+    return _stripped
+
+
+def describe(func):
+    """Return a short description of a callable and where it was defined."""
+    name = getattr(func, "__qualname__", None)
+    if name is None:
+        return repr(func)
+    code = getattr(func, "__code__", None)
+    if code is None:
+        return name
+    return "%s (%s:%d)" % (name, code.co_filename, code.co_firstlineno)
@@ -0,0 +1,334 @@
+"""Signature preserving wrappers for contracted functions.
+
+:func:`wrap` generates a wrapper with exactly the parameters of the wrapped
+function, so the interpreter binds the arguments of each call and the wrapper
+collects them into the dict that conditions receive without any further work.
+It can collect just the arguments the conditions name, keeping the others
+aside for :func:`full_arguments` to restore when a violation is reported.
+Checking is delegated to hooks::
+
+    sampled = sample()          # optional; false skips checking the call
+    state = before(callargs)
+    return after(func(...), callargs, state)
+
+:func:`generate` builds such a function around any body, which is how other
+kinds of wrapper are made.
+
+Wrappers of generator and asynchronous generator functions are generators
+themselves, delegating to such a wrapper once they are started.
+
+The source of a wrapper is written with placeholder parameter names, so it
+depends only on the shape of the signature (the kinds of its parameters and
+which of them have defaults) and on its body. It is compiled once per shape,
+and each function gets a copy of the compiled code with the placeholders
+renamed to its own parameter names.
+
+"""
+from functools import update_wrapper
+from inspect import isfunction
+from types import CodeType, FunctionType
+
+from covenant.generators import function_kind
+
+CO_VARARGS = 0x04
+CO_VARKEYWORDS = 0x08
+
+_PREFIX = "_covenant_"
+
+# Key of a partial callargs dict under which the names and values of all the
+# arguments are packed.
+_ALL = _PREFIX + "all"
+
+# Wrapper source -> factory function compiled from it.
+_TEMPLATES = {}
+
+_FACTORY = """\
+def _covenant_factory(_covenant_func{names}):
+    {async_}def wrapper({parameters}):
+{body}
+    return wrapper
+"""
+
+# The parameters, call arguments, call arguments dict and first positional
+# argument of a wrapper that can't reproduce the signature of its function.
+_GENERIC = ("*_covenant_positional, **_covenant_keywords",
+            "*_covenant_positional, **_covenant_keywords",
+            "_covenant_bind(_covenant_positional, _covenant_keywords)",
+            "_covenant_positional[0]")
+
+# Delegation to the generator returned by _covenant_inner, as with yield from.
+_DELEGATE = ["return (yield from _covenant_inner({arguments}))"]
+
+# The same for the asynchronous generator _covenant_agen, forwarding asend()
+# and athrow(). The lines that follow run once it is exhausted.
+_DELEGATE_ASYNC = [
+    "_covenant_step = _covenant_agen.__anext__()",
+    "try:",
+    "    while True:",
+    "        try:",
+    "            _covenant_item = await _covenant_step",
+    "        except StopAsyncIteration:",
+    "            break",
+    "        try:",
+    "            _covenant_sent = yield _covenant_item",
+    "        except GeneratorExit:",
+    "            raise",
+    "        except BaseException as _covenant_error:",
+    "            _covenant_step = _covenant_agen.athrow(_covenant_error)",
+    "        else:",
+    "            _covenant_step = _covenant_agen.asend(_covenant_sent)",
+    "finally:",
+    "    await _covenant_agen.aclose()",
+]
+
+
+def _signature(code, defaults, kwdefaults, needed=None):
+    """Return the parameter names of a code object together with the
+    parameter list, call arguments, callargs dict and first positional
+    argument expressions for it, written with placeholder names, or None if
+    the signature can't be reproduced.
+
+    If `needed` leaves out some parameters the callargs dict only holds the
+    others, and packs all of them under _ALL."""
+    names = code.co_varnames
+    npos = code.co_argcount
+    nposonly = getattr(code, "co_posonlyargcount", 0)
+    nkwonly = code.co_kwonlyargcount
+    varargs = varkw = None
+    index = npos + nkwonly
+    if code.co_flags & CO_VARARGS:
+        varargs = names[index]
+        index += 1
+    if code.co_flags & CO_VARKEYWORDS:
+        varkw = names[index]
+
+    positional = names[:npos]
+    kwonly = names[npos:npos + nkwonly]
+    every = positional + kwonly + tuple(n for n in (varargs, varkw) if n)
+    if any(name.startswith(_PREFIX) for name in every):
+        return None
+    placeholders = dict((name, "%sp%d" % (_PREFIX, i))
+                        for i, name in enumerate(every))
+    varargs = varargs and placeholders[varargs]
+    varkw = varkw and placeholders[varkw]
+    kwonly = [(placeholders[name], name in (kwdefaults or {}))
+              for name in kwonly]
+    positional = [placeholders[name] for name in positional]
+
+    first_default = npos - len(defaults or ())
+    parameters = []
+    for i, name in enumerate(positional):
+        parameters.append(name + "=None" if i >= first_default else name)
+        if i == nposonly - 1:
+            parameters.append("/")
+    if varargs:
+        parameters.append("*" + varargs)
+    elif kwonly:
+        parameters.append("*")
+    parameters.extend(name + "=None" if default else name
+                      for name, default in kwonly)
+    if varkw:
+        parameters.append("**" + varkw)
+
+    arguments = list(positional)
+    if varargs:
+        arguments.append("*" + varargs)
+    arguments.extend("%s=%s" % (name, name) for name, _ in kwonly)
+    if varkw:
+        arguments.append("**" + varkw)
+
+    collected = [placeholders[name] for name in every
+                 if needed is None or name in needed]
+    callargs = ", ".join("%r: %s" % (placeholder, placeholder)
+                         for placeholder in collected)
+    if len(collected) < len(every):
+        every_placeholder = tuple(placeholders.values())
+        callargs += "%s%r: (%r, (%s,))" % (
+            ", " if collected else "", _ALL, every_placeholder,
+            ", ".join(every_placeholder))
+    callargs = "{%s}" % callargs
+    if positional:
+        first = positional[0]
+    elif varargs:
+        first = varargs + "[0]"
+    else:
+        first = "None"
+    return (every, ", ".join(parameters), ", ".join(arguments), callargs,
+            first)
+
+
+def _factory(source):
+    factory = _TEMPLATES.get(source)
+    if factory is None:
+        namespace = {}
+        exec(compile(source, "<covenant>", "exec"), namespace)
+        factory = _TEMPLATES[source] = namespace["_covenant_factory"]
+    return factory
+
+
+def _rename(value, names):
+    if isinstance(value, str):
+        return names.get(value, value)
+    if isinstance(value, tuple):
+        return tuple(_rename(item, names) for item in value)
+    return value
+
+
+def _specialize(factory, names, **changes):
+    """Return a copy of the template `factory` whose wrapper has the
+    parameter names `names` in place of the placeholders, and the further
+    code object `changes`."""
+    names = dict(("%sp%d" % (_PREFIX, i), name) for i, name in enumerate(names))
+    code = factory.__code__
+    consts = []
+    for const in code.co_consts:
+        if isinstance(const, CodeType):
+            # The placeholders appear as local variables, and as strings in
+            # the callargs keys and the keyword argument names of the call.
+            const = const.replace(
+                co_varnames=tuple(names.get(name, name)
+                                  for name in const.co_varnames),
+                co_consts=_rename(const.co_consts, names), **changes)
+        consts.append(const)
+    return FunctionType(code.replace(co_consts=tuple(consts)),
+                        factory.__globals__)
+
+
+def generate(func, body, asynchronous=False, needed=None, **env):
+    """Return a function with the signature of `func` that runs `body`.
+
+    `body` is a list of source lines making up the function's body. They may
+    refer to `func` as ``_covenant_func`` and to the values of `env`, whose
+    names must start with ``_covenant_``, and they are formatted with the
+    fields ``{arguments}``, the function's arguments as they would be passed
+    on to `func`, ``{callargs}``, an expression for the dict of call
+    arguments as returned by :func:`inspect.getcallargs`, and ``{first}``,
+    the first positional argument. With `asynchronous` the function is
+    defined with ``async def``.
+
+    `needed` is None or the names of the parameters that ``{callargs}`` must
+    hold. The others are then only packed away in it, to be restored by
+    :func:`full_arguments`, which saves building a large dict for a function
+    with many parameters.
+
+    The function has the name, docstring, attributes and signature of `func`
+    and refers back to it through ``__wrapped__``. Callables that aren't plain
+    Python functions, such as bound methods, partials and callable objects,
+    get a generic ``(*args, **kwargs)`` function.
+
+    """
+    defaults = kwdefaults = signature = None
+    if isfunction(func):
+        defaults = func.__defaults__
+        kwdefaults = func.__kwdefaults__
+        signature = _signature(func.__code__, defaults, kwdefaults, needed)
+    if signature is None:
+        parameters, arguments, callargs, first = _GENERIC
+        if any("{callargs}" in line for line in body):
+            from covenant.binding import make_binder
+            env["_covenant_bind"] = make_binder(func)
+    else:
+        names, parameters, arguments, callargs, first = signature
+
+    env = sorted(env.items())
+    body = "\n".join("        " + line.format(arguments=arguments,
+                                              callargs=callargs, first=first)
+                     for line in body)
+    source = _FACTORY.format(names="".join(", " + name for name, _ in env),
+                             async_="async " if asynchronous else "",
+                             parameters=parameters, body=body)
+
+    # Name the code object after func so that tracebacks show its name.
+    changes = {}
+    name = getattr(func, "__name__", None)
+    if name is not None:
+        changes["co_name"] = name
+        if hasattr(CodeType, "co_qualname"):
+            changes["co_qualname"] = getattr(func, "__qualname__", name)
+
+    factory = _factory(source)
+    values = [value for _, value in env]
+    if signature is not None:
+        wrapper = _specialize(factory, names, **changes)(func, *values)
+        wrapper.__defaults__ = defaults
+        wrapper.__kwdefaults__ = kwdefaults
+    else:
+        wrapper = factory(func, *values)
+        wrapper.__code__ = wrapper.__code__.replace(**changes)
+    return update_wrapper(wrapper, func)
+
+
+def full_arguments(callargs):
+    """Return the dict of every call argument from the `callargs` passed to a
+    wrapper's hooks, which may hold only those it was asked to collect."""
+    packed = callargs.get(_ALL)
+    if packed is None:
+        return callargs
+    return dict(zip(*packed))
+
+
+def wrap(func, switch, before=None, after=None, coroutine=False, sample=None,
+         needed=None):
+    """Return a wrapper that checks calls to `func` while `switch` is on.
+
+    `before` is called with the dict of call arguments, as returned by
+    :func:`inspect.getcallargs`, before `func` runs. `after` is called with
+    the value returned by `func` (awaited if `coroutine` is true), the same
+    dict and whatever `before` returned, and its result is returned to the
+    caller. Either hook may be None. If `needed` is given the dict only holds
+    the arguments it names; see :func:`generate`.
+
+    `sample` is called first, before the call arguments are collected. If it
+    returns a false value the call goes straight through to `func`, as when
+    the switch is off. Otherwise its result is passed to `before` as a second
+    argument, or to `after` in place of the state if there is no `before`.
+
+    The wrapper is made with :func:`generate`. If `func` is a generator or
+    asynchronous generator function, so is the wrapper, and the hooks only
+    run once the generator is started; `after` then receives the generator
+    returned by `func` and should return a generator to delegate to.
+
+    """
+    await_ = "await " if coroutine else ""
+    call = "%s_covenant_func({arguments})" % await_
+    body = ["if not _covenant_switch.on:",
+            "    return " + call]
+    env = {"_covenant_switch": switch}
+
+    state = "None"
+    if sample is not None:
+        body += ["_covenant_sampled = _covenant_sample()",
+                 "if not _covenant_sampled:",
+                 "    return " + call]
+        env["_covenant_sample"] = sample
+        state = "_covenant_sampled"
+    if before is not None or after is not None:
+        body.append("_covenant_args = {callargs}")
+    if before is not None:
+        if sample is not None:
+            state = "_covenant_before(_covenant_args, _covenant_sampled)"
+        else:
+            state = "_covenant_before(_covenant_args)"
+        env["_covenant_before"] = before
+    if after is not None:
+        body += ["_covenant_state = " + state,
+                 "return _covenant_after(%s, _covenant_args, _covenant_state)"
+                 % call]
+        env["_covenant_after"] = after
+    else:
+        if before is not None:
+            body.append(state)
+        body.append("return " + call)
+
+    kind = function_kind(func)
+    if kind == "generator":
+        env = {"_covenant_inner": generate(func, body, needed=needed, **env)}
+        body = _DELEGATE
+    elif kind == "asyncgen":
+        env = {"_covenant_inner": generate(func, body, needed=needed, **env)}
+        body = ["_covenant_agen = _covenant_inner({arguments})"] + _DELEGATE_ASYNC
+        coroutine = True
+    return generate(func, body, coroutine, needed, **env)
+
+
+__all__ = ["wrap", "generate", "full_arguments"]
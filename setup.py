@@ -10,7 +10,6 @@ setup(name='covenant',
       packages=["covenant"],
       keywords="contract",
       platforms=["All"],
-      install_requires=["decorator"],
       classifiers=['Development Status :: 3 - Alpha',
                    'Intended Audience :: Developers',
                    'License :: OSI Approved :: BSD License',
@@ -1,4 +1,7 @@
+import asyncio
 import unittest
+from typing import Literal, Optional
+
 from covenant.annotations import *
 from covenant.exceptions import *
 
@@ -12,3 +15,86 @@ class AnnotationTests(unittest.TestCase):
         foo(20)
         with self.assertRaises(PreconditionViolationError):
             foo(5)
+
+    def test_sampled_annotation(self):
+        @constrain(sample=2)
+        def foo(bar: lambda bar: bar > 10):
+            return bar
+
+        with self.assertRaises(PreconditionViolationError):
+            foo(5)
+        self.assertEqual(foo(5), 5)
+
+
+class HintTests(unittest.TestCase):
+    def test_type_hints(self):
+        @constrain(hints=True)
+        def foo(bar: int, baz: Optional[str] = None) -> list[int]:
+            return [bar]
+
+        self.assertEqual(foo(1, "a"), [1])
+        foo(1)
+        with self.assertRaises(PreconditionViolationError):
+            foo("1")
+        with self.assertRaises(PreconditionViolationError):
+            foo(1, 2)
+
+    def test_return_hint(self):
+        @constrain(hints=True)
+        def foo(bar) -> Literal["r", "w"]:
+            return bar
+
+        self.assertEqual(foo("r"), "r")
+        with self.assertRaises(PostconditionViolationError) as cm:
+            foo("x")
+        self.assertEqual(cm.exception.result, "x")
+
+    def test_mixed_with_predicates(self):
+        @constrain(hints=True)
+        def foo(bar: lambda bar: bar > 10, baz: int):
+            return bar
+
+        foo(20, 1)
+        with self.assertRaises(PreconditionViolationError):
+            foo(5, 1)
+        with self.assertRaises(PreconditionViolationError):
+            foo(20, "1")
+
+    def test_forward_reference(self):
+        @constrain(hints=True)
+        def foo(bar: "Later"):
+            return bar
+
+        globals()["Later"] = Later = type("Later", (), {})
+        try:
+            foo(Later())
+            with self.assertRaises(PreconditionViolationError):
+                foo(1)
+        finally:
+            del globals()["Later"]
+
+    def test_item_sample(self):
+        @constrain(hints=True, item_sample=2)
+        def foo(bar: list[int]):
+            return bar
+
+        foo([1, "a", 2])
+        with self.assertRaises(PreconditionViolationError):
+            foo([1, "a", 2])
+
+    def test_coroutine(self):
+        @constrain(hints=True)
+        async def foo(bar) -> int:
+            return bar
+
+        self.assertEqual(asyncio.run(foo(1)), 1)
+        with self.assertRaises(PostconditionViolationError):
+            asyncio.run(foo("1"))
+
+    def test_hints_off(self):
+        @constrain
+        def foo(bar: lambda bar: bar > 10):
+            return bar
+
+        with self.assertRaises(PreconditionViolationError):
+            foo(5)
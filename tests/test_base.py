@@ -0,0 +1,128 @@
+import threading
+import unittest
+from covenant.base import *
+from covenant.base import Switch
+from covenant.conditions import *
+from covenant.annotations import *
+from covenant.invariant import *
+from covenant.exceptions import *
+
+
+@pre(lambda x: x > 0)
+def positive(x):
+    return x
+
+
+class ToggleTests(unittest.TestCase):
+    def tearDown(self):
+        enable()
+        reset(__name__)
+        reset(positive)
+
+    def test_global(self):
+        disable()
+        self.assertFalse(is_enabled())
+        self.assertEqual(positive(-1), -1)
+        enable()
+        with self.assertRaises(PreconditionViolationError):
+            positive(-1)
+
+    def test_decorated_while_disabled(self):
+        disable()
+
+        @post(lambda r: r > 0)
+        def foo(x):
+            return x
+
+        self.assertEqual(foo(-1), -1)
+        enable()
+        with self.assertRaises(PostconditionViolationError):
+            foo(-1)
+
+    def test_module(self):
+        disable(__name__)
+        self.assertFalse(is_enabled(__name__))
+        self.assertFalse(is_enabled(__name__ + ".sub"))
+        self.assertEqual(positive(-1), -1)
+        reset(__name__)
+        with self.assertRaises(PreconditionViolationError):
+            positive(-1)
+
+    def test_module_overrides_global(self):
+        disable()
+        enable(__name__)
+        with self.assertRaises(PreconditionViolationError):
+            positive(-1)
+
+    def test_function(self):
+        @pre(lambda x: x > 0)
+        def other(x):
+            return x
+
+        disable(positive)
+        self.assertFalse(is_enabled(positive))
+        self.assertEqual(positive(-1), -1)
+        with self.assertRaises(PreconditionViolationError):
+            other(-1)
+
+        disable()
+        enable(positive)
+        with self.assertRaises(PreconditionViolationError):
+            positive(-1)
+
+    def test_constrain_and_invariant(self):
+        @constrain
+        def foo(x: lambda x: x > 0):
+            return x
+
+        @invariant(lambda self: self.value >= 0)
+        class Foo(object):
+            value = 0
+
+            def set(self, value):
+                self.value = value
+
+        disable(foo)
+        disable(Foo)
+        self.assertEqual(foo(-1), -1)
+        Foo().set(-1)
+
+        enable(foo)
+        enable(Foo)
+        with self.assertRaises(PreconditionViolationError):
+            foo(-1)
+        with self.assertRaises(InvariantViolationError):
+            Foo().set(-1)
+
+    def test_not_contracted(self):
+        with self.assertRaises(TypeError):
+            disable(lambda x: x)
+
+
+    def test_concurrent_changes(self):
+        # Switches created and settings changed from many threads at once
+        # must all end up agreeing with the final settings.
+        switches = []
+
+        def work(index):
+            module = "%s.concurrent%d" % (__name__, index % 3)
+            for i in range(200):
+                switches.append(Switch(module))
+                if i % 2:
+                    disable(module)
+                else:
+                    enable(module)
+            reset(module)
+
+        threads = [threading.Thread(target=work, args=(i,)) for i in range(6)]
+        for thread in threads:
+            thread.start()
+        disable(__name__)
+        for thread in threads:
+            thread.join()
+        self.assertFalse(any(switch.on for switch in switches))
+        self.assertFalse(is_enabled(__name__ + ".concurrent0"))
+
+
+if __name__ == "__main__":
+    unittest.main()
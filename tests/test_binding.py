@@ -0,0 +1,96 @@
+import unittest
+from inspect import getcallargs
+from covenant.binding import make_binder, condition_parameters, make_selector
+
+
+def plain(a, b):
+    pass
+
+
+def with_defaults(a, b=2, c=3):
+    pass
+
+
+def with_varargs(a, *rest):
+    pass
+
+
+def with_kwonly(a, *, b, c=3):
+    pass
+
+
+def with_everything(a, b=2, *rest, c=3, **extra):
+    pass
+
+
+class BinderTests(unittest.TestCase):
+    def assertBindsLike(self, func, *args, **kwargs):
+        bind = make_binder(func)
+        self.assertEqual(bind(args, kwargs), getcallargs(func, *args, **kwargs))
+
+    def test_positional(self):
+        self.assertBindsLike(plain, 1, 2)
+        self.assertBindsLike(with_defaults, 1)
+        self.assertBindsLike(with_defaults, 1, 5)
+        self.assertBindsLike(with_defaults, 1, 5, 6)
+
+    def test_keyword(self):
+        self.assertBindsLike(plain, a=1, b=2)
+        self.assertBindsLike(with_defaults, c=1, a=2)
+
+    def test_mixed(self):
+        self.assertBindsLike(plain, 1, b=2)
+        self.assertBindsLike(with_defaults, 1, c=4)
+
+    def test_varargs(self):
+        self.assertBindsLike(with_varargs, 1)
+        self.assertBindsLike(with_varargs, 1, 2, 3)
+
+    def test_kwonly(self):
+        self.assertBindsLike(with_kwonly, 1, b=2)
+        self.assertBindsLike(with_kwonly, a=1, b=2, c=4)
+
+    def test_everything(self):
+        self.assertBindsLike(with_everything, 1)
+        self.assertBindsLike(with_everything, 1, 2, 3, 4)
+        self.assertBindsLike(with_everything, 1, c=5, d=6)
+
+    def test_invalid_call(self):
+        bind = make_binder(plain)
+        with self.assertRaises(TypeError):
+            bind((1,), {})
+        with self.assertRaises(TypeError):
+            bind((1, 2, 3), {})
+        with self.assertRaises(TypeError):
+            bind((), {"a": 1, "c": 2})
+
+
+class ConditionParameterTests(unittest.TestCase):
+    names = ["self", "x", "y", "args"]
+
+    def test_subset(self):
+        self.assertEqual(condition_parameters(lambda y, x: 0, self.names),
+                         ("y", "x"))
+        self.assertEqual(condition_parameters(lambda: 0, self.names), ())
+
+    def test_skip_and_keyword(self):
+        self.assertEqual(condition_parameters(lambda r, x, old: 0, self.names,
+                                              skip=1, keyword="old"), ("x",))
+        self.assertIsNone(condition_parameters(lambda r, x: 0, self.names,
+                                               skip=1, keyword="old"))
+        self.assertIsNone(condition_parameters(lambda: 0, self.names, skip=1))
+
+    def test_keywords_needed(self):
+        for condition in (lambda x, **rest: 0, lambda *args: 0,
+                          lambda x, *, y: 0, lambda x, z=1: 0, len):
+            self.assertIsNone(condition_parameters(condition, self.names))
+
+    def test_selector(self):
+        callargs = {"x": 1, "y": 2, "z": 3}
+        self.assertEqual(make_selector(("z", "x"))(callargs), (3, 1))
+        self.assertEqual(make_selector(("y",))(callargs), (2,))
+        self.assertEqual(make_selector(())(callargs), ())
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,97 @@
+import unittest
+from covenant.annotations import *
+from covenant.caching import *
+from covenant.conditions import *
+from covenant.exceptions import *
+
+
+class CacheTests(unittest.TestCase):
+    def test_repeated_arguments(self):
+        calls = []
+
+        @pre(lambda key, default=None: calls.append(key) or key != "bad",
+             cache=True)
+        def lookup(key, default=None):
+            return key
+
+        for i in range(5):
+            lookup("a")
+        lookup(key="a")
+        lookup("b")
+        self.assertEqual(calls, ["a", "b"])
+        info = cache_info(lookup)[0]
+        self.assertEqual((info["hits"], info["misses"], info["currsize"]), (5, 2, 2))
+
+    def test_failures_not_cached(self):
+        calls = []
+
+        @pre(lambda x: calls.append(x) or x > 0, cache=True)
+        def foo(x):
+            return x
+
+        for i in range(2):
+            with self.assertRaises(PreconditionViolationError):
+                foo(0)
+        self.assertEqual(calls, [0, 0])
+
+    def test_types_distinguished(self):
+        @pre(lambda x: isinstance(x, int) and not isinstance(x, bool), cache=True)
+        def foo(x):
+            return x
+
+        foo(1)
+        with self.assertRaises(PreconditionViolationError):
+            foo(True)
+
+    def test_unhashable(self):
+        calls = []
+
+        @pre(lambda xs: calls.append(xs) or True, cache=True)
+        def foo(xs):
+            return xs
+
+        foo([1])
+        foo([1])
+        self.assertEqual(len(calls), 2)
+
+    def test_bounded(self):
+        calls = []
+
+        @pre(lambda x: calls.append(x) or True, cache=2)
+        def foo(x):
+            return x
+
+        for x in [1, 2, 1, 3, 1, 2]:
+            foo(x)
+        # 2 is evicted when 3 is added because 1 was used more recently.
+        self.assertEqual(calls, [1, 2, 3, 2])
+        self.assertEqual(cache_info(foo)[0]["currsize"], 2)
+
+    def test_constrain(self):
+        calls = []
+
+        @constrain(cache=True)
+        def foo(x: lambda x: calls.append(x) or x > 0, y: lambda y: True):
+            return x
+
+        foo(1, [])
+        foo(1, [])
+        self.assertEqual(calls, [1])
+        self.assertEqual(len(cache_info(foo)), 2)
+
+    def test_not_cached_by_default(self):
+        @pre(lambda x: True)
+        def foo(x):
+            return x
+
+        self.assertEqual(cache_info(foo), [])
+        with self.assertRaises(TypeError):
+            cache_info(lambda x: x)
+
+    def test_invalid_cache(self):
+        with self.assertRaises(ValueError):
+            pre(lambda x: True, cache=0)(lambda x: x)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -24,6 +24,15 @@ class PreconditionTests(unittest.TestCase):
         with self.assertRaises(PreconditionViolationError):
             f.foo(5)
 
+    def test_bound_method(self):
+        class Foo(object):
+            def foo(self, x):
+                return x
+        foo = pre(lambda self, x: x > 0)(Foo().foo)
+        self.assertEqual(foo(1), 1)
+        with self.assertRaises(PreconditionViolationError):
+            foo(0)
+
     def test_two_preconditions(self):
         @pre(lambda x: x < 10)
         @pre(lambda x: x > 3)
@@ -130,6 +139,183 @@ class PostconditionTest(unittest.TestCase):
             foo()
 
 
+class FusedContractTests(unittest.TestCase):
+    def test_single_wrapper(self):
+        def foo(a):
+            return a * 2
+        wrapped = post(lambda r, a: r > 0)(pre(lambda a: a > 1)(pre(lambda a: a < 10)(foo)))
+        self.assertIs(wrapped.__wrapped__, foo)
+        self.assertEqual(wrapped.__name__, "foo")
+        self.assertEqual(len(wrapped.__covenant__.preconditions), 2)
+        self.assertEqual(len(wrapped.__covenant__.postconditions), 1)
+
+    def test_evaluation_order(self):
+        calls = []
+
+        def record(name):
+            def condition(*args, **kwargs):
+                calls.append(name)
+                return True
+            return condition
+
+        @post(record("post outer"))
+        @pre(record("pre outer"))
+        @post(record("post inner"))
+        @pre(record("pre inner"))
+        def foo(a):
+            calls.append("call")
+
+        foo(1)
+        self.assertEqual(calls, ["pre outer", "pre inner", "call",
+                                 "post inner", "post outer"])
+
+    def test_inner_wrapper_unchanged(self):
+        @pre(lambda a: a > 1)
+        def foo(a):
+            return a
+
+        bar = pre(lambda a: a < 10)(foo)
+        self.assertEqual(foo(20), 20)
+        with self.assertRaises(PreconditionViolationError):
+            bar(20)
+
+
+class SamplingTests(unittest.TestCase):
+    def test_every_nth_call(self):
+        calls = []
+
+        @pre(lambda x: calls.append(x) or True, sample=3)
+        def foo(x):
+            return x
+
+        for i in range(7):
+            foo(i)
+        self.assertEqual(calls, [0, 3, 6])
+
+    def test_sampled_violation_raises(self):
+        @pre(lambda x: x > 0, sample=2)
+        def foo(x):
+            return x
+
+        with self.assertRaises(PreconditionViolationError):
+            foo(-1)
+        self.assertEqual(foo(-1), -1)
+
+    def test_rate(self):
+        @post(lambda r: False, sample=0.0)
+        def never(x):
+            return x
+
+        @post(lambda r: False, sample=1.0)
+        def always(x):
+            return x
+
+        self.assertEqual(never(1), 1)
+        with self.assertRaises(PostconditionViolationError):
+            always(1)
+
+    def test_rates_of_several_checks(self):
+        calls = []
+
+        @pre(lambda x: calls.append(("pre", x)) or True, sample=2)
+        @post(lambda r: calls.append(("post", r)) or True, sample=3)
+        def foo(x):
+            return x
+
+        for i in range(6):
+            foo(i)
+        self.assertEqual(calls, [("pre", 0), ("post", 0), ("pre", 2),
+                                 ("post", 3), ("pre", 4)])
+
+    def test_invalid_sample(self):
+        with self.assertRaises(ValueError):
+            pre(lambda x: True, sample=1.5)(lambda x: x)
+        with self.assertRaises(ValueError):
+            pre(lambda x: True, sample=0)(lambda x: x)
+
+    def test_global_default(self):
+        from covenant.base import set_sampling
+        calls = []
+        set_sampling(2)
+        try:
+            @pre(lambda x: calls.append(x) or True)
+            def foo(x):
+                return x
+
+            @pre(lambda x: calls.append(x) or True, sample=1)
+            def bar(x):
+                return x
+        finally:
+            set_sampling(None)
+
+        for i in range(4):
+            foo(i)
+        bar(10)
+        self.assertEqual(calls, [0, 2, 10])
+
+
+class ArgumentSelectionTests(unittest.TestCase):
+    def test_only_named_arguments(self):
+        @pre(lambda y: y > 0)
+        @post(lambda r, x: r == x)
+        def foo(x, y, *args, **kwargs):
+            return x
+
+        self.assertEqual(foo(1, 2, 3, z=4), 1)
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(1, 0)
+        self.assertEqual(cm.exception.arguments,
+                         {"x": 1, "y": 0, "args": (), "kwargs": {}})
+
+    def test_order_of_condition(self):
+        @pre(lambda b, a: b > a)
+        def foo(a, b):
+            return a
+
+        self.assertEqual(foo(b=2, a=1), 1)
+        with self.assertRaises(PreconditionViolationError):
+            foo(2, 1)
+
+    def test_keyword_condition(self):
+        received = []
+
+        @pre(lambda x, **rest: received.append(rest) or True)
+        def foo(x, y=2):
+            return x
+
+        foo(1)
+        self.assertEqual(received, [{"y": 2}])
+
+    def test_unknown_parameter(self):
+        @pre(lambda z: True)
+        def foo(x):
+            return x
+
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(1)
+        self.assertIsInstance(cm.exception.__cause__, TypeError)
+
+    def test_old_values(self):
+        @post(lambda r, items, old: len(items) == len(old.items) + 1,
+              old={"items": "items"})
+        def push(items, item, log=None):
+            items.append(item)
+
+        self.assertEqual(push.__covenant_checks__[0].arguments, ("items",))
+        push([], 1)
+
+    def test_cache_keyed_on_condition_arguments(self):
+        calls = []
+
+        @pre(lambda x: calls.append(x) or True, cache=True)
+        def foo(x, y):
+            return x
+
+        foo(1, 2)
+        foo(1, 3)
+        self.assertEqual(calls, [1])
+
+
 class PostAndPreconditionTests(unittest.TestCase):
     def test_post_and_pre(self):
         @post(lambda r, a: r == a * 2)
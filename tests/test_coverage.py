@@ -0,0 +1,177 @@
+import io
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import threading
+import unittest
+from contextlib import redirect_stdout
+
+from covenant.annotations import *
+from covenant.conditions import *
+from covenant.coverage import *
+from covenant.coverage import main
+from covenant import coverage
+from covenant.invariant import *
+from covenant.exceptions import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def _site(sites, function, kind):
+    for site in sites:
+        if site["function"].endswith(function) and site["kind"] == kind:
+            return site
+
+
+class CoverageTests(unittest.TestCase):
+    def setUp(self):
+        reset_coverage()
+        enable_coverage()
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        disable_coverage()
+        reset_coverage()
+        shutil.rmtree(self.directory)
+
+    def test_hits_and_shapes(self):
+        @post(lambda r, x: True)
+        @pre(lambda x: True)
+        def foo(x):
+            return x
+
+        foo(1)
+        foo(2)
+        foo("a")
+
+        sites = coverage_snapshot()
+        pre_site = _site(sites, "foo", "pre")
+        self.assertEqual(pre_site["hits"], 3)
+        self.assertEqual(pre_site["shapes"], {"x=int": 2, "x=str": 1})
+        post_site = _site(sites, "foo", "post")
+        self.assertEqual(post_site["shapes"], {"int, x=int": 2, "str, x=str": 1})
+
+    def test_constrain_and_invariant(self):
+        @constrain
+        def foo(x: lambda x: True) -> lambda r: True:
+            return x
+
+        @invariant(lambda self: True)
+        class Foo(object):
+            def bar(self):
+                pass
+
+        foo(1.0)
+        Foo().bar()
+        sites = coverage_snapshot()
+        self.assertEqual(_site(sites, "foo", "pre")["shapes"], {"x=float": 1})
+        self.assertEqual(_site(sites, "foo", "post")["hits"], 1)
+        invariant_site = _site(sites, "Foo", "invariant")
+        self.assertEqual(invariant_site["hits"], 2)
+        self.assertEqual(list(invariant_site["shapes"]),
+                         [Foo.__module__ + "." + Foo.__qualname__])
+
+    def test_unevaluated_conditions_listed(self):
+        @pre(lambda x: True)
+        def never_called(x):
+            return x
+
+        self.assertEqual(_site(coverage_snapshot(), "never_called", "pre")["hits"], 0)
+
+    def test_threads(self):
+        @pre(lambda x: True)
+        def foo(x):
+            return x
+
+        tables = len(coverage._TABLES)
+        threads = [threading.Thread(target=lambda: [foo(i) for i in range(100)])
+                   for _ in range(4)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(_site(coverage_snapshot(), "foo", "pre")["hits"], 400)
+        # The tables of finished threads are merged into a shared one.
+        self.assertEqual(len(coverage._TABLES), tables)
+
+    def test_disabled(self):
+        condition = lambda x: True
+
+        @pre(condition)
+        def foo(x):
+            return x
+
+        disable_coverage()
+        self.assertFalse(is_collecting_coverage())
+        self.assertIs(foo.__covenant_checks__[0].condition, condition)
+        foo(1)
+        self.assertEqual(_site(coverage_snapshot(), "foo", "pre")["hits"], 0)
+
+    def test_violations_counted(self):
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        with self.assertRaises(PreconditionViolationError):
+            foo(0)
+        self.assertEqual(_site(coverage_snapshot(), "foo", "pre")["hits"], 1)
+
+    def test_dump_and_merge(self):
+        @pre(lambda x: True)
+        def foo(x):
+            return x
+
+        foo(1)
+        first = os.path.join(self.directory, "first.json")
+        dump_coverage(first)
+        reset_coverage()
+        foo("a")
+        second = os.path.join(self.directory, "second.json")
+        dump_coverage(second)
+
+        site = _site(load_coverage(first, second), "foo", "pre")
+        self.assertEqual(site["hits"], 2)
+        self.assertEqual(site["shapes"], {"x=int": 1, "x=str": 1})
+
+    def test_load_rejects_other_files(self):
+        path = os.path.join(self.directory, "other.json")
+        with open(path, "w") as f:
+            json.dump({"sites": []}, f)
+        with self.assertRaises(ValueError):
+            load_coverage(path)
+
+    def test_cli(self):
+        @pre(lambda x: True)
+        def foo(x):
+            return x
+
+        foo(1)
+        path = os.path.join(self.directory, "coverage.json")
+        merged = os.path.join(self.directory, "merged.json")
+        dump_coverage(path)
+        output = io.StringIO()
+        with redirect_stdout(output):
+            main([path, path, "--shapes", "--output", merged])
+        self.assertIn("x=int", output.getvalue())
+        self.assertIn("conditions evaluated", output.getvalue())
+        self.assertEqual(_site(load_coverage(merged), "foo", "pre")["hits"], 2)
+
+    def test_environment(self):
+        prefix = os.path.join(self.directory, "canary")
+        code = ("from covenant import pre\n"
+                "f = pre(lambda x: True)(lambda x: x)\n"
+                "f(1); f(2)\n")
+        env = dict(os.environ, PYTHONPATH=ROOT, COVENANT_COVERAGE=prefix)
+        process = subprocess.run([sys.executable, "-c", code], env=env, cwd=ROOT)
+        self.assertEqual(process.returncode, 0)
+        [name] = os.listdir(self.directory)
+        self.assertTrue(name.startswith("canary."))
+        [site] = load_coverage(os.path.join(self.directory, name))
+        self.assertEqual(site["hits"], 2)
+
+
+if __name__ == '__main__':
+    unittest.main()
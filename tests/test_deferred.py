@@ -0,0 +1,173 @@
+import threading
+import unittest
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+
+from covenant.conditions import *
+from covenant.deferred import *
+from covenant.reporting import *
+from covenant.exceptions import *
+
+
+def is_sorted(r, values):
+    return all(a <= b for a, b in zip(r, r[1:]))
+
+
+class BlockedExecutor(Executor):
+    """Runs nothing until released."""
+
+    def __init__(self):
+        self.futures = []
+
+    def submit(self, fn, *args, **kwargs):
+        future = Future()
+        self.futures.append((future, fn, args, kwargs))
+        return future
+
+    def release(self):
+        while self.futures:
+            future, fn, args, kwargs = self.futures.pop(0)
+            future.set_result(fn(*args, **kwargs))
+
+
+class DeferredTests(unittest.TestCase):
+    def tearDown(self):
+        set_deferred_executor()
+        set_violation_policy("raise")
+
+    def test_returns_before_check(self):
+        started = threading.Event()
+        release = threading.Event()
+
+        def slow(r, x):
+            started.set()
+            release.wait(5)
+            return r > 0
+
+        @post(slow, mode="deferred")
+        def foo(x):
+            return x
+
+        self.assertEqual(foo(-1), -1)
+        self.assertTrue(started.wait(5))
+        release.set()
+        with self.assertRaises(PostconditionViolationError):
+            wait_deferred(5)
+        self.assertTrue(wait_deferred(5))
+
+    def test_runs_off_calling_thread(self):
+        threads = []
+
+        @post(lambda r, x: threads.append(threading.current_thread()) or True,
+              mode="deferred")
+        def foo(x):
+            return x
+
+        foo(1)
+        self.assertTrue(wait_deferred(5))
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_exception_is_violation(self):
+        @post(lambda r, x: 1 / 0, mode="deferred")
+        def foo(x):
+            return x
+
+        foo(1)
+        with self.assertRaises(PostconditionViolationError):
+            wait_deferred(5)
+
+    def test_reported_to_handler(self):
+        reports = []
+        set_violation_policy(reports.append, min_interval=0)
+
+        @post(lambda r, x: r > 0, mode="deferred")
+        def foo(x):
+            return x
+
+        foo(-1)
+        self.assertTrue(wait_deferred(5))
+        self.assertTrue(flush(5))
+        self.assertEqual([r.kind for r in reports], ["post"])
+
+    def test_mixed_with_immediate(self):
+        @post(lambda r, x: r != 0)
+        @post(lambda r, x: r > 0, mode="deferred")
+        def foo(x):
+            return x
+
+        with self.assertRaises(PostconditionViolationError):
+            foo(0)
+        with self.assertRaises(PostconditionViolationError):
+            wait_deferred(5)
+        self.assertEqual(foo(-1), -1)
+        with self.assertRaises(PostconditionViolationError):
+            wait_deferred(5)
+
+    def test_old_values(self):
+        @post(lambda r, items, old: len(items) == old.size + 1,
+              old={"size": lambda items: len(items)}, mode="deferred")
+        def append(items):
+            items.append(1)
+
+        append([])
+        self.assertTrue(wait_deferred(5))
+
+    def test_drop_when_full(self):
+        executor = BlockedExecutor()
+        set_deferred_executor(executor, max_pending=2, block=False)
+
+        @post(lambda r, x: True, mode="deferred")
+        def foo(x):
+            return x
+
+        dropped = dropped_checks()
+        for i in range(5):
+            foo(i)
+        self.assertEqual(dropped_checks() - dropped, 3)
+        self.assertFalse(wait_deferred(0.01))
+        executor.release()
+        self.assertTrue(wait_deferred(5))
+
+    def test_backpressure(self):
+        executor = BlockedExecutor()
+        set_deferred_executor(executor, max_pending=1)
+
+        @post(lambda r, x: True, mode="deferred")
+        def foo(x):
+            return x
+
+        foo(1)
+        second = threading.Thread(target=foo, args=(2,))
+        second.start()
+        second.join(0.05)
+        self.assertTrue(second.is_alive())
+        executor.release()
+        second.join(5)
+        self.assertFalse(second.is_alive())
+        executor.release()
+        self.assertTrue(wait_deferred(5))
+
+    def test_process_pool(self):
+        with ProcessPoolExecutor(1) as executor:
+            set_deferred_executor(executor)
+
+            @post(is_sorted, mode="deferred")
+            def sort(values):
+                return sorted(values)
+
+            @post(is_sorted, mode="deferred")
+            def unsorted(values):
+                return list(values)
+
+            sort([3, 1, 2])
+            self.assertTrue(wait_deferred(30))
+            unsorted([3, 1, 2])
+            with self.assertRaises(PostconditionViolationError):
+                wait_deferred(30)
+
+    def test_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            post(lambda r: True, mode="later")
+
+
+if __name__ == '__main__':
+    unittest.main()
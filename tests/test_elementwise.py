@@ -0,0 +1,119 @@
+import math
+import unittest
+from covenant.annotations import *
+from covenant.conditions import *
+from covenant.elementwise import *
+from covenant.elementwise import ElementwisePredicate
+from covenant.exceptions import *
+
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+
+class SequenceTests(unittest.TestCase):
+    def assertFailsAt(self, predicate, value, index):
+        with self.assertRaises(ValueError) as cm:
+            predicate(value)
+        self.assertIn("index %s " % (index,), str(cm.exception))
+
+    def test_in_range(self):
+        self.assertTrue(all_in_range(0, 10)([0, 5, 10]))
+        self.assertFailsAt(all_in_range(0, 10), [1, 2, 11, -1], 2)
+        self.assertFailsAt(all_in_range(0, 10, inclusive=False), [1, 10], 1)
+        self.assertTrue(all_in_range(low=0)([0, 1e9]))
+
+    def test_finite(self):
+        self.assertTrue(all_finite()([1, 2.5]))
+        self.assertFailsAt(all_finite(), [1.0, float("inf")], 1)
+        self.assertFailsAt(all_finite(), [float("nan")], 0)
+
+    def test_no_nulls(self):
+        self.assertTrue(no_nulls()([0, "", False]))
+        self.assertFailsAt(no_nulls(), [1, None], 1)
+        self.assertFailsAt(no_nulls(), (1, 2, math.nan), 2)
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            ElementwisePredicate()
+
+    def test_monotonic(self):
+        self.assertTrue(monotonic()([1, 1, 2]))
+        self.assertTrue(monotonic(increasing=False)([3, 2, 2]))
+        self.assertFailsAt(monotonic(strict=True), [1, 1, 2], 1)
+        self.assertFailsAt(monotonic(), [1, 3, 2], 2)
+        self.assertTrue(monotonic()([]))
+
+    def test_dtype(self):
+        self.assertTrue(has_dtype(int)([1, 2]))
+        self.assertFailsAt(has_dtype((int, float)), [1, 2.0, "3"], 2)
+
+    def test_shape(self):
+        self.assertTrue(has_shape(2, 3)([[1, 2, 3], [4, 5, 6]]))
+        self.assertTrue(has_shape(None, 3)([[1, 2, 3]]))
+        with self.assertRaises(ValueError):
+            has_shape(2)([1, 2, 3])
+        with self.assertRaises(ValueError):
+            has_shape(2, 2)([1, 2])
+
+    def test_as_annotation(self):
+        @constrain
+        def total(values: all_in_range(0)):
+            return sum(values)
+
+        self.assertEqual(total([1, 2]), 3)
+        with self.assertRaises(PreconditionViolationError) as cm:
+            total([1, -2])
+        self.assertIn("index 1", str(cm.exception))
+
+    def test_in_condition(self):
+        @pre(lambda values: no_nulls()(values))
+        def total(values):
+            return sum(values)
+
+        with self.assertRaises(PreconditionViolationError):
+            total([1, None])
+
+
+@unittest.skipIf(numpy is None, "numpy is not installed")
+class ArrayTests(unittest.TestCase):
+    def assertFailsAt(self, predicate, value, index):
+        with self.assertRaises(ValueError) as cm:
+            predicate(value)
+        self.assertIn("index %s " % (index,), str(cm.exception))
+
+    def test_in_range(self):
+        self.assertTrue(all_in_range(0, 10)(numpy.arange(11)))
+        self.assertFailsAt(all_in_range(0, 10), numpy.array([1, 12, -1]), 1)
+        self.assertFailsAt(all_in_range(0, 1), numpy.array([[0.5, 0.2], [2, 0]]),
+                           (1, 0))
+
+    def test_finite_and_nulls(self):
+        values = numpy.array([1.0, numpy.nan, numpy.inf])
+        self.assertFailsAt(all_finite(), values, 1)
+        self.assertFailsAt(no_nulls(), values, 1)
+        self.assertTrue(all_finite()(numpy.arange(3)))
+        self.assertFailsAt(no_nulls(), numpy.array([1, None], dtype=object), 1)
+        dates = numpy.array(["2024-01-01", "NaT"], dtype="datetime64[D]")
+        self.assertFailsAt(no_nulls(), dates, 1)
+        self.assertFailsAt(no_nulls(), dates - dates[0], 1)
+        self.assertTrue(no_nulls()(dates[:1]))
+
+    def test_monotonic(self):
+        self.assertTrue(monotonic()(numpy.array([1, 2, 2, 3])))
+        self.assertFailsAt(monotonic(), numpy.array([1, 3, 2]), 2)
+        with self.assertRaises(ValueError):
+            monotonic()(numpy.zeros((2, 2)))
+
+    def test_dtype_and_shape(self):
+        self.assertTrue(has_dtype(numpy.floating)(numpy.zeros(3)))
+        with self.assertRaises(ValueError):
+            has_dtype(numpy.integer)(numpy.zeros(3))
+        self.assertTrue(has_shape(None, 2)(numpy.zeros((5, 2))))
+        with self.assertRaises(ValueError):
+            has_shape(5)(numpy.zeros((5, 2)))
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,135 @@
+import unittest
+from covenant.annotations import *
+from covenant.conditions import *
+from covenant.invariant import *
+from covenant.exceptions import *
+from covenant.reporting import flush, set_violation_policy
+
+
+class Counted(object):
+    reprs = 0
+
+    def __repr__(self):
+        Counted.reprs += 1
+        return "Counted()"
+
+
+class BrokenRepr(object):
+    def __repr__(self):
+        raise RuntimeError("no repr")
+
+
+class ViolationDetailTests(unittest.TestCase):
+    def test_precondition_fields(self):
+        @pre(lambda x, y: x > 0)
+        def foo(x, y=2):
+            return x
+
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(-1)
+        error = cm.exception
+        self.assertEqual(error.function, foo.__module__ + "." + foo.__qualname__)
+        self.assertIn("<lambda>", error.condition)
+        self.assertIn("test_exceptions.py", error.condition)
+        self.assertEqual(error.arguments, {"x": -1, "y": 2})
+        self.assertIsNone(error.__cause__)
+        self.assertIn("with x=-1, y=2", str(error))
+
+    def test_cause(self):
+        @pre(lambda x: 1 / x)
+        def foo(x):
+            return x
+
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(0)
+        self.assertIsInstance(cm.exception.__cause__, ZeroDivisionError)
+        self.assertIn("ZeroDivisionError", str(cm.exception))
+
+    def test_postcondition_result(self):
+        @post(lambda r, x: r > 0)
+        def foo(x):
+            return x
+
+        with self.assertRaises(PostconditionViolationError) as cm:
+            foo(-1)
+        self.assertEqual(cm.exception.result, -1)
+        self.assertIn("returning -1", str(cm.exception))
+
+    def test_constrain(self):
+        @constrain
+        def foo(x: lambda x: x > 0) -> lambda r: r < 0:
+            return x
+
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(-1)
+        self.assertEqual(cm.exception.arguments, {"x": -1})
+        with self.assertRaises(PostconditionViolationError) as cm:
+            foo(1)
+        self.assertEqual(cm.exception.result, 1)
+
+    def test_invariant_instance(self):
+        @invariant(lambda self: False)
+        class Foo(object):
+            def bar(self):
+                pass
+
+        foo = Foo()
+        with self.assertRaises(InvariantViolationError) as cm:
+            foo.bar()
+        self.assertIs(cm.exception.instance, foo)
+        self.assertTrue(cm.exception.function.endswith("Foo"))
+
+    def test_invariant_cause(self):
+        @invariant(lambda self: self.missing)
+        class Foo(object):
+            def bar(self):
+                return 1
+
+        foo = Foo()
+        with self.assertRaises(InvariantViolationError) as cm:
+            foo.bar()
+        self.assertIs(cm.exception.instance, foo)
+        self.assertIsInstance(cm.exception.__cause__, AttributeError)
+
+        reports = []
+        set_violation_policy(reports.append, min_interval=0)
+        try:
+            self.assertEqual(foo.bar(), 1)
+            self.assertTrue(flush(5))
+        finally:
+            set_violation_policy("raise")
+        self.assertEqual(len(reports), 2)
+        self.assertIsInstance(reports[0].error.__cause__, AttributeError)
+
+    def test_message_is_lazy(self):
+        @pre(lambda x: False)
+        def foo(x):
+            return x
+
+        before = Counted.reprs
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(Counted())
+        self.assertEqual(Counted.reprs, before)
+        str(cm.exception)
+        self.assertEqual(Counted.reprs, before + 1)
+
+    def test_bounded_repr(self):
+        @pre(lambda x, y: False)
+        def foo(x, y):
+            return x
+
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo("a" * 10000, BrokenRepr())
+        message = str(cm.exception)
+        self.assertLess(len(message), 500)
+        self.assertIn("BrokenRepr instance", message)
+
+    def test_plain_message(self):
+        error = PreconditionViolationError("custom")
+        self.assertEqual(str(error), "custom")
+        self.assertEqual(error.args, ("custom",))
+        self.assertEqual(str(InvariantViolationError()), "Invariant violated")
+
+
+if __name__ == '__main__':
+    unittest.main()
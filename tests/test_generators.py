@@ -0,0 +1,195 @@
+import asyncio
+import inspect
+import unittest
+from covenant.conditions import *
+from covenant.invariant import *
+from covenant.exceptions import *
+
+
+class CoroutineTests(unittest.TestCase):
+    def test_postcondition_on_result(self):
+        @post(lambda r, x: r == x * 2)
+        @pre(lambda x: x > 0)
+        async def double(x):
+            await asyncio.sleep(0)
+            return x * 2
+
+        self.assertTrue(inspect.iscoroutinefunction(double))
+        self.assertEqual(double.__name__, "double")
+        self.assertEqual(asyncio.run(double(2)), 4)
+        with self.assertRaises(PreconditionViolationError):
+            asyncio.run(double(0))
+
+    def test_failed_postcondition(self):
+        @post(lambda r: r is not None)
+        async def nothing():
+            return None
+
+        with self.assertRaises(PostconditionViolationError):
+            asyncio.run(nothing())
+
+
+class GeneratorTests(unittest.TestCase):
+    def test_each_item(self):
+        @post(lambda item, n: item < 3)
+        def count(n):
+            for i in range(n):
+                yield i
+
+        self.assertEqual(list(count(3)), [0, 1, 2])
+        gen = count(5)
+        self.assertEqual([next(gen), next(gen), next(gen)], [0, 1, 2])
+        with self.assertRaises(PostconditionViolationError):
+            next(gen)
+
+    def test_precondition_checked_on_start(self):
+        @pre(lambda n: n >= 0)
+        def count(n):
+            yield n
+
+        gen = count(-1)
+        with self.assertRaises(PreconditionViolationError):
+            next(gen)
+
+    def test_generator_function(self):
+        @post(lambda item: True)
+        def count():
+            yield 1
+
+        @post(lambda item: True)
+        async def acount():
+            yield 1
+
+        self.assertTrue(inspect.isgeneratorfunction(count))
+        self.assertTrue(inspect.isasyncgenfunction(acount))
+        self.assertEqual(count.__name__, "count")
+
+    def test_item_sample(self):
+        seen = []
+
+        @post(lambda item, n: seen.append(item) or True, item_sample=3)
+        def count(n):
+            for i in range(n):
+                yield i
+
+        self.assertEqual(list(count(7)), list(range(7)))
+        self.assertEqual(seen, [0, 3, 6])
+
+    def test_send_throw_and_return(self):
+        @post(lambda item: item >= 0)
+        def accumulate():
+            total = 0
+            try:
+                while True:
+                    total += yield total
+            except KeyError:
+                return "stopped at %d" % total
+
+        def driver():
+            result = yield from accumulate()
+            return result
+
+        gen = driver()
+        self.assertEqual(next(gen), 0)
+        self.assertEqual(gen.send(2), 2)
+        self.assertEqual(gen.send(3), 5)
+        with self.assertRaises(StopIteration) as cm:
+            gen.throw(KeyError())
+        self.assertEqual(cm.exception.value, "stopped at 5")
+
+        gen = accumulate()
+        next(gen)
+        with self.assertRaises(PostconditionViolationError):
+            gen.send(-1)
+
+    def test_async_generator(self):
+        @post(lambda item, n: item != 2)
+        async def count(n):
+            for i in range(n):
+                await asyncio.sleep(0)
+                yield i
+
+        async def collect(n):
+            return [i async for i in count(n)]
+
+        self.assertEqual(asyncio.run(collect(2)), [0, 1])
+        with self.assertRaises(PostconditionViolationError):
+            asyncio.run(collect(3))
+
+    def test_async_asend_and_athrow(self):
+        @post(lambda item: item >= 0)
+        async def accumulate():
+            total = 0
+            try:
+                while True:
+                    total += yield total
+            except KeyError:
+                yield -total
+
+        async def drive():
+            gen = accumulate()
+            results = [await gen.__anext__(), await gen.asend(2)]
+            with self.assertRaises(PostconditionViolationError):
+                await gen.athrow(KeyError())
+            return results
+
+        self.assertEqual(asyncio.run(drive()), [0, 2])
+
+
+class InvariantTests(unittest.TestCase):
+    def test_coroutine_method(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Foo(object):
+            foo = 0
+
+            async def add(self, num):
+                await asyncio.sleep(0)
+                self.foo += num
+
+        f = Foo()
+        asyncio.run(f.add(1))
+        self.assertEqual(f.foo, 1)
+        with self.assertRaises(InvariantViolationError):
+            asyncio.run(f.add(-2))
+
+    def test_generator_method(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Foo(object):
+            foo = 0
+
+            def drain(self, num):
+                for i in range(num):
+                    self.foo -= 1
+                    yield i
+
+        f = Foo()
+        f.foo = 2
+        self.assertEqual(list(f.drain(2)), [0, 1])
+        with self.assertRaises(InvariantViolationError):
+            list(f.drain(1))
+        self.assertTrue(inspect.isgeneratorfunction(Foo.drain))
+
+    def test_async_generator_method(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Foo(object):
+            foo = 0
+
+            async def drain(self, num):
+                for i in range(num):
+                    await asyncio.sleep(0)
+                    self.foo -= 1
+                    yield i
+
+        async def collect(f, num):
+            return [i async for i in f.drain(num)]
+
+        f = Foo()
+        f.foo = 2
+        self.assertTrue(inspect.isasyncgenfunction(Foo.drain))
+        self.assertEqual(asyncio.run(collect(f, 2)), [0, 1])
+        with self.assertRaises(InvariantViolationError):
+            asyncio.run(collect(f, 1))
+
+
+if __name__ == "__main__":
+    unittest.main()
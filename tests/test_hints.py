@@ -0,0 +1,174 @@
+import collections.abc
+import unittest
+from typing import (Annotated, Any, Dict, Iterator, List, Literal, NewType,
+                    Optional, Tuple, TypeVar, Union)
+
+from covenant.hints import *
+from covenant.hints import is_hint
+from covenant.predicates import gt, where
+
+UserId = NewType("UserId", int)
+Number = TypeVar("Number", int, complex)
+
+
+class OfTypeTests(unittest.TestCase):
+    def assertAccepts(self, hint, *values):
+        predicate = of_type(hint)
+        for value in values:
+            self.assertTrue(predicate(value), (hint, value))
+
+    def assertRejects(self, hint, *values):
+        predicate = of_type(hint)
+        for value in values:
+            with self.assertRaises(ValueError, msg=(hint, value)):
+                predicate(value)
+
+    def test_class(self):
+        self.assertAccepts(int, 1, True)
+        self.assertRejects(int, "1", 1.0, None)
+
+    def test_numeric_promotion(self):
+        self.assertAccepts(float, 1.0, 1)
+        self.assertAccepts(complex, 1j, 1.0, 1)
+        self.assertRejects(float, "1.0")
+
+    def test_none_and_any(self):
+        self.assertAccepts(None, None)
+        self.assertRejects(None, 0)
+        self.assertAccepts(Any, None, 1, object())
+
+    def test_union(self):
+        self.assertAccepts(Optional[int], None, 1)
+        self.assertRejects(Optional[int], "1")
+        self.assertAccepts(Union[int, str], 1, "1")
+        self.assertAccepts(int | None, None, 1)
+        self.assertAccepts(Union[int, List[str]], 1, ["a"])
+        self.assertRejects(Union[int, List[str]], [1], "a")
+
+    def test_union_is_one_isinstance(self):
+        env = {}
+        source = of_type(Optional[Union[int, str]])._source("value", env)
+        self.assertEqual(source.count("isinstance"), 1)
+        self.assertIn((int, str, type(None)), env.values())
+
+    def test_literal(self):
+        self.assertAccepts(Literal["r", "w", 1], "r", "w", 1)
+        self.assertRejects(Literal["r", "w", 1], "x", True, 1.0, [])
+
+    def test_list(self):
+        self.assertAccepts(list[int], [], [1, 2])
+        self.assertRejects(list[int], (1,), [1, "2"])
+        self.assertAccepts(List[Optional[int]], [None, 1])
+
+    def test_nested(self):
+        self.assertAccepts(list[list[int]], [[1], [2, 3]])
+        self.assertRejects(list[list[int]], [[1], ["2"]])
+
+    def test_mapping(self):
+        self.assertAccepts(dict[str, int], {"a": 1})
+        self.assertRejects(dict[str, int], {"a": "1"}, {1: 1}, [("a", 1)])
+        self.assertAccepts(Dict[str, Any], {"a": None})
+        self.assertRejects(Dict[str, Any], {1: None})
+        self.assertAccepts(dict[Any, int], {None: 1})
+        self.assertRejects(dict[Any, int], {None: None})
+
+    def test_tuple(self):
+        self.assertAccepts(tuple[int, str], (1, "a"))
+        self.assertRejects(tuple[int, str], (1, 2), (1,), [1, "a"])
+        self.assertAccepts(tuple[int, ...], (), (1, 2))
+        self.assertRejects(tuple[int, ...], (1, "2"))
+        self.assertAccepts(tuple[()], ())
+        self.assertRejects(tuple[()], (1,))
+        self.assertAccepts(Tuple, (1, "a"))
+
+    def test_collections_abc(self):
+        self.assertAccepts(collections.abc.Sequence[int], [1], (1,))
+        self.assertRejects(collections.abc.Sequence[int], ["1"], {1})
+        self.assertAccepts(collections.abc.Callable[[int], int], len)
+
+    def test_iterator_not_consumed(self):
+        iterator = iter([1, "2"])
+        self.assertAccepts(Iterator[int], iterator)
+        self.assertEqual(next(iterator), 1)
+
+    def test_type(self):
+        self.assertAccepts(type[int], int, bool)
+        self.assertRejects(type[int], str, 1)
+        self.assertAccepts(type[Union[int, str]], str)
+
+    def test_newtype_and_typevar(self):
+        self.assertAccepts(UserId, 1)
+        self.assertRejects(UserId, "1")
+        self.assertAccepts(Number, 1, 1j)
+        self.assertRejects(Number, "1")
+
+    def test_annotated(self):
+        self.assertAccepts(Annotated[int, gt(0)], 1)
+        self.assertRejects(Annotated[int, gt(0)], 0, "1")
+
+    def test_forward_reference(self):
+        predicate = of_type("list[Later]", namespace=globals())
+        globals()["Later"] = Later = type("Later", (), {})
+        try:
+            self.assertTrue(predicate([Later()]))
+            with self.assertRaises(ValueError):
+                predicate([1])
+        finally:
+            del globals()["Later"]
+
+    def test_unresolved_forward_reference(self):
+        with self.assertRaises(NameError):
+            of_type("Missing", namespace={})(1)
+
+    def test_unsupported(self):
+        with self.assertRaises(TypeError):
+            of_type(1)
+
+    def test_item_sample(self):
+        predicate = of_type(list[int], item_sample=2)
+        self.assertTrue(predicate([1, "2", 3]))
+        with self.assertRaises(ValueError):
+            predicate([1, "2", 3])
+        self.assertTrue(predicate([1, "2", 3]))
+        self.assertTrue(of_type(list[int], item_sample=0.0)(["1"]))
+        with self.assertRaises(ValueError):
+            of_type(list[int], item_sample=1.0)([1, "2"])
+
+    def test_item_sample_fraction(self):
+        predicate = of_type(list[int], item_sample=0.25)
+        values = [1] * 100
+        values[0] = "1"
+        failures = 0
+        for _ in range(200):
+            try:
+                predicate(values)
+            except ValueError:
+                failures += 1
+        self.assertTrue(0 < failures < 200)
+
+    def test_invalid_item_sample(self):
+        with self.assertRaises(ValueError):
+            of_type(list[int], item_sample=0)
+
+    def test_in_where(self):
+        check = where(x=of_type(Optional[int]))
+        self.assertTrue(check(x=None))
+        with self.assertRaises(ValueError):
+            check(x="1")
+
+    def test_repr(self):
+        self.assertEqual(repr(of_type(int)), "of_type(int)")
+        self.assertEqual(repr(of_type(list[int])), "of_type(list[int])")
+
+    def test_is_hint(self):
+        self.assertTrue(is_hint(int))
+        self.assertTrue(is_hint(None))
+        self.assertTrue(is_hint(Optional[int]))
+        self.assertTrue(is_hint(list[int]))
+        self.assertTrue(is_hint("int"))
+        self.assertFalse(is_hint(lambda x: x))
+        self.assertFalse(is_hint(gt(0)))
+
+
+if __name__ == "__main__":
+    unittest.main()
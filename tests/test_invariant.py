@@ -1,5 +1,13 @@
+import asyncio
+import gc
+import random
+import threading
+import time
 import unittest
+from covenant.base import disable, reset
+from covenant.conditions import pre, post
 from covenant.invariant import *
+from covenant.invariant import _UNCHANGED
 from covenant.exceptions import *
 
 class InvariantTests(unittest.TestCase):
@@ -22,6 +30,534 @@ class InvariantTests(unittest.TestCase):
         with self.assertRaises(InvariantViolationError):
             f.add(-6)
 
+    def test_keyword_arguments(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Foo(object):
+            foo = 0
+
+            def add(self, num=1):
+                self.foo += num
+
+        f = Foo()
+        f.add(num=2)
+        self.assertEqual(f.foo, 2)
+        with self.assertRaises(InvariantViolationError):
+            f.add(num=-3)
+
+    def test_exclude(self):
+        @invariant(lambda self: self.foo >= 0, exclude=["unchecked"])
+        class Foo(object):
+            foo = 0
+
+            def unchecked(self, num):
+                self.foo = num
+
+            def checked(self):
+                return self.foo
+
+        f = Foo()
+        f.unchecked(-1)
+        with self.assertRaises(InvariantViolationError):
+            f.checked()
+
+    def test_inherited_method(self):
+        class Base(object):
+            foo = 0
+
+            def set(self, num):
+                self.foo = num
+
+        @invariant(lambda self: self.foo >= 0)
+        class Foo(Base):
+            pass
+
+        with self.assertRaises(InvariantViolationError):
+            Foo().set(-1)
+        Base().set(-1)
+
+    def test_wrapper_installed_on_access(self):
+        @invariant(lambda self: True)
+        class Foo(object):
+            def bar(self):
+                return 1
+
+        self.assertNotEqual(type(vars(Foo)["bar"]).__name__, "function")
+        self.assertEqual(Foo().bar(), 1)
+        self.assertEqual(Foo.bar.__name__, "bar")
+        self.assertEqual(type(vars(Foo)["bar"]).__name__, "function")
+
+
+class RecursionGuardTests(unittest.TestCase):
+    def test_recursive_check(self):
+        @invariant(lambda self: self.get() >= 0)
+        class Foo(object):
+            foo = 0
+
+            def get(self):
+                return self.foo
+
+        self.assertEqual(Foo().get(), 0)
+
+    def test_failing_condition_is_cleaned_up(self):
+        @invariant(lambda self: 1 / self.foo)
+        class Foo(object):
+            foo = 0
+
+            def set(self, num):
+                self.foo = num
+
+        f = Foo()
+        with self.assertRaises(InvariantViolationError) as cm:
+            f.set(1)
+        self.assertIsInstance(cm.exception.__cause__, ZeroDivisionError)
+        f.foo = 1
+        with self.assertRaises(InvariantViolationError):
+            f.set(0)
+
+    def test_threads(self):
+        lock = threading.Lock()
+        checks = []
+
+        def condition(self):
+            with lock:
+                checks.append(1)
+            time.sleep(0.0001)
+            return True
+
+        @invariant(condition)
+        class Foo(object):
+            def bar(self):
+                pass
+
+        f = Foo()
+        threads = [threading.Thread(target=lambda: [f.bar() for _ in range(50)])
+                   for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(checks), 8 * 50 * 2)
+
+    def test_tasks(self):
+        checks = []
+
+        def condition(self):
+            checks.append(1)
+            return self.foo >= 0
+
+        @invariant(condition)
+        class Foo(object):
+            foo = 0
+
+            def add(self, num):
+                self.foo += num
+
+        f = Foo()
+
+        async def worker():
+            for _ in range(50):
+                f.add(1)
+                await asyncio.sleep(0)
+
+        async def main():
+            await asyncio.gather(*[worker() for _ in range(8)])
+
+        asyncio.run(main())
+        self.assertEqual(f.foo, 8 * 50)
+        self.assertEqual(len(checks), 8 * 50 * 2)
+
+
+class InheritanceTests(unittest.TestCase):
+    def test_subclass_inherits_invariant(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Base(object):
+            foo = 0
+
+            def set(self, num):
+                self.foo = num
+
+        class Sub(Base):
+            def add(self, num):
+                self.foo += num
+
+        with self.assertRaises(InvariantViolationError):
+            Sub().add(-1)
+        with self.assertRaises(InvariantViolationError):
+            Sub().set(-1)
+
+    def test_subclass_strengthens_invariant(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Base(object):
+            foo = 0
+
+            def set(self, num):
+                self.foo = num
+
+        @invariant(lambda self: self.foo <= 10)
+        class Sub(Base):
+            pass
+
+        Base().set(11)
+        Sub().set(10)
+        with self.assertRaises(InvariantViolationError):
+            Sub().set(11)
+        with self.assertRaises(InvariantViolationError):
+            Sub().set(-1)
+
+    def test_stacked_invariants(self):
+        @invariant(lambda self: self.foo >= 0)
+        @invariant(lambda self: self.foo <= 10)
+        class Foo(object):
+            foo = 0
+
+            def set(self, num):
+                self.foo = num
+
+        with self.assertRaises(InvariantViolationError):
+            Foo().set(-1)
+        with self.assertRaises(InvariantViolationError):
+            Foo().set(11)
+
+    def test_exclude_is_inherited(self):
+        @invariant(lambda self: self.foo >= 0, exclude=["unchecked"])
+        class Base(object):
+            foo = 0
+
+            def unchecked(self, num):
+                self.foo = num
+
+        class Sub(Base):
+            def unchecked(self, num):
+                self.foo = num
+
+        Sub().unchecked(-1)
+
+    def test_toggled_per_class(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Base(object):
+            foo = 0
+
+            def set(self, num):
+                self.foo = num
+
+        class Sub(Base):
+            pass
+
+        disable(Sub)
+        try:
+            Sub().set(-1)
+            with self.assertRaises(InvariantViolationError):
+                Base().set(-1)
+        finally:
+            reset(Sub)
+
+    def test_precondition_inherited(self):
+        @inherit_contracts
+        class Base(object):
+            @pre(lambda self, x: x > 0)
+            def method(self, x):
+                return x
+
+        class Sub(Base):
+            def method(self, x):
+                return -x
+
+        self.assertEqual(Sub().method(1), -1)
+        with self.assertRaises(PreconditionViolationError):
+            Sub().method(0)
+
+    def test_precondition_weakened(self):
+        @inherit_contracts
+        class Base(object):
+            @pre(lambda self, x: x > 0)
+            def method(self, x):
+                return x
+
+        class Sub(Base):
+            @pre(lambda self, x: x > -10)
+            def method(self, x):
+                return x
+
+        self.assertEqual(Sub().method(-5), -5)
+        self.assertEqual(Sub().method(50), 50)
+        with self.assertRaises(PreconditionViolationError):
+            Sub().method(-10)
+        with self.assertRaises(PreconditionViolationError):
+            Base().method(-5)
+
+    def test_precondition_weakened_by_either_alternative(self):
+        @inherit_contracts
+        class Base(object):
+            @pre(lambda self, x: x < 0)
+            def method(self, x):
+                return x
+
+        class Sub(Base):
+            @pre(lambda self, x: x > 10)
+            def method(self, x):
+                return x
+
+        self.assertEqual(Sub().method(-1), -1)
+        self.assertEqual(Sub().method(11), 11)
+        with self.assertRaises(PreconditionViolationError):
+            Sub().method(5)
+
+    def test_postcondition_strengthened(self):
+        @inherit_contracts
+        class Base(object):
+            @post(lambda r, self, x: r >= 0)
+            def method(self, x):
+                return x
+
+        class Sub(Base):
+            @post(lambda r, self, x: r <= 10)
+            def method(self, x):
+                return x
+
+        Base().method(11)
+        self.assertEqual(Sub().method(5), 5)
+        with self.assertRaises(PostconditionViolationError):
+            Sub().method(-1)
+        with self.assertRaises(PostconditionViolationError):
+            Sub().method(11)
+
+    def test_override_of_unconditioned_precondition(self):
+        @inherit_contracts
+        class Base(object):
+            @post(lambda r, self, x: True)
+            def method(self, x):
+                return x
+
+        class Sub(Base):
+            @pre(lambda self, x: x > 0)
+            def method(self, x):
+                return x
+
+        self.assertEqual(Sub().method(-1), -1)
+
+    def test_renamed_parameter(self):
+        @inherit_contracts
+        class Base(object):
+            @pre(lambda self, x: x > 0)
+            def method(self, x):
+                return x
+
+        with self.assertRaises(TypeError) as cm:
+            class Sub(Base):
+                def method(self, y):
+                    return y
+        self.assertIn("refers to the parameters x", str(cm.exception))
+
+        class Other(Base):
+            def method(self, x, y=0):
+                return x + y
+
+        self.assertEqual(Other().method(1, 2), 3)
+
+    def test_deep_hierarchy(self):
+        @invariant(lambda self: self.foo >= 0)
+        class Base(object):
+            foo = 0
+
+            @pre(lambda self, x: x < 100)
+            def set(self, x):
+                self.foo = x
+
+        class Middle(Base):
+            @post(lambda r, self, x: self.foo == x)
+            def set(self, x):
+                self.foo = x
+
+        class Leaf(Middle):
+            def set(self, x):
+                self.foo = x + 1
+
+        with self.assertRaises(PreconditionViolationError):
+            Leaf().set(100)
+        with self.assertRaises(PostconditionViolationError):
+            Leaf().set(1)
+        with self.assertRaises(InvariantViolationError):
+            Middle().set(-1)
+
+    def test_resolved_at_class_creation(self):
+        @inherit_contracts
+        class Base(object):
+            @pre(lambda self, x: x > 0)
+            @post(lambda r, self, x: r > 0)
+            def method(self, x):
+                return x
+
+        class Sub(Base):
+            @pre(lambda self, x: x > -10)
+            def method(self, x):
+                return x
+
+        checks = vars(Sub)["method"].__covenant_checks__
+        self.assertEqual([check.kind for check in checks], ["pre", "pre", "post"])
+
+    def test_init_subclass_preserved(self):
+        created = []
+
+        @inherit_contracts
+        class Base(object):
+            def __init_subclass__(cls, tag=None, **kwargs):
+                super().__init_subclass__(**kwargs)
+                created.append((cls.__name__, tag))
+
+            @pre(lambda self, x: x > 0)
+            def method(self, x):
+                return x
+
+        class Sub(Base, tag="sub"):
+            def method(self, x):
+                return x
+
+        self.assertEqual(created, [("Sub", "sub")])
+        with self.assertRaises(PreconditionViolationError):
+            Sub().method(0)
+
+
+def _account_class(track_changes, evaluations):
+    def condition(self):
+        evaluations.append(1)
+        return self.balance >= 0 and self.limit >= 0
+
+    @invariant(condition, track_changes=track_changes)
+    class Account(object):
+        balance = 0
+        limit = 0
+
+        def deposit(self, amount):
+            self.balance += amount
+
+        def set_limit(self, limit):
+            self.limit = limit
+
+        def get_balance(self):
+            return self.balance
+
+        def clear(self):
+            del self.balance
+
+    return Account
+
+
+class ChangeTrackingTests(unittest.TestCase):
+    def test_reads_skip_checks(self):
+        evaluations = []
+        account = _account_class(True, evaluations)()
+        account.deposit(5)
+        count = len(evaluations)
+        for _ in range(10):
+            account.get_balance()
+        self.assertEqual(len(evaluations), count)
+
+    def test_write_checked_after_method(self):
+        evaluations = []
+        account = _account_class(True, evaluations)()
+        account.get_balance()
+        with self.assertRaises(InvariantViolationError):
+            account.deposit(-1)
+
+    def test_external_write_checked_before_method(self):
+        evaluations = []
+        account = _account_class(True, evaluations)()
+        account.get_balance()
+        account.balance = -1
+        with self.assertRaises(InvariantViolationError):
+            account.get_balance()
+
+    def test_delete_is_a_change(self):
+        evaluations = []
+        account = _account_class(True, evaluations)()
+        account.deposit(1)
+        count = len(evaluations)
+        account.clear()
+        self.assertGreater(len(evaluations), count)
+
+    def test_violation_is_checked_again(self):
+        evaluations = []
+        account = _account_class(True, evaluations)()
+        account.balance = -1
+        for _ in range(2):
+            with self.assertRaises(InvariantViolationError):
+                account.get_balance()
+
+    def test_same_violations_as_full_checking(self):
+        # Run one random sequence of calls and writes against a tracked and
+        # an untracked class and compare where violations are raised.
+        rng = random.Random(42)
+        steps = [(rng.choice(["deposit", "set_limit", "get_balance", "write"]),
+                  rng.randint(-3, 3)) for _ in range(2000)]
+
+        def run(track_changes):
+            account = _account_class(track_changes, [])()
+            outcomes = []
+            for name, value in steps:
+                try:
+                    if name == "write":
+                        account.limit = value
+                    elif name == "get_balance":
+                        account.get_balance()
+                    else:
+                        getattr(account, name)(value)
+                except InvariantViolationError:
+                    outcomes.append(False)
+                    account.balance = account.limit = 0
+                else:
+                    outcomes.append(True)
+            return outcomes
+
+        full = run(False)
+        self.assertIn(False, full)
+        self.assertEqual(run(True), full)
+
+    def test_inherited(self):
+        evaluations = []
+        Account = _account_class(True, evaluations)
+
+        class Sub(Account):
+            def __setattr__(self, name, value):
+                object.__setattr__(self, name, value)
+
+        sub = Sub()
+        sub.get_balance()
+        count = len(evaluations)
+        sub.get_balance()
+        self.assertEqual(len(evaluations), count)
+        sub.balance = -1
+        with self.assertRaises(InvariantViolationError):
+            sub.get_balance()
+
+    def test_without_weak_references(self):
+        evaluations = []
+
+        @invariant(lambda self: evaluations.append(1) or getattr(self, "value", 0) >= 0,
+                   track_changes=True)
+        class Slotted(object):
+            __slots__ = ("value",)
+
+            def __init__(self):
+                self.value = 0
+
+            def get(self):
+                return self.value
+
+        slotted = Slotted()
+        count = len(evaluations)
+        slotted.get()
+        self.assertEqual(len(evaluations), count + 2)
+
+    def test_collected_objects_forgotten(self):
+        account = _account_class(True, [])()
+        account.get_balance()
+        key = id(account)
+        self.assertIn(key, _UNCHANGED)
+        del account
+        gc.collect()
+        self.assertNotIn(key, _UNCHANGED)
+
 
 if __name__ == "__main__":
     unittest.main()
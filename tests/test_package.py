@@ -0,0 +1,57 @@
+import importlib
+import os
+import subprocess
+import sys
+import unittest
+
+import covenant
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def run(code):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    return subprocess.check_output([sys.executable, "-c", code], env=env,
+                                   cwd=ROOT, universal_newlines=True).strip()
+
+
+class PackageTests(unittest.TestCase):
+    def test_exports_match_submodules(self):
+        modules = set(covenant._EXPORTS.values())
+        for module_name in modules:
+            module = importlib.import_module(module_name)
+            expected = set(name for name, source in covenant._EXPORTS.items()
+                           if source == module_name)
+            self.assertEqual(set(module.__all__), expected, module_name)
+
+    def test_exported_objects(self):
+        from covenant.conditions import pre
+        from covenant.invariant import invariant
+        self.assertIs(covenant.pre, pre)
+        self.assertIs(covenant.invariant, invariant)
+
+    def test_dir(self):
+        self.assertTrue(set(covenant.__all__) <= set(dir(covenant)))
+
+    def test_unknown_attribute(self):
+        with self.assertRaises(AttributeError):
+            covenant.no_such_name
+
+    def test_import_is_lazy(self):
+        output = run("import sys, covenant; "
+                     "print(sorted(m for m in sys.modules if m == 'inspect' "
+                     "or m.startswith('covenant.')))")
+        self.assertEqual(output, "[]")
+
+    def test_submodule_imported_first(self):
+        output = run("import covenant.invariant, covenant; "
+                     "print(type(covenant.invariant).__name__)")
+        self.assertEqual(output, "function")
+
+    def test_star_import(self):
+        output = run("from covenant import *; print(pre.__module__, gt.__module__)")
+        self.assertEqual(output, "covenant.conditions covenant.predicates")
+
+
+if __name__ == '__main__':
+    unittest.main()
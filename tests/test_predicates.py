@@ -0,0 +1,138 @@
+import inspect
+import unittest
+from covenant.annotations import *
+from covenant.conditions import *
+from covenant.invariant import *
+from covenant.predicates import *
+from covenant.exceptions import *
+
+
+class PredicateTests(unittest.TestCase):
+    def assertFails(self, predicate, value, message):
+        with self.assertRaises(ValueError) as cm:
+            predicate(value)
+        self.assertEqual(str(cm.exception), message)
+
+    def test_abstract(self):
+        with self.assertRaises(TypeError):
+            Predicate()
+
+    def test_comparisons(self):
+        self.assertTrue(gt(5)(6))
+        self.assertFails(gt(5), 5, "5 failed gt(5)")
+        self.assertTrue(ge(5)(5))
+        self.assertTrue(lt(5)(4))
+        self.assertTrue(le(5)(5))
+        self.assertTrue(eq("a")("a"))
+        self.assertTrue(ne("a")("b"))
+        self.assertTrue(between(1, 3)(3))
+        self.assertFails(between(1, 3), 4, "4 failed between(1, 3)")
+        self.assertTrue(one_of("a", "b")("b"))
+
+    def test_types_and_lengths(self):
+        self.assertTrue(isinstance_of(int)(1))
+        self.assertFails(isinstance_of(int), "1",
+                         "'1' failed isinstance_of(<class 'int'>)")
+        self.assertTrue(len_le(2)("ab"))
+        self.assertTrue(len_ge(2)("ab"))
+        self.assertTrue(len_eq(2)("ab"))
+        self.assertFails(len_le(2), 5, "5 failed len_le(2)")
+
+    def test_combinators(self):
+        positive_small = gt(0) & lt(10)
+        self.assertIsInstance(positive_small, and_)
+        self.assertTrue(positive_small(5))
+        self.assertFails(positive_small, 11, "11 failed lt(10)")
+        self.assertFails(and_(gt(0), isinstance_of(int)) & lt(3), 1.5,
+                         "1.5 failed isinstance_of(<class 'int'>)")
+
+        self.assertTrue((eq(None) | gt(0))(None))
+        self.assertFails(or_(eq(None), gt(0)), -1, "-1 failed (eq(None) | gt(0))")
+        self.assertTrue((~eq(0))(1))
+        self.assertFails(not_(eq(0)), 0, "0 failed ~eq(0)")
+
+    def test_callable_clauses(self):
+        def even(x):
+            return x % 2 == 0
+
+        self.assertTrue(and_(gt(0), even)(2))
+        self.assertFails(and_(gt(0), even), 3, "3 failed satisfies(even)")
+
+    def test_single_flat_function(self):
+        predicate = gt(0) & lt(10) & isinstance_of(int)
+        predicate(1)
+        self.assertEqual(predicate._compile().__code__.co_name, "<lambda>")
+
+
+class FieldTests(unittest.TestCase):
+    def test_where(self):
+        @pre(where(x=gt(0), name=isinstance_of(str) & len_le(3)))
+        def foo(x, name):
+            return x
+
+        self.assertEqual(foo(1, "abc"), 1)
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(0, "abc")
+        self.assertIn("argument x=0 failed gt(0)", str(cm.exception))
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(1, "abcd")
+        self.assertIn("argument name='abcd' failed len_le(3)", str(cm.exception))
+
+    def test_returns(self):
+        @post(returns(ge(0), x=gt(-5)))
+        def foo(x):
+            return x
+
+        self.assertEqual(foo(1), 1)
+        with self.assertRaises(PostconditionViolationError) as cm:
+            foo(-1)
+        self.assertIn("return value=-1 failed ge(0)", str(cm.exception))
+
+    def test_attributes(self):
+        @invariant(attributes(size=ge(0)))
+        class Foo(object):
+            size = 0
+
+            def grow(self, n):
+                self.size += n
+
+        Foo().grow(1)
+        with self.assertRaises(InvariantViolationError) as cm:
+            Foo().grow(-1)
+        self.assertEqual(str(cm.exception.__cause__),
+                         "attribute size=-1 failed ge(0)")
+
+    def test_annotation(self):
+        @constrain
+        def foo(x: gt(0) & lt(10)):
+            return x
+
+        self.assertEqual(foo(5), 5)
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(10)
+        self.assertIn("failed lt(10)", str(cm.exception))
+
+    def test_signature(self):
+        self.assertEqual(str(inspect.signature(where(y=gt(0), x=gt(0)))),
+                         "(x, y)")
+        self.assertEqual(str(inspect.signature(returns(gt(0), x=gt(0)))),
+                         "(_covenant_result, x)")
+
+        @pre(where(y=gt(0)))
+        def foo(x, y, z):
+            return x
+
+        self.assertEqual(foo.__covenant_checks__[0].arguments, ("y",))
+        with self.assertRaises(PreconditionViolationError) as cm:
+            foo(1, 0, 1)
+        self.assertIn("argument y=0 failed gt(0)", str(cm.exception))
+
+    def test_exception_in_clause(self):
+        check = where(x=len_le(2))
+        with self.assertRaises(ValueError) as cm:
+            check(x=5)
+        self.assertEqual(str(cm.exception), "argument x=5 failed len_le(2)")
+
+
+if __name__ == "__main__":
+    unittest.main()
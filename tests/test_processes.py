@@ -0,0 +1,103 @@
+import json
+import multiprocessing
+import os
+import subprocess
+import sys
+import unittest
+from concurrent.futures import ProcessPoolExecutor
+
+import covenant
+from covenant.base import *
+from covenant.conditions import *
+from covenant.reporting import *
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+_reports = []
+
+
+@pre(lambda x: x > 0)
+def positive(x):
+    return x
+
+
+def current_settings():
+    return (is_enabled(), is_enabled("myapp"), get_sampling(),
+            get_violation_policy(), covenant.is_profiling())
+
+
+def report_in_child():
+    positive(-1)
+    flush(5)
+    return len(_reports)
+
+
+class ProcessTests(unittest.TestCase):
+    def tearDown(self):
+        enable()
+        reset("myapp")
+        set_sampling(None)
+        set_violation_policy("raise")
+        covenant.disable_profiling()
+
+    def configure(self):
+        disable("myapp")
+        set_sampling(0.5)
+        set_violation_policy("log", min_interval=0)
+        covenant.enable_profiling()
+
+    def test_subprocess(self):
+        self.configure()
+        code = ("import covenant\n"
+                "print(covenant.is_enabled('myapp.sub'), covenant.get_sampling(),\n"
+                "      covenant.get_violation_policy(), covenant.is_profiling())")
+        env = dict(os.environ, PYTHONPATH=ROOT,
+                   COVENANT_CONFIG=json.dumps(settings()))
+        output = subprocess.check_output([sys.executable, "-c", code], env=env,
+                                         universal_newlines=True)
+        self.assertEqual(output.split(), ["False", "0.5", "log", "True"])
+
+    def test_spawned_workers(self):
+        self.configure()
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(1, mp_context=context,
+                                 initializer=apply_settings,
+                                 initargs=(settings(),)) as executor:
+            self.assertEqual(executor.submit(current_settings).result(60),
+                             (True, False, 0.5, "log", True))
+
+    def test_apply_settings(self):
+        self.configure()
+        configured = settings()
+        enable("myapp")
+        set_sampling(None)
+        set_violation_policy("raise")
+        covenant.disable_profiling()
+        apply_settings(configured)
+        self.assertEqual(current_settings(), (True, False, 0.5, "log", True))
+
+    def test_environment_untouched(self):
+        before = os.environ.get("COVENANT_CONFIG")
+        self.configure()
+        self.assertEqual(os.environ.get("COVENANT_CONFIG"), before)
+
+    @unittest.skipUnless(hasattr(os, "fork"), "fork is not available")
+    def test_forked_workers_report(self):
+        # The reporting thread started in the parent doesn't exist in the
+        # child, which has to start its own.
+        set_violation_policy(_reports.append, min_interval=0)
+        positive(-1)
+        self.assertTrue(flush(5))
+        self.assertEqual(len(_reports), 1)
+        context = multiprocessing.get_context("fork")
+        with ProcessPoolExecutor(1, mp_context=context) as executor:
+            self.assertEqual(executor.submit(report_in_child).result(60), 2)
+
+    def test_callable_policy_not_exported(self):
+        set_violation_policy("log")
+        set_violation_policy(_reports.append)
+        self.assertIsNone(settings()["policy"])
+
+
+if __name__ == "__main__":
+    unittest.main()
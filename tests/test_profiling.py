@@ -0,0 +1,100 @@
+import unittest
+from covenant.annotations import *
+from covenant.conditions import *
+from covenant.invariant import *
+from covenant.profiling import *
+from covenant.exceptions import *
+
+
+def _site(sites, function, kind):
+    for site in sites:
+        if site["function"].endswith(function) and site["kind"] == kind:
+            return site
+
+
+class ProfilingTests(unittest.TestCase):
+    def setUp(self):
+        reset_profiling()
+        enable_profiling()
+
+    def tearDown(self):
+        disable_profiling()
+        reset_profiling()
+
+    def test_counts(self):
+        @post(lambda r, x: r >= 0)
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        foo(1)
+        foo(2)
+        with self.assertRaises(PreconditionViolationError):
+            foo(-1)
+
+        sites = snapshot()
+        pre_site = _site(sites, "foo", "pre")
+        post_site = _site(sites, "foo", "post")
+        self.assertEqual(pre_site["calls"], 3)
+        self.assertEqual(pre_site["violations"], 1)
+        self.assertEqual(post_site["calls"], 2)
+        self.assertEqual(post_site["violations"], 0)
+        self.assertGreater(pre_site["total_time"], 0)
+        self.assertGreaterEqual(pre_site["total_time"], pre_site["max_time"])
+        self.assertIn("<lambda>", pre_site["condition"])
+
+    def test_exception_counts_as_violation(self):
+        @pre(lambda x: float(x))
+        def foo(x):
+            return x
+
+        with self.assertRaises(PreconditionViolationError):
+            foo("abc")
+        self.assertEqual(_site(snapshot(), "foo", "pre")["violations"], 1)
+
+    def test_constrain_and_invariant(self):
+        @constrain
+        def foo(x: lambda x: x > 0) -> lambda r: r > 0:
+            return x
+
+        @invariant(lambda self: True)
+        class Foo(object):
+            def bar(self):
+                pass
+
+        foo(1)
+        Foo().bar()
+        sites = snapshot()
+        self.assertEqual(_site(sites, "foo", "pre")["condition"], "x")
+        self.assertEqual(_site(sites, "foo", "post")["calls"], 1)
+        self.assertEqual(_site(sites, "Foo", "invariant")["calls"], 2)
+
+    def test_disabled(self):
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        disable_profiling()
+        foo(1)
+        self.assertIsNone(_site(snapshot(), "foo", "pre"))
+        enable_profiling()
+        foo(1)
+        self.assertEqual(_site(snapshot(), "foo", "pre")["calls"], 1)
+
+    def test_prometheus(self):
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        foo(1)
+        text = to_prometheus()
+        self.assertIn("# TYPE covenant_condition_calls_total counter", text)
+        line = [l for l in text.splitlines()
+                if l.startswith("covenant_condition_calls_total{")
+                and "test_prometheus" in l][0]
+        self.assertIn('kind="pre"', line)
+        self.assertTrue(line.endswith(" 1"))
+
+
+if __name__ == "__main__":
+    unittest.main()
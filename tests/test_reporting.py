@@ -0,0 +1,137 @@
+import logging
+import time
+import threading
+import unittest
+from covenant.conditions import *
+from covenant.invariant import *
+from covenant.reporting import *
+from covenant.exceptions import *
+
+
+class ViolationPolicyTests(unittest.TestCase):
+    def tearDown(self):
+        set_violation_policy("raise")
+
+    def test_default_raises(self):
+        self.assertEqual(get_violation_policy(), "raise")
+
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        with self.assertRaises(PreconditionViolationError):
+            foo(-1)
+
+    def test_callback(self):
+        reports = []
+        set_violation_policy(reports.append, min_interval=0)
+
+        @post(lambda r, x: r > 0)
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        self.assertEqual(foo(-1), -1)
+        self.assertTrue(flush(5))
+        self.assertEqual([r.kind for r in reports], ["pre", "post"])
+        self.assertTrue(reports[0].function.endswith("foo"))
+        self.assertIsInstance(reports[0].error, PreconditionViolationError)
+        self.assertIsInstance(reports[1].error, PostconditionViolationError)
+
+    def test_handler_runs_in_background(self):
+        threads = []
+        set_violation_policy(lambda v: threads.append(threading.current_thread()))
+
+        @invariant(lambda self: False)
+        class Foo(object):
+            def bar(self):
+                return 1
+
+        self.assertEqual(Foo().bar(), 1)
+        self.assertTrue(flush(5))
+        self.assertTrue(threads)
+        self.assertIsNot(threads[0], threading.current_thread())
+
+    def test_rate_limit(self):
+        reports = []
+        set_violation_policy(reports.append, min_interval=3600)
+
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        @pre(lambda x: x > 0)
+        def bar(x):
+            return x
+
+        for i in range(100):
+            foo(-1)
+        bar(-1)
+        self.assertTrue(flush(5))
+        self.assertEqual(len(reports), 2)
+
+    def test_suppressed_count(self):
+        reports = []
+        set_violation_policy(reports.append, min_interval=0.05)
+
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        for i in range(5):
+            foo(-1)
+        time.sleep(0.06)
+        foo(-1)
+        self.assertTrue(flush(5))
+        self.assertEqual([r.suppressed for r in reports], [0, 4])
+
+    def test_log(self):
+        set_violation_policy("log", min_interval=0)
+
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        with self.assertLogs("covenant", logging.ERROR) as cm:
+            foo(-1)
+            self.assertTrue(flush(5))
+        self.assertIn("Contract violation", cm.output[0])
+
+    def test_full_queue_drops(self):
+        release = threading.Event()
+        set_violation_policy(lambda v: release.wait(5), min_interval=0,
+                             queue_size=1)
+
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        before = dropped_violations()
+        for i in range(10):
+            foo(-1)
+        self.assertGreater(dropped_violations(), before)
+        release.set()
+
+    def test_flush_timeout(self):
+        release = threading.Event()
+        set_violation_policy(lambda v: release.wait(5), min_interval=0)
+
+        @pre(lambda x: x > 0)
+        def foo(x):
+            return x
+
+        foo(-1)
+        threads = threading.active_count()
+        self.assertFalse(flush(0.01))
+        self.assertFalse(flush(0.01))
+        self.assertEqual(threading.active_count(), threads)
+        release.set()
+        self.assertTrue(flush(5))
+
+    def test_unknown_policy(self):
+        with self.assertRaises(ValueError):
+            set_violation_policy("ignore")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,125 @@
+import asyncio
+import unittest
+from covenant.conditions import *
+from covenant.exceptions import *
+
+
+class Stack(object):
+    def __init__(self):
+        self.items = []
+
+    @post(lambda r, self, item, old: len(self.items) == old.size + 1,
+          old={"size": lambda self, item: len(self.items)})
+    def push(self, item):
+        self.items.append(item)
+
+    @post(lambda r, self, item, old: self.items == old.items + [item],
+          old={"items": "self.items"})
+    def push_checked(self, item):
+        self.items.append(item)
+
+    @post(lambda r, self, item, old: len(self.items) == old.size + 1,
+          old={"size": lambda self, item: len(self.items)})
+    def broken_push(self, item):
+        self.items.extend([item, item])
+
+
+class OldValueTests(unittest.TestCase):
+    def test_callable_snapshot(self):
+        s = Stack()
+        s.push(1)
+        s.push(2)
+        self.assertEqual(s.items, [1, 2])
+        with self.assertRaises(PostconditionViolationError):
+            s.broken_push(3)
+
+    def test_path_snapshot_is_copied(self):
+        s = Stack()
+        s.push_checked(1)
+        s.push_checked(2)
+        self.assertEqual(s.items, [1, 2])
+
+    def test_callable_receives_named_arguments(self):
+        s = Stack()
+
+        @post(lambda r, self, item, old: len(self.items) == old.size + 1,
+              old={"size": lambda self: len(self.items)})
+        def append(self, item):
+            self.items.append(item)
+
+        append(s, 1)
+        self.assertEqual(s.items, [1])
+
+    def test_subclass_copied(self):
+        from collections import defaultdict
+        seen = []
+
+        @post(lambda r, x, old: seen.append(old.x) or True, old={"x": "x"})
+        def add(x):
+            x["key"].append(1)
+
+        value = defaultdict(list)
+        add(value)
+        self.assertIsInstance(seen[0], defaultdict)
+        self.assertIsNot(seen[0], value)
+        self.assertEqual(seen[0], {})
+
+    def test_immutable_not_copied(self):
+        seen = []
+        value = (1, 2)
+
+        @post(lambda r, x, old: seen.append(old.x) or True, old={"x": "x"})
+        def foo(x):
+            return x
+
+        foo(value)
+        self.assertIs(seen[0], value)
+
+    def test_only_captured_when_sampled(self):
+        captured = []
+
+        @post(lambda r, x, old: True, sample=2,
+              old={"x": lambda x: captured.append(x) or x})
+        def foo(x):
+            return x
+
+        for i in range(4):
+            foo(i)
+        self.assertEqual(captured, [0, 2])
+
+    def test_stacked_with_plain_postcondition(self):
+        @post(lambda r, x: r == x + 1)
+        @post(lambda r, x, old: r == old.x + 1, old={"x": "x"})
+        def inc(x):
+            return x + 1
+
+        self.assertEqual(inc(1), 2)
+
+    def test_coroutine(self):
+        s = Stack()
+
+        @post(lambda r, old: len(s.items) == old.size + 1,
+              old={"size": lambda: len(s.items)})
+        async def push():
+            s.items.append(1)
+
+        asyncio.run(push())
+        self.assertEqual(s.items, [1])
+
+    def test_conflicting_parameter(self):
+        with self.assertRaises(TypeError):
+            @post(lambda r, old: True, old={"x": "old"})
+            def foo(old):
+                return old
+
+    def test_failed_capture(self):
+        @post(lambda r, x, old: True, old={"y": "x.missing"})
+        def foo(x):
+            return x
+
+        with self.assertRaises(PostconditionViolationError):
+            foo(1)
+
+
+if __name__ == "__main__":
+    unittest.main()
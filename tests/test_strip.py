@@ -0,0 +1,86 @@
+import json
+import os
+import subprocess
+import sys
+import unittest
+
+import covenant
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+IMPORT_MODULES = """
+import sys
+before = set(sys.modules)
+import covenant
+covenant.pre, covenant.post, covenant.constrain, covenant.invariant
+loaded = sorted(set(sys.modules) - before)
+import json
+print(json.dumps({"stripped": covenant.is_stripped(), "modules": loaded}))
+"""
+
+IDENTITY = """
+import sys
+import covenant
+
+def func(x):
+    return x
+
+class Cls(object):
+    def method(self):
+        pass
+
+assert covenant.pre(lambda x: False)(func) is func
+assert covenant.post(lambda r, x: False, sample=2)(func) is func
+assert covenant.constrain(func) is func
+assert covenant.constrain(sample=0.5)(func) is func
+assert covenant.invariant(lambda self: False)(Cls) is Cls
+assert covenant.inherit_contracts(Cls) is Cls
+assert type(vars(Cls)["method"]).__name__ == "function"
+assert not covenant.is_enabled(func)
+covenant.disable(func)
+covenant.enable(func)
+print(" ".join(sorted(set(["inspect", "covenant.wrapping"]) & set(sys.modules))))
+"""
+
+
+def run(code, strip=None, optimize=False):
+    env = dict(os.environ, PYTHONPATH=ROOT)
+    env.pop("COVENANT_STRIP", None)
+    if strip is not None:
+        env["COVENANT_STRIP"] = strip
+    command = [sys.executable] + (["-O"] if optimize else []) + ["-c", code]
+    return subprocess.check_output(command, env=env, cwd=ROOT,
+                                   universal_newlines=True).strip()
+
+
+class StripTests(unittest.TestCase):
+    def test_not_stripped_by_default(self):
+        self.assertFalse(covenant.is_stripped())
+
+    def test_identity(self):
+        self.assertEqual(run(IDENTITY, strip="1"), "")
+
+    def test_optimize_flag(self):
+        self.assertEqual(run(IDENTITY, optimize=True), "")
+
+    def test_env_overrides_optimize_flag(self):
+        stats = json.loads(run(IMPORT_MODULES, strip="0", optimize=True))
+        self.assertFalse(stats["stripped"])
+
+    def test_stripped_import(self):
+        # Rather than timing the imports, which is unreliable on a loaded
+        # machine, check that the stripped one loads none of the machinery.
+        stripped = json.loads(run(IMPORT_MODULES, strip="1"))
+        full = json.loads(run(IMPORT_MODULES, strip="0"))
+
+        self.assertTrue(stripped["stripped"])
+        self.assertFalse(full["stripped"])
+        for module in ("inspect", "covenant.wrapping", "covenant.contract",
+                       "covenant.binding"):
+            self.assertNotIn(module, stripped["modules"])
+            self.assertIn(module, full["modules"])
+        self.assertNotIn("json", stripped["modules"])
+
+
+if __name__ == '__main__':
+    unittest.main()
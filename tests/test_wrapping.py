@@ -0,0 +1,185 @@
+import asyncio
+import inspect
+import traceback
+import unittest
+
+from covenant.base import Switch
+from covenant.binding import make_binder
+from covenant.wrapping import full_arguments, wrap, _TEMPLATES
+
+
+def record(calls):
+    def before(callargs):
+        calls.append(dict(callargs))
+        return "state"
+
+    def after(value, callargs, state):
+        calls.append((value, state))
+        return value
+    return before, after
+
+
+def everything(a, b=2, /, c=3, *args, d, e=5, **kwargs):
+    return (a, b, c, args, d, e, kwargs)
+
+
+class WrapTests(unittest.TestCase):
+    def setUp(self):
+        self.calls = []
+        self.switch = Switch(__name__)
+
+    def wrap(self, func, **options):
+        return wrap(func, self.switch, *record(self.calls), **options)
+
+    def test_attributes(self):
+        def func(x, y=1):
+            """Docstring"""
+        func.extra = "value"
+        wrapper = self.wrap(func)
+
+        self.assertEqual(wrapper.__name__, "func")
+        self.assertEqual(wrapper.__qualname__, func.__qualname__)
+        self.assertEqual(wrapper.__doc__, "Docstring")
+        self.assertEqual(wrapper.__module__, __name__)
+        self.assertEqual(wrapper.extra, "value")
+        self.assertIs(wrapper.__wrapped__, func)
+
+    def test_signature(self):
+        wrapper = self.wrap(everything)
+        self.assertEqual(inspect.signature(wrapper), inspect.signature(everything))
+        self.assertEqual(inspect.signature(wrapper, follow_wrapped=False),
+                         inspect.signature(everything))
+
+    def test_callargs_match_getcallargs(self):
+        wrapper = self.wrap(everything)
+        bind = make_binder(everything)
+        for args, kwargs in [((1,), {"d": 4}),
+                             ((1, 2, 3, 4, 5), {"d": 6, "f": 7}),
+                             ((1,), {"c": 0, "d": 4, "e": 0})]:
+            del self.calls[:]
+            self.assertEqual(wrapper(*args, **kwargs), everything(*args, **kwargs))
+            self.assertEqual(self.calls[0], bind(args, kwargs))
+            self.assertEqual(self.calls[1], (everything(*args, **kwargs), "state"))
+
+    def test_needed(self):
+        wrapper = self.wrap(everything, needed=("c", "kwargs"))
+        self.assertEqual(wrapper(1, d=4, f=7), everything(1, d=4, f=7))
+        callargs = self.calls[0]
+        self.assertEqual((callargs["c"], callargs["kwargs"]), (3, {"f": 7}))
+        self.assertNotIn("a", callargs)
+        self.assertEqual(full_arguments(callargs),
+                         make_binder(everything)((1,), {"d": 4, "f": 7}))
+
+    def test_needed_generator(self):
+        def func(x, y):
+            yield x + y
+        before, after = record(self.calls)
+        wrapper = wrap(func, self.switch, before,
+                       lambda gen, callargs, state: gen, needed=("y",))
+        self.assertEqual(list(wrapper(1, 2)), [3])
+        self.assertNotIn("x", self.calls[0])
+        self.assertEqual(full_arguments(self.calls[0]), {"x": 1, "y": 2})
+
+    def test_full_arguments_of_complete_dict(self):
+        callargs = {"x": 1}
+        self.assertIs(full_arguments(callargs), callargs)
+
+    def test_invalid_call(self):
+        wrapper = self.wrap(everything)
+        with self.assertRaises(TypeError):
+            wrapper(1)
+        with self.assertRaises(TypeError):
+            wrapper(a=1, d=4)
+        self.assertEqual(self.calls, [])
+
+    def test_defaults_are_shared(self):
+        def func(x=[]):
+            return x
+        self.assertIs(self.wrap(func)(), func())
+
+    def test_switched_off(self):
+        wrapper = self.wrap(everything)
+        self.switch.on = False
+        self.assertEqual(wrapper(1, d=4), everything(1, d=4))
+        self.assertEqual(self.calls, [])
+
+    def test_sampled_out(self):
+        calls = []
+
+        def before(callargs, sampled):
+            calls.append(sampled)
+
+        decisions = iter([False, "in"])
+        wrapper = wrap(everything, self.switch, before,
+                       sample=lambda: next(decisions))
+        self.assertEqual(wrapper(1, d=4), everything(1, d=4))
+        self.assertEqual(calls, [])
+        wrapper(1, d=4)
+        self.assertEqual(calls, ["in"])
+
+    def test_no_hooks(self):
+        def func(x):
+            return x * 2
+        self.assertEqual(wrap(func, self.switch)(2), 4)
+
+    def test_templates_shared_by_shape(self):
+        def first(x, y=1):
+            return x
+        def second(x, y=2):
+            return y
+        self.wrap(first)
+        count = len(_TEMPLATES)
+        wrapper = self.wrap(second)
+        self.assertEqual(len(_TEMPLATES), count)
+        self.assertEqual(wrapper(0), 2)
+
+    def test_single_frame(self):
+        def func(x):
+            return traceback.extract_stack()
+        stack = wrap(func, self.switch)(1)
+        self.assertEqual([frame.name for frame in stack[-3:-1]],
+                         ["test_single_frame", "func"])
+
+    def test_coroutine(self):
+        async def func(x):
+            return x + 1
+        wrapper = self.wrap(func, coroutine=True)
+        self.assertTrue(inspect.iscoroutinefunction(wrapper))
+        self.assertEqual(asyncio.run(wrapper(1)), 2)
+        self.assertEqual(self.calls, [{"x": 1}, (2, "state")])
+
+    def test_templates_shared_across_names(self):
+        def first(a, b=1, *, c):
+            return (a, b, c)
+        def second(x, y=2, *, z):
+            return (x, y, z)
+        self.wrap(first)
+        count = len(_TEMPLATES)
+        wrapper = self.wrap(second)
+        self.assertEqual(len(_TEMPLATES), count)
+        self.assertEqual(inspect.signature(wrapper, follow_wrapped=False),
+                         inspect.signature(second))
+        self.assertEqual(wrapper(0, z=3), (0, 2, 3))
+        self.assertEqual(self.calls[0], {"x": 0, "y": 2, "z": 3})
+
+    def test_bound_method(self):
+        class A(object):
+            def m(self, x, y=2):
+                return (self, x, y)
+        a = A()
+        wrapper = self.wrap(a.m)
+        self.assertEqual(wrapper(1), (a, 1, 2))
+        self.assertEqual(wrapper(1, 3), (a, 1, 3))
+        self.assertEqual(self.calls[0], {"self": a, "x": 1, "y": 2})
+        self.assertEqual(self.calls[2], {"self": a, "x": 1, "y": 3})
+
+    def test_reserved_names_fall_back(self):
+        def func(_covenant_func, x):
+            return x
+        wrapper = self.wrap(func)
+        self.assertEqual(wrapper(0, 1), 1)
+        self.assertEqual(self.calls[0], {"_covenant_func": 0, "x": 1})
+
+
+if __name__ == '__main__':
+    unittest.main()